@@ -0,0 +1 @@
+"""Benchmarks for MS365 Calendar."""
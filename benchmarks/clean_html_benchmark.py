@@ -0,0 +1,108 @@
+"""Benchmark converting event bodies to descriptions, with and without the cache.
+
+Run from the repository root:
+
+    python -m benchmarks.clean_html_benchmark
+"""
+
+import json
+from pathlib import Path
+import time
+
+from custom_components.ms365_calendar.integration.utils_integration import (
+    _html_to_text,
+    clean_html,
+)
+
+ROUNDS = 20
+DATA_FILE = (
+    Path(__file__).parent.parent
+    / "tests/integration/data_integration/O365/calendar1_calendar_view.json"
+)
+TEAMS_BODY = """<html>
+<head>
+<meta http-equiv="Content-Type" content="text/html; charset=utf-8">
+<meta name="Generator" content="Microsoft Word 15 (filtered medium)">
+<style>
+<!--
+p.MsoNormal, li.MsoNormal, div.MsoNormal
+	{margin:0cm;
+	font-size:12.0pt;
+	font-family:"Aptos",sans-serif}
+-->
+</style>
+</head>
+<body lang="EN-GB" link="#467886" vlink="#96607D" style="word-wrap:break-word">
+<div class="WordSection1">
+<p class="MsoNormal">Agenda for the weekly review:</p>
+<ul>
+<li class="MsoNormal">Progress since last week</li>
+<li class="MsoNormal">Risks and blockers</li>
+<li class="MsoNormal">Actions</li>
+</ul>
+</div>
+<div style="max-width:1024px">
+<div style="margin-bottom:24px; overflow:hidden; white-space:nowrap">
+________________________________________________________________________________
+</div>
+<div style="margin-bottom:12px">
+<span style="font-size:24px; font-weight:700">Microsoft Teams</span>
+<a href="https://aka.ms/JoinTeamsMeeting">Need help?</a>
+</div>
+<div style="margin-bottom:6px">
+<a href="https://teams.microsoft.com/l/meetup-join/19%3ameeting_abc%40thread.v2/0"
+ style="font-size:20px; font-weight:700; text-decoration:underline">
+Join the meeting now</a>
+</div>
+<div style="margin-bottom:6px">
+<span style="font-size:14px">Meeting ID: </span>
+<span style="font-size:16px">123 456 789 012</span>
+</div>
+<div style="margin-bottom:24px">
+<span style="font-size:14px">Passcode: </span>
+<span style="font-size:16px">aBcD12</span>
+</div>
+<div style="margin-bottom:24px; max-width:532px">
+<span style="font-size:14px">For organisers: </span>
+<a href="https://teams.microsoft.com/meetingOptions/">Meeting options</a>
+</div>
+<div style="margin-top:24px; margin-bottom:6px; overflow:hidden; white-space:nowrap">
+________________________________________________________________________________
+</div>
+</div>
+</body>
+</html>
+"""
+
+
+def _time(bodies, convert):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for body, content_type in bodies:
+            convert(body, content_type)
+    return (time.perf_counter() - start) / ROUNDS / len(bodies) * 1_000_000
+
+
+def main():
+    """Run the benchmark."""
+    templates = json.loads(DATA_FILE.read_text(encoding="utf8"))["value"]
+    html = [(item["body"]["content"], "html") for item in templates]
+    html.append((TEAMS_BODY, "html"))
+    text = [("Agenda for the weekly review, join on Teams.", "text")]
+
+    uncached = _time(html, lambda body, _: _html_to_text.__wrapped__(body))
+    for body, content_type in html:
+        clean_html(body, content_type)
+    cached = _time(html, clean_html)
+    plain = _time(text, clean_html)
+    plain_parsed = _time(text, lambda body, _: _html_to_text.__wrapped__(body))
+    print(  # noqa: T201
+        f"HTML body, parsed every time  {uncached:>8.1f} us\n"
+        f"HTML body, cached             {cached:>8.1f} us\n"
+        f"Text body, parsed             {plain_parsed:>8.1f} us\n"
+        f"Text body, fast path          {plain:>8.1f} us"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark the memory held by cached events, MS365Event against O365 Event.
+
+Run from the repository root:
+
+    python -m benchmarks.event_memory_benchmark
+"""
+
+import copy
+import json
+from pathlib import Path
+import tracemalloc
+
+from O365.calendar import Calendar
+from O365.connection import MSGraphProtocol
+
+from custom_components.ms365_calendar.integration.sync.event import MS365Event
+
+EVENT_COUNT = 5000
+DATA_FILE = (
+    Path(__file__).parent.parent
+    / "tests/integration/data_integration/O365/calendar1_calendar_view.json"
+)
+
+
+def _build_payloads(count):
+    templates = json.loads(DATA_FILE.read_text(encoding="utf8"))["value"]
+    payloads = []
+    for index in range(count):
+        payload = copy.deepcopy(templates[index % len(templates)])
+        payload["id"] = f"event{index}"
+        payload["subject"] = f"Event {index}"
+        payloads.append(payload)
+    return payloads
+
+
+def _measure(build):
+    tracemalloc.start()
+    events = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return events, current
+
+
+def main():
+    """Run the benchmark."""
+    calendar = Calendar(protocol=MSGraphProtocol(), main_resource="me")
+    payloads = _build_payloads(EVENT_COUNT)
+
+    _, o365_size = _measure(
+        lambda: [
+            calendar.event_constructor(
+                parent=calendar,
+                **{calendar._cloud_data_key: payload},  # noqa: SLF001
+            )
+            for payload in payloads
+        ]
+    )
+    _, record_size = _measure(
+        lambda: [MS365Event.from_graph(calendar, payload) for payload in payloads]
+    )
+    print(  # noqa: T201
+        f"{EVENT_COUNT} events: O365 Event {o365_size / 1024:.0f} KiB, "
+        f"MS365Event {record_size / 1024:.0f} KiB "
+        f"({o365_size / record_size:.1f}x smaller)"
+    )
+
+
+if __name__ == "__main__":
+    main()
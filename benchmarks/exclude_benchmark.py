@@ -0,0 +1,75 @@
+"""Benchmark compiled exclude patterns against searching for each pattern in turn.
+
+Run from the repository root:
+
+    python -m benchmarks.exclude_benchmark
+"""
+
+import random
+import re
+import timeit
+
+from custom_components.ms365_calendar.integration.sync.sync import compile_exclude
+
+SUBJECT_COUNT = 10000
+REPEAT = 20
+PATTERNS = [
+    "Lunch",
+    "Focus time",
+    "^Private",
+    "^Canceled:",
+    "Stand.?up$",
+    "(?i)holiday",
+    r"\bOOO\b",
+    r"(Re:\s*)\1",
+]
+WORDS = [
+    "Daily",
+    "Standup",
+    "Review",
+    "Sprint",
+    "Planning",
+    "Lunch",
+    "Private",
+    "Holiday",
+    "OOO",
+    "Customer",
+    "Call",
+    "Re:",
+]
+
+
+def _build_subjects(count):
+    rnd = random.Random(1)
+    return [" ".join(rnd.choices(WORDS, k=rnd.randint(1, 6))) for _ in range(count)]
+
+
+def main():
+    """Run the benchmark."""
+    subjects = _build_subjects(SUBJECT_COUNT)
+    expressions = [re.compile(pattern) for pattern in PATTERNS]
+    is_excluded = compile_exclude(PATTERNS)
+
+    def search_each():
+        return [
+            subject
+            for subject in subjects
+            if not any(regex.search(subject) for regex in expressions)
+        ]
+
+    def compiled():
+        return [subject for subject in subjects if not is_excluded(subject)]
+
+    assert search_each() == compiled()
+
+    each_time = timeit.timeit(search_each, number=REPEAT) / REPEAT
+    compiled_time = timeit.timeit(compiled, number=REPEAT) / REPEAT
+    print(  # noqa: T201
+        f"{SUBJECT_COUNT} subjects, {len(PATTERNS)} patterns, kept "
+        f"{len(compiled())}: search each {each_time * 1000:.2f} ms, "
+        f"compiled {compiled_time * 1000:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
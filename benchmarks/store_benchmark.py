@@ -0,0 +1,135 @@
+"""Benchmark writing and reading the event store against the earlier encoders.
+
+Run from the repository root:
+
+    python -m benchmarks.store_benchmark
+"""
+
+from dataclasses import fields
+from datetime import datetime
+from enum import Enum
+import json
+import time
+
+from O365.calendar import Calendar
+from O365.connection import MSGraphProtocol
+
+from homeassistant.helpers.json import json_bytes
+from homeassistant.util.json import json_loads
+
+from custom_components.ms365_calendar.integration.sync.event import MS365Event
+
+from .event_memory_benchmark import _build_payloads
+
+EVENT_COUNT = 999
+ROUNDS = 20
+
+
+class ReflectiveEncoder(json.JSONEncoder):
+    """The original encoder, walking the attributes of each O365 Event."""
+
+    def default(self, o):
+        """Default method for the JSONEncoder."""
+        attributes = {}
+
+        if not hasattr(o, "__dict__"):
+            return None
+        for k, v in vars(o).items():
+            index = k.find("__")
+            key = k if index <= 0 else k[index + 2 :]
+            if key not in [
+                "con",
+                "protocol",
+                "main_resource",
+                "untrack",
+            ] and not key.startswith("_"):
+                if isinstance(v, datetime):
+                    val = str(v)
+                elif hasattr(v, "value"):
+                    val = v.value
+                else:
+                    val = v
+                attributes[key] = val
+
+        return attributes
+
+
+class FieldsEncoder(json.JSONEncoder):
+    """The encoder used for MS365Event before the explicit schema."""
+
+    def default(self, o):
+        """Default method for the JSONEncoder."""
+        return {
+            field.name: _serialise_value(getattr(o, field.name)) for field in fields(o)
+        }
+
+
+def _serialise_value(value):
+    if isinstance(value, datetime):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _time(func):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        result = func()
+    return result, (time.perf_counter() - start) / ROUNDS * 1000
+
+
+def _report(name, encoded, encode_ms, decode_ms):
+    print(  # noqa: T201
+        f"{name:<28} {len(encoded) / 1024:>7.0f} KiB "
+        f"encode {encode_ms:>7.1f} ms  decode {decode_ms:>7.1f} ms"
+    )
+
+
+def main():
+    """Run the benchmark."""
+    calendar = Calendar(protocol=MSGraphProtocol(), main_resource="me")
+    payloads = _build_payloads(EVENT_COUNT)
+    o365_events = {
+        payload["id"]: calendar.event_constructor(
+            parent=calendar,
+            **{calendar._cloud_data_key: payload},  # noqa: SLF001
+        )
+        for payload in payloads
+    }
+    events = {
+        payload["id"]: MS365Event.from_graph(calendar, payload) for payload in payloads
+    }
+    print(f"{EVENT_COUNT} events, mean of {ROUNDS} rounds")  # noqa: T201
+
+    encoded, encode_ms = _time(
+        lambda: json.dumps({"items": o365_events}, cls=ReflectiveEncoder)
+    )
+    _, decode_ms = _time(lambda: json.loads(encoded))
+    _report("O365 Event, reflective", encoded, encode_ms, decode_ms)
+
+    encoded, encode_ms = _time(lambda: json.dumps({"items": events}, cls=FieldsEncoder))
+    _, decode_ms = _time(
+        lambda: {
+            key: MS365Event.from_store(item)
+            for key, item in json.loads(encoded)["items"].items()
+        }
+    )
+    _report("MS365Event, fields", encoded, encode_ms, decode_ms)
+
+    encoded, encode_ms = _time(
+        lambda: json_bytes(
+            {"items": {key: event.to_store() for key, event in events.items()}}
+        )
+    )
+    _, decode_ms = _time(
+        lambda: {
+            key: MS365Event.from_store(item)
+            for key, item in json_loads(encoded)["items"].items()
+        }
+    )
+    _report("MS365Event, schema + orjson", encoded, encode_ms, decode_ms)
+
+
+if __name__ == "__main__":
+    main()
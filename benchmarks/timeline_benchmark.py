@@ -0,0 +1,118 @@
+"""Benchmark MS365Timeline overlap queries against the ical sorted iterable.
+
+Also compares applying a sync's changes to the timeline with rebuilding it.
+
+Run from the repository root:
+
+    python -m benchmarks.timeline_benchmark
+"""
+
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+import random
+import timeit
+
+from ical.iter import (
+    MergedIterable,
+    SortableItemTimeline,
+    SortableItemValue,
+    SortedItemIterable,
+)
+
+from custom_components.ms365_calendar.integration.sync.sync import _changes
+from custom_components.ms365_calendar.integration.sync.timeline import (
+    MS365Timeline,
+    timespan_of,
+)
+from homeassistant.util import dt as dt_util
+
+EVENT_COUNT = 10000
+REPEAT = 20
+
+
+@dataclass(frozen=True, slots=True)
+class _Event:
+    object_id: str
+    start: datetime
+    end: datetime
+    is_all_day: bool
+
+
+def _build_events(count):
+    now = dt_util.utcnow()
+    rnd = random.Random(1)
+    events = []
+    for index in range(count):
+        start = now + timedelta(minutes=rnd.randint(-60 * 24 * 90, 60 * 24 * 90))
+        duration = timedelta(minutes=rnd.choice([15, 30, 60, 120, 60 * 24 * 3]))
+        events.append(
+            _Event(
+                object_id=f"event{index}",
+                start=start,
+                end=start + duration,
+                is_all_day=False,
+            )
+        )
+    return events
+
+
+def _ical_timeline(events):
+    def sortable_items():
+        for event in events:
+            yield SortableItemValue(timespan_of(event), event)
+
+    return SortableItemTimeline(
+        MergedIterable([SortedItemIterable(sortable_items, dt_util.UTC)])
+    )
+
+
+def main():
+    """Run the benchmark."""
+    events = _build_events(EVENT_COUNT)
+    now = dt_util.utcnow()
+    queries = [
+        (now, now),
+        (now, now + timedelta(days=1)),
+        (now, now + timedelta(days=7)),
+    ]
+
+    old = _ical_timeline(events)
+    new = MS365Timeline(events)
+    for start, end in queries:
+        assert list(old.overlapping(start, end)) == list(new.overlapping(start, end))
+
+    build = timeit.timeit(lambda: MS365Timeline(events), number=REPEAT) / REPEAT
+    print(  # noqa: T201
+        f"{EVENT_COUNT} events, index build: {build * 1000:.2f} ms"
+    )
+
+    moved = [
+        replace(event, start=event.start + timedelta(hours=1))
+        for event in events[:: EVENT_COUNT // 10]
+    ]
+    update = timeit.timeit(lambda: new.update(moved, []), number=REPEAT) / REPEAT
+    stored = {event.object_id: event for event in events}
+    synced = {event.object_id: replace(event) for event in events}
+    unchanged = (
+        timeit.timeit(lambda: new.update(*_changes(stored, synced)), number=REPEAT)
+        / REPEAT
+    )
+    print(  # noqa: T201
+        f"update {len(moved)} events: {update * 1000:.3f} ms, "
+        f"full sync with no changes: {unchanged * 1000:.3f} ms"
+    )
+    for start, end in queries:
+        old_time = timeit.timeit(
+            lambda s=start, e=end: list(old.overlapping(s, e)), number=REPEAT
+        )
+        new_time = timeit.timeit(
+            lambda s=start, e=end: new.overlapping(s, e), number=REPEAT
+        )
+        print(  # noqa: T201
+            f"overlapping {end - start}: ical {old_time / REPEAT * 1000:.2f} ms, "
+            f"indexed {new_time / REPEAT * 1000:.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,13 +8,14 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers import issue_registry as ir
 from homeassistant.helpers.network import get_url
 
-from .classes.api import MS365Account, MS365Token
+from .classes.api import MS365Account, MS365Token, close_shared_adapters
 from .classes.config_entry import MS365ConfigEntry, MS365Data
 from .const import (
     CONF_CLIENT_ID,
     CONF_CLIENT_SECRET,
     CONF_ENTITY_NAME,
     CONF_SHARED_MAILBOX,
+    HTTP_POOL_SIZE,
     SECRET_EXPIRED,
     TOKEN_DELETED,
     TOKEN_ERROR,
@@ -23,7 +24,12 @@ from .const import (
     TOKEN_FILE_MISSING,
 )
 from .integration import setup_integration
-from .integration.const_integration import DOMAIN, PLATFORMS
+from .integration.const_integration import (
+    CONF_ADVANCED_OPTIONS,
+    CONF_CONNECTION_POOL_SIZE,
+    DOMAIN,
+    PLATFORMS,
+)
 from .integration.permissions_integration import Permissions
 
 _LOGGER = logging.getLogger(__name__)
@@ -42,7 +48,10 @@ async def async_setup_entry(hass: HomeAssistant, entry: MS365ConfigEntry):
     _LOGGER.debug("Permissions setup")
     token_backend = MS365Token(hass, entry.data)
     perms = Permissions(hass, entry.data, token_backend)
-    ha_account = MS365Account(perms, entry.data)
+    pool_size = entry.options.get(CONF_ADVANCED_OPTIONS, {}).get(
+        CONF_CONNECTION_POOL_SIZE, HTTP_POOL_SIZE
+    )
+    ha_account = MS365Account(perms, entry.data, pool_size)
     if token_backend.check_token_exists():
         error = (
             await hass.async_add_executor_job(
@@ -131,7 +140,10 @@ async def async_migrate_entry(
 
 async def async_unload_entry(hass: HomeAssistant, entry: MS365ConfigEntry) -> bool:
     """Unload a config entry."""
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok and not hass.config_entries.async_loaded_entries(DOMAIN):
+        await hass.async_add_executor_job(close_shared_adapters)
+    return unload_ok
 
 
 async def async_reload_entry(hass: HomeAssistant, entry: MS365ConfigEntry) -> None:
@@ -3,13 +3,19 @@
 import logging
 import os
 import time
+from typing import Any
 
 from portalocker import Lock
 from portalocker.exceptions import LockException
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from homeassistant.core import HomeAssistant
 from O365 import Account, FileSystemTokenBackend
 from O365.connection import (  # pylint: disable=import-error, no-name-in-module
+    RETRIES_BACKOFF_FACTOR,
+    RETRIES_STATUS_LIST,
     Connection,
     MSGraphProtocol,
 )
@@ -19,6 +25,8 @@ from ..const import (
     CONST_UTC_TIMEZONE,
     COUNTRY_URLS,
     DEFAULT_TENANT_ID,
+    HTTP_POOL_HOSTS,
+    HTTP_POOL_SIZE,
     MS365_STORAGE_TOKEN,
     MSAL_AUTHORITY_BASE,
     OAUTH_REDIRECT_URL,
@@ -40,6 +48,10 @@ from .config_entry import MS365ConfigEntry
 
 _LOGGER = logging.getLogger(__name__)
 
+# Adapters shared by the sessions of every account, by the number of retries
+# and the connections kept alive to each host
+_SHARED_ADAPTERS: dict[tuple[int, int], "_SharedHTTPAdapter"] = {}
+
 
 class MS365Protocol(MSGraphProtocol):
     """Protocol class."""
@@ -58,8 +70,11 @@ class MS365Protocol(MSGraphProtocol):
 class MS365Connection(Connection):
     """Connection class."""
 
-    def __init__(self, credentials, country=None, **kwargs) -> None:
+    def __init__(
+        self, credentials, country=None, pool_size=HTTP_POOL_SIZE, **kwargs
+    ) -> None:
         """Override init to set China cloud specific values."""
+        self.pool_size = pool_size
         super().__init__(credentials, **kwargs)
         if country != CountryOptions.DEFAULT:
             # Override after super().__init__ to ensure our values are used
@@ -69,6 +84,79 @@ class MS365Connection(Connection):
             )
             self.oauth_redirect_url = COUNTRY_URLS[country][OAUTH_REDIRECT_URL]
 
+    def get_session(self, load_token: bool = False) -> Session:
+        """Create a session using the connection pool shared by all accounts.
+
+        The session keeps the account's authorisation header, the connections
+        to MS Graph are kept alive and reused by every account and calendar.
+        """
+        session = super().get_session(load_token=load_token)
+        adapter = shared_adapter(self.request_retries, self.pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+
+class _SharedHTTPAdapter(HTTPAdapter):
+    """Adapter mounted in the sessions of every account.
+
+    Closing an account's session must not close the pool the other accounts
+    are using, the adapters are closed by close_shared_adapters.
+    """
+
+    def close(self) -> None:
+        """Leave the shared pool open when a session is closed."""
+
+
+def shared_adapter(retries: int, pool_size: int = HTTP_POOL_SIZE) -> HTTPAdapter:
+    """Return the shared adapter with the number of retries and pool size."""
+    if (adapter := _SHARED_ADAPTERS.get((retries, pool_size))) is None:
+        adapter = _SHARED_ADAPTERS.setdefault(
+            (retries, pool_size),
+            _SharedHTTPAdapter(
+                pool_connections=HTTP_POOL_HOSTS,
+                pool_maxsize=pool_size,
+                max_retries=Retry(
+                    total=retries,
+                    read=retries,
+                    connect=retries,
+                    backoff_factor=RETRIES_BACKOFF_FACTOR,
+                    status_forcelist=RETRIES_STATUS_LIST,
+                    respect_retry_after_header=True,
+                )
+                if retries
+                else 0,
+            ),
+        )
+    return adapter
+
+
+def close_shared_adapters() -> None:
+    """Close the connections kept alive by the shared adapters."""
+    while _SHARED_ADAPTERS:
+        _, adapter = _SHARED_ADAPTERS.popitem()
+        HTTPAdapter.close(adapter)
+
+
+def connection_pool_stats() -> list[dict[str, Any]]:
+    """Return the connections opened and requests made for each host."""
+    pools = [
+        (pool, pool_size)
+        for (_, pool_size), adapter in list(_SHARED_ADAPTERS.items())
+        # The pools container cannot be iterated directly
+        for key in adapter.poolmanager.pools.keys()  # noqa: SIM118
+        if (pool := adapter.poolmanager.pools.get(key)) is not None
+    ]
+    return [
+        {
+            "host": pool.host,
+            "connections": pool.num_connections,
+            "requests": pool.num_requests,
+            "pool_size": pool_size,
+        }
+        for pool, pool_size in pools
+    ]
+
 
 class MS365CustomAccount(Account):
     """Custom Account class."""
@@ -79,9 +167,12 @@ class MS365CustomAccount(Account):
 class MS365Account:
     """Class for Account setup."""
 
-    def __init__(self, perms, entry_data: MS365ConfigEntry) -> None:
+    def __init__(
+        self, perms, entry_data: MS365ConfigEntry, pool_size: int = HTTP_POOL_SIZE
+    ) -> None:
         """Initialise the account."""
         self._country = get_country(entry_data)
+        self._pool_size = pool_size
         self._tenant_id = get_tenant_id(entry_data)
         self._perms = perms
         self.account = None
@@ -102,6 +193,7 @@ class MS365Account:
                 token_backend=self._perms.ha_token_backend.token_backend,
                 timezone=CONST_UTC_TIMEZONE,
                 main_resource=main_resource,
+                pool_size=self._pool_size,
             )
             self.is_authenticated = self.account.is_authenticated
 
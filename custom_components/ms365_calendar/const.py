@@ -32,6 +32,12 @@ DEFAULT_TENANT_ID = "common"
 
 EVENT_HA_EVENT = "ha_event"
 
+# Hosts kept in the shared connection pool, and the default connections kept
+# alive to each, enough for four accounts each making their four concurrent
+# requests.
+HTTP_POOL_HOSTS = 4
+HTTP_POOL_SIZE = 16
+
 MS365_STORAGE = "ms365_storage"
 MS365_STORAGE_TOKEN = ".MS365-token-cache"
 
@@ -4,9 +4,10 @@ from homeassistant.components.diagnostics import async_redact_data
 from homeassistant.const import CONF_CLIENT_ID, CONF_CLIENT_SECRET
 from homeassistant.core import HomeAssistant
 
+from .classes.api import connection_pool_stats
 from .classes.config_entry import MS365ConfigEntry
 from .const import CONF_SHARED_MAILBOX
-from .integration.diagnostics_integration import async_integration_diagnostics
+from .integration import diagnostics_integration
 
 TO_REDACT = {CONF_CLIENT_ID, CONF_CLIENT_SECRET, CONF_SHARED_MAILBOX}
 
@@ -23,8 +24,19 @@ async def async_get_config_entry_diagnostics(
         "config_requested_permissions": list(
             entry.runtime_data.permissions.requested_permissions
         ),
+        "connection_pool": connection_pool_stats(),
     }
-    if integration_diagnostics := await async_integration_diagnostics(hass, entry):
+    if (
+        integration_diagnostics
+        := await diagnostics_integration.async_integration_diagnostics(hass, entry)
+    ):
         response["YAML"] = integration_diagnostics
+    if hasattr(diagnostics_integration, "async_integration_runtime_diagnostics") and (
+        runtime_diagnostics
+        := await diagnostics_integration.async_integration_runtime_diagnostics(
+            hass, entry
+        )
+    ):
+        response["runtime"] = runtime_diagnostics
 
     return response
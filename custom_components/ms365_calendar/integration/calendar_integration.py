@@ -3,7 +3,6 @@
 from copy import deepcopy
 from datetime import datetime, timedelta
 import logging
-from operator import attrgetter
 from typing import Any, cast
 
 from homeassistant.components.calendar import (
@@ -160,8 +159,11 @@ class MS365CalendarEntity(MS365Entity, CalendarEntity):
         self._start_offset = entity.get(CONF_HOURS_BACKWARD_TO_GET)
         self._end_offset = entity.get(CONF_HOURS_FORWARD_TO_GET)
         self._event = None
+        self._vevent = None
         self.entity_id = entity_id
         self._data_attribute = []
+        self._data_events = None
+        self._written_status = None
 
         self._update_supported = update_supported
         if self._update_supported:
@@ -235,8 +237,8 @@ class MS365CalendarEntity(MS365Entity, CalendarEntity):
             get_hass_date(vevent.start, vevent.is_all_day),
             get_hass_date(get_end_date(vevent), vevent.is_all_day),
             vevent.subject,
-            clean_html(vevent.body),
-            vevent.location["displayName"],
+            clean_html(vevent.body, vevent.body_type),
+            vevent.location,
             uid=vevent.object_id,
         )
         if vevent.series_master_id:
@@ -244,52 +246,65 @@ class MS365CalendarEntity(MS365Entity, CalendarEntity):
         return event
 
     def _sort_events(self, events):
-        events = list(events)
-        for event in events:
-            event.start_sort = event.start
+        def start_sort(event):
             if event.is_all_day:
-                event.start_sort = dt_util.as_utc(
-                    dt_util.start_of_local_day(event.start)
-                )
-
-        events.sort(key=attrgetter("start_sort"))
+                return dt_util.as_utc(dt_util.start_of_local_day(event.start))
+            return event.start
 
-        return events
+        return sorted(events, key=start_sort)
 
     def _handle_coordinator_update(self) -> None:
-        self._update_status()
+        changed = self._update_status()
+        status = (self.coordinator.sync_state, self.available)
+        if not changed and status == self._written_status:
+            _LOGGER.debug("No changes for %s, state not written", self.name)
+            return
+        self._written_status = status
         self.async_write_ha_state()
 
     def _update_status(self):
-        """Do the update."""
+        """Do the update.
+
+        Returns whether the events in range or the current event have changed.
+        """
         _LOGGER.debug("Start update for %s", self.name)
 
         range_start = dt_util.utcnow() + timedelta(hours=self._start_offset)
         range_end = dt_util.utcnow() + timedelta(hours=self._end_offset)
-        self._build_extra_attributes(range_start, range_end)
-        self._get_current_event()
+        data_changed = self._build_extra_attributes(range_start, range_end)
+        event_changed = self._get_current_event()
 
         _LOGGER.debug("End update for %s", self.name)
+        return data_changed or event_changed
 
     def _get_current_event(self):
         vevent = self.coordinator.get_current_event()
+        if vevent == self._vevent:
+            return False
+        self._vevent = vevent
         if not vevent:
             _LOGGER.debug(
                 "No matching event found in the calendar results for %s",
                 self.entity_id,
             )
             self._event = None
-            return
+            return True
 
         self._event = deepcopy(self._build_calendar_event(vevent))
+        return True
 
     def _build_extra_attributes(self, range_start, range_end):
         if self.coordinator.data is not None:
             data_events = self.coordinator.data.overlapping(range_start, range_end)
-            data_events = self._sort_events(data_events)
+            # Unchanged events are the same records, so this is mostly identity checks
+            if data_events != self._data_events:
+                self._data_events = data_events
+                data_events = self._sort_events(data_events)
 
-            data = [format_event_data(event) for event in data_events]
-            self._data_attribute = data[: self._max_results]
+                data = [format_event_data(event) for event in data_events]
+                self._data_attribute = data[: self._max_results]
+                return True
+        return False
 
     async def async_create_event(self, **kwargs: Any) -> ServiceResponse:
         """Add a new event to calendar."""
@@ -355,7 +370,7 @@ class MS365CalendarEntity(MS365Entity, CalendarEntity):
         ).sync.store_service.async_add_event(subject, start, end, **kwargs)
 
         self._raise_event(EVENT_CREATE_CALENDAR_EVENT, event.object_id)
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_refresh_changed()
         return {"uid": event.object_id}
 
     async def async_modify_calendar_event(
@@ -388,7 +403,7 @@ class MS365CalendarEntity(MS365Entity, CalendarEntity):
             await self._async_update_calendar_event(
                 event_id, EVENT_MODIFY_CALENDAR_EVENT, subject, start, end, **kwargs
             )
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_refresh_changed()
 
     async def _async_update_calendar_event(
         self, event_id, ha_event, subject, start, end, **kwargs
@@ -422,7 +437,7 @@ class MS365CalendarEntity(MS365Entity, CalendarEntity):
             MS365CalendarSyncCoordinator, self.coordinator
         ).sync.store_service.async_delete_event(event_id)
         self._raise_event(ha_event, event_id)
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_refresh_changed()
 
     async def async_respond_calendar_event(
         self, event_id, response, send_response=True, message=None
@@ -435,7 +450,7 @@ class MS365CalendarEntity(MS365Entity, CalendarEntity):
 
         await self.api.async_send_response(event_id, response, send_response, message)
         self._raise_event(EVENT_RESPOND_CALENDAR_EVENT, event_id)
-        await self.coordinator.async_refresh()
+        await self.coordinator.async_refresh_changed()
 
     def _validate_calendar_permissions(self):
         self._validate_permissions(PERM_CALENDARS_READWRITE, PERM_CALENDARS_READWRITE)
@@ -10,15 +10,30 @@ from homeassistant.const import CONF_NAME
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import section
 import homeassistant.helpers.config_validation as cv
-from homeassistant.helpers.selector import BooleanSelector
+from homeassistant.helpers.selector import (
+    BooleanSelector,
+    SelectSelector,
+    SelectSelectorConfig,
+    SelectSelectorMode,
+)
 
 from ..classes.config_entry import MS365ConfigEntry
-from ..const import CONF_ENABLE_UPDATE, CONF_ENTITY_NAME, CONF_SHARED_MAILBOX
+from ..const import (
+    CONF_ENABLE_UPDATE,
+    CONF_ENTITY_NAME,
+    CONF_SHARED_MAILBOX,
+    HTTP_POOL_SIZE,
+)
 from ..helpers.utils import add_attribute_to_item
 from .const_integration import (
+    CONF_ADAPTIVE_POLLING,
     CONF_ADVANCED_OPTIONS,
+    CONF_ASYNC_TRANSPORT,
+    CONF_BATCH_REQUESTS,
     CONF_BASIC_CALENDAR,
     CONF_CALENDAR_LIST,
+    CONF_CHANGE_NOTIFICATIONS,
+    CONF_CONNECTION_POOL_SIZE,
     CONF_DAYS_BACKWARD,
     CONF_DAYS_FORWARD,
     CONF_DEVICE_ID,
@@ -27,14 +42,27 @@ from .const_integration import (
     CONF_HOURS_BACKWARD_TO_GET,
     CONF_HOURS_FORWARD_TO_GET,
     CONF_MAX_RESULTS,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MIN_UPDATE_INTERVAL,
+    CONF_PAGE_SIZE,
     CONF_SENSITIVITY_EXCLUDE,
+    CONF_SYNC_MODE,
     CONF_TRACK,
     CONF_TRACK_NEW_CALENDAR,
     CONF_UPDATE_INTERVAL,
+    DEFAULT_ADAPTIVE_POLLING,
+    DEFAULT_ASYNC_TRANSPORT,
+    DEFAULT_BATCH_REQUESTS,
+    DEFAULT_CHANGE_NOTIFICATIONS,
     DEFAULT_DAYS_BACKWARD,
     DEFAULT_DAYS_FORWARD,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_SYNC_MODE,
     DEFAULT_UPDATE_INTERVAL,
     YAML_CALENDARS_FILENAME,
+    SyncMode,
 )
 from .filemgmt_integration import (
     build_yaml_file_path,
@@ -46,6 +74,13 @@ from .filemgmt_integration import (
 from .utils_integration import async_delete_calendar
 
 BOOLEAN_SELECTOR = BooleanSelector()
+SYNC_MODE_SELECTOR = SelectSelector(
+    SelectSelectorConfig(
+        options=[mode.value for mode in SyncMode],
+        mode=SelectSelectorMode.DROPDOWN,
+        translation_key=CONF_SYNC_MODE,
+    )
+)
 
 
 def integration_reconfigure_schema(entry_data):
@@ -167,6 +202,34 @@ class MS365OptionsFlowHandler(config_entries.OptionsFlow):
                                         CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL
                                     ),
                                 ): vol.All(vol.Coerce(int), vol.Range(min=15, max=600)),
+                                vol.Optional(
+                                    CONF_ADAPTIVE_POLLING,
+                                    default=self.config_entry.options.get(
+                                        CONF_ADVANCED_OPTIONS, {}
+                                    ).get(
+                                        CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING
+                                    ),
+                                ): BOOLEAN_SELECTOR,
+                                vol.Optional(
+                                    CONF_MIN_UPDATE_INTERVAL,
+                                    default=self.config_entry.options.get(
+                                        CONF_ADVANCED_OPTIONS, {}
+                                    ).get(
+                                        CONF_MIN_UPDATE_INTERVAL,
+                                        DEFAULT_MIN_UPDATE_INTERVAL,
+                                    ),
+                                ): vol.All(vol.Coerce(int), vol.Range(min=15, max=600)),
+                                vol.Optional(
+                                    CONF_MAX_UPDATE_INTERVAL,
+                                    default=self.config_entry.options.get(
+                                        CONF_ADVANCED_OPTIONS, {}
+                                    ).get(
+                                        CONF_MAX_UPDATE_INTERVAL,
+                                        DEFAULT_MAX_UPDATE_INTERVAL,
+                                    ),
+                                ): vol.All(
+                                    vol.Coerce(int), vol.Range(min=60, max=3600)
+                                ),
                                 vol.Optional(
                                     CONF_DAYS_BACKWARD,
                                     default=self.config_entry.options.get(
@@ -179,6 +242,47 @@ class MS365OptionsFlowHandler(config_entries.OptionsFlow):
                                         CONF_ADVANCED_OPTIONS, {}
                                     ).get(CONF_DAYS_FORWARD, DEFAULT_DAYS_FORWARD),
                                 ): vol.All(vol.Coerce(int), vol.Range(min=-90, max=90)),
+                                vol.Optional(
+                                    CONF_SYNC_MODE,
+                                    default=self.config_entry.options.get(
+                                        CONF_ADVANCED_OPTIONS, {}
+                                    ).get(CONF_SYNC_MODE, DEFAULT_SYNC_MODE),
+                                ): SYNC_MODE_SELECTOR,
+                                vol.Optional(
+                                    CONF_PAGE_SIZE,
+                                    default=self.config_entry.options.get(
+                                        CONF_ADVANCED_OPTIONS, {}
+                                    ).get(CONF_PAGE_SIZE, DEFAULT_PAGE_SIZE),
+                                ): vol.All(vol.Coerce(int), vol.Range(min=10, max=999)),
+                                vol.Optional(
+                                    CONF_BATCH_REQUESTS,
+                                    default=self.config_entry.options.get(
+                                        CONF_ADVANCED_OPTIONS, {}
+                                    ).get(CONF_BATCH_REQUESTS, DEFAULT_BATCH_REQUESTS),
+                                ): BOOLEAN_SELECTOR,
+                                vol.Optional(
+                                    CONF_ASYNC_TRANSPORT,
+                                    default=self.config_entry.options.get(
+                                        CONF_ADVANCED_OPTIONS, {}
+                                    ).get(
+                                        CONF_ASYNC_TRANSPORT, DEFAULT_ASYNC_TRANSPORT
+                                    ),
+                                ): BOOLEAN_SELECTOR,
+                                vol.Optional(
+                                    CONF_CHANGE_NOTIFICATIONS,
+                                    default=self.config_entry.options.get(
+                                        CONF_ADVANCED_OPTIONS, {}
+                                    ).get(
+                                        CONF_CHANGE_NOTIFICATIONS,
+                                        DEFAULT_CHANGE_NOTIFICATIONS,
+                                    ),
+                                ): BOOLEAN_SELECTOR,
+                                vol.Optional(
+                                    CONF_CONNECTION_POOL_SIZE,
+                                    default=self.config_entry.options.get(
+                                        CONF_ADVANCED_OPTIONS, {}
+                                    ).get(CONF_CONNECTION_POOL_SIZE, HTTP_POOL_SIZE),
+                                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=64)),
                             }
                         ),
                         {"collapsed": True},
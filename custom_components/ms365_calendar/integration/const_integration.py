@@ -1,6 +1,6 @@
 """Calendar constants."""
 
-from enum import Enum
+from enum import Enum, StrEnum
 
 from homeassistant.const import Platform
 
@@ -13,6 +13,23 @@ class EventResponse(Enum):
     Decline = "decline"  # pylint: disable=invalid-name
 
 
+class BodyMode(StrEnum):
+    """Event body synchronisation mode."""
+
+    FULL = "full"
+    PREVIEW = "preview"
+    NONE = "none"
+
+
+class SyncMode(StrEnum):
+    """Event synchronisation mode."""
+
+    FULL = "full"
+    DELTA = "delta"
+    SLIDING = "sliding"
+    TIERED = "tiered"
+
+
 PLATFORMS: list[Platform] = [Platform.CALENDAR]
 DOMAIN = "ms365_calendar"
 
@@ -43,11 +60,17 @@ ATTR_TYPE = "type"
 
 CALENDAR_ENTITY_ID_FORMAT = "calendar.{}"
 
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
 CONF_ADVANCED_OPTIONS = "advanced_options"
+CONF_ASYNC_TRANSPORT = "async_transport"
 CONF_BASIC_CALENDAR = "basic_calendar"
+CONF_BATCH_REQUESTS = "batch_requests"
+CONF_BODY_MODE = "body_mode"
 CONF_CAL_ID = "cal_id"
 CONF_CALENDAR_LIST = "calendar_list"
 CONF_CAN_EDIT = "can_edit"
+CONF_CHANGE_NOTIFICATIONS = "change_notifications"
+CONF_CONNECTION_POOL_SIZE = "connection_pool_size"
 CONF_DAYS_BACKWARD = "days_backward"
 CONF_DAYS_FORWARD = "days_forward"
 CONF_DEVICE_ID = "device_id"
@@ -58,13 +81,31 @@ CONF_GROUPS = "groups"
 CONF_HOURS_BACKWARD_TO_GET = "start_offset"
 CONF_HOURS_FORWARD_TO_GET = "end_offset"
 CONF_MAX_RESULTS = "max_results"
+CONF_MAX_UPDATE_INTERVAL = "max_update_interval"
+CONF_MIN_UPDATE_INTERVAL = "min_update_interval"
+CONF_PAGE_SIZE = "page_size"
 CONF_SEARCH = "search"
 CONF_SENSITIVITY_EXCLUDE = "sensitivity_exclude"
+CONF_SYNC_MODE = "sync_mode"
 CONF_TRACK = "track"
 CONF_TRACK_NEW_CALENDAR = "track_new_calendar"
 CONF_UPDATE_INTERVAL = "update_interval"
 
 
+# Unchanged polls before the interval doubles, minutes ahead an event is
+# imminent and the fraction an interval is jittered by.
+ADAPTIVE_IDLE_POLLS = 5
+ADAPTIVE_IMMINENT = 30
+ADAPTIVE_JITTER = 0.1
+
+BATCH_MAX_REQUESTS = 20
+BATCH_MAX_RETRIES = 3
+BATCH_WINDOW = 0.5
+
+BODY_CACHE_SIZE = 200
+
+CLEAN_HTML_CACHE_SIZE = 512
+
 CONST_GROUP = "group:"
 
 DAYS = {
@@ -77,10 +118,22 @@ DAYS = {
     "SU": "sunday",
 }
 
+DEFAULT_ADAPTIVE_POLLING = False
+DEFAULT_ASYNC_TRANSPORT = False
+DEFAULT_BATCH_REQUESTS = False
+DEFAULT_BODY_MODE = BodyMode.FULL
+DEFAULT_CHANGE_NOTIFICATIONS = False
 DEFAULT_DAYS_BACKWARD = -8
 DEFAULT_DAYS_FORWARD = 8
+DEFAULT_MAX_UPDATE_INTERVAL = 900
+DEFAULT_MIN_UPDATE_INTERVAL = 30
+DEFAULT_PAGE_SIZE = 250
+DEFAULT_SYNC_MODE = SyncMode.FULL
 DEFAULT_UPDATE_INTERVAL = 60
 
+DELTA_LINK = "delta_link"
+DELTA_PAGE_SIZE = 100
+
 EVENT_CREATE_CALENDAR_EVENT = "create_calendar_event"
 EVENT_MODIFY_CALENDAR_EVENT = "modify_calendar_event"
 EVENT_MODIFY_CALENDAR_RECURRENCES = "modify_calendar_recurrences"
@@ -89,6 +142,13 @@ EVENT_REMOVE_CALENDAR_RECURRENCES = "remove_calendar_recurrences"
 EVENT_RESPOND_CALENDAR_EVENT = "respond_calendar_event"
 EVENT_SYNC = "event_sync"
 
+# Graph allows four concurrent requests per mailbox and 10,000 every ten
+# minutes, the rate is per second and the retry is used when Graph gives none.
+GOVERNOR_BURST = 20
+GOVERNOR_CONCURRENCY = 4
+GOVERNOR_RATE = 15
+GOVERNOR_RETRY_AFTER = 60
+
 INDEXES = {
     "+1": "first",
     "+2": "second",
@@ -98,10 +158,40 @@ INDEXES = {
 }
 ITEMS = "items"
 
+# Subscription lifetime and the renewal margin are in minutes, the interval
+# calendars are polled at while subscribed is in seconds.
+NOTIFICATION_LIFETIME = 4230
+NOTIFICATION_RENEW_MARGIN = 60
+NOTIFICATION_UPDATE_INTERVAL = 3600
+
 PERM_CALENDARS_READ = "Calendars.Read"
 PERM_CALENDARS_READBASIC = "Calendars.ReadBasic"
 PERM_CALENDARS_READWRITE = "Calendars.ReadWrite"
 PERM_GROUP_READ_ALL = "Group.Read.All"
 PERM_GROUP_READWRITE_ALL = "Group.ReadWrite.All"
 
+# Ranges fetched outside the synced window kept per calendar, and for how
+# many seconds. Ranges either side are prefetched for views up to the
+# prefetch span in days, enough for a month view.
+RANGE_CACHE_SIZE = 16
+RANGE_CACHE_TTL = 300
+RANGE_PREFETCH_SPAN = 42
+
+# Seconds between retrievals of the whole window by the sliding sync mode
+SLIDING_RECONCILE_INTERVAL = 3600
+SLIDING_RECONCILED = "sliding_reconciled"
+
+SYNC_WINDOW = "sync_window"
+
+# The tiered sync mode retrieves the hours ahead on every update, the hours
+# either side of now less often, and the whole window rarely. The intervals
+# are in seconds.
+TIER_FAR_INTERVAL = 14400
+TIER_NEAR_HOURS = 6
+TIER_WEEK_HOURS = 168
+TIER_WEEK_INTERVAL = 900
+TIERS_SYNCED = "tiers_synced"
+
+TRANSPORT_TIMEOUT = 30
+
 YAML_CALENDARS_FILENAME = "ms365_calendars{0}.yaml"
@@ -1,8 +1,10 @@
 """Calendar coordinator processing."""
 
+from bisect import bisect_right
 from collections.abc import Iterable
 from datetime import datetime, timedelta
 import logging
+import random
 
 from requests.exceptions import (
     ConnectionError as RequestConnectionError,
@@ -12,25 +14,38 @@ from requests.exceptions import (
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import STATE_OK, STATE_PROBLEM, STATE_UNKNOWN
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_track_point_in_utc_time
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 from homeassistant.util import dt as dt_util
-from O365.calendar import Event  # pylint: disable=no-name-in-module)
+from ical.timespan import Timespan
 
 from .const_integration import (
+    ADAPTIVE_IDLE_POLLS,
+    ADAPTIVE_IMMINENT,
+    ADAPTIVE_JITTER,
+    CONF_ADAPTIVE_POLLING,
     CONF_ADVANCED_OPTIONS,
     CONF_DAYS_BACKWARD,
     CONF_DAYS_FORWARD,
     CONF_HOURS_BACKWARD_TO_GET,
     CONF_HOURS_FORWARD_TO_GET,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MIN_UPDATE_INTERVAL,
     CONF_UPDATE_INTERVAL,
+    DEFAULT_ADAPTIVE_POLLING,
     DEFAULT_DAYS_BACKWARD,
     DEFAULT_DAYS_FORWARD,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_MIN_UPDATE_INTERVAL,
     DEFAULT_UPDATE_INTERVAL,
+    RANGE_PREFETCH_SPAN,
 )
+from .sync.event import MS365Event
+from .sync.range_cache import MS365RangeCache
 from .sync.sync import MS365CalendarEventSyncManager
-from .sync.timeline import MS365Timeline
+from .sync.timeline import MS365Timeline, timespan_of
 from .utils_integration import get_end_date, get_start_date
 
 _LOGGER = logging.getLogger(__name__)
@@ -53,7 +68,8 @@ class MS365CalendarSyncCoordinator(DataUpdateCoordinator):
         entity,
     ) -> None:
         """Create the CalendarSyncUpdateCoordinator."""
-        update_interval = entry.options.get(CONF_ADVANCED_OPTIONS, {}).get(
+        advanced_options = entry.options.get(CONF_ADVANCED_OPTIONS, {})
+        update_interval = advanced_options.get(
             CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL
         )
         super().__init__(
@@ -83,15 +99,82 @@ class MS365CalendarSyncCoordinator(DataUpdateCoordinator):
         self.entity = entity
         self._error = False
         self.sync_state = STATE_UNKNOWN
+        self._poll_interval = self.update_interval
+        self._safety_interval: timedelta | None = None
+        self._ranges = MS365RangeCache(hass)
+        self._transitions: list[datetime] = []
+        self._next_transition: datetime | None = None
+        self._unsub_transition: CALLBACK_TYPE | None = None
+        self._current_event: MS365Event | None = None
+        self._current_stale = True
+        self._scheduler = (
+            MS365PollScheduler(
+                update_interval,
+                advanced_options.get(
+                    CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL
+                ),
+                advanced_options.get(
+                    CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL
+                ),
+            )
+            if advanced_options.get(CONF_ADAPTIVE_POLLING, DEFAULT_ADAPTIVE_POLLING)
+            else None
+        )
+
+    def set_safety_interval(self, interval: timedelta | None) -> None:
+        """Poll at a fixed safety interval, or None to resume normal polling.
+
+        Used while MS Graph notifies the calendar's changes.
+        """
+        self._safety_interval = interval
+        self.update_interval = interval or self._poll_interval
+
+    async def async_refresh_changed(self) -> None:
+        """Refresh after an event is changed from Home Assistant.
+
+        The fetched ranges are dropped, the change may be outside the synced window,
+        and the whole synced window is retrieved.
+        """
+        self._ranges.clear()
+        self.sync.request_full_sync()
+        await self.async_refresh()
 
     async def _async_update_data(self) -> MS365Timeline:
         """Fetch data from API endpoint."""
+        changed = await self._async_sync()
+        timeline = await self.sync.async_get_timeline(dt_util.get_default_time_zone())
+        if changed or timeline is not self.data:
+            self._transitions = self._build_transitions(timeline)
+            self._current_stale = True
+        self._schedule_transition()
+        if self._scheduler is not None and self._safety_interval is None:
+            self.update_interval = self._scheduler.next_interval(changed, timeline)
+        return timeline
+
+        # self._upcoming_timeline = timeline
+        # return timeline
+
+    async def _async_sync(self) -> bool:
+        """Sync the events from MS Graph, returning True if any changed."""
+        if self._last_sync_min is None and await self._async_warm_start():
+            _LOGGER.debug("Serving %s from store, sync deferred", self.name)
+            return False
+        if self._last_sync_min is not None and (
+            retry_in := self.sync.api.governor.retry_in
+        ):
+            _LOGGER.debug(
+                "MS Graph is throttling %s, sync deferred for %.0f seconds",
+                self.name,
+                retry_in,
+            )
+            return False
+
         _LOGGER.debug("Started fetching %s data", self.name)
 
         self._last_sync_min = dt_util.now() + self._sync_event_min_time
         self._last_sync_max = dt_util.now() + self._sync_event_max_time
         try:
-            await self.sync.run(self._last_sync_min, self._last_sync_max)
+            changed = await self.sync.run(self._last_sync_min, self._last_sync_max)
             self.sync_state = STATE_OK
         except (HTTPError, RetryError, RequestConnectionError) as err:
             _LOGGER.error(
@@ -99,31 +182,95 @@ class MS365CalendarSyncCoordinator(DataUpdateCoordinator):
                 err,
             )
             self.sync_state = STATE_PROBLEM
+            return False
+        return changed
+
+    async def async_shutdown(self) -> None:
+        """Cancel any scheduled transition when shutting down."""
+        await super().async_shutdown()
+        if self._unsub_transition:
+            self._unsub_transition()
+            self._unsub_transition = None
+
+    def _build_transitions(self, timeline: MS365Timeline) -> list[datetime]:
+        """Return the instants the current event may change, in order.
 
-        return await self.sync.store_service.async_get_timeline(
-            dt_util.get_default_time_zone()
+        These are when events start and end, and when a timed event comes within
+        the day ahead that is looked at for an event not yet started.
+        """
+        transitions = set()
+        for event in timeline.overlapping(self._last_sync_min, self._last_sync_max):
+            timespan = timespan_of(event)
+            transitions.update(
+                (dt_util.as_utc(timespan.start), dt_util.as_utc(timespan.end))
+            )
+            if not event.is_all_day:
+                transitions.add(dt_util.as_utc(timespan.start) - timedelta(days=1))
+        return sorted(transitions)
+
+    def _schedule_transition(self, now: datetime | None = None) -> None:
+        """Schedule an update for the next time the current event may change."""
+        now = now or dt_util.utcnow()
+        if self._next_transition is not None and self._next_transition <= now:
+            self._current_stale = True
+        index = bisect_right(self._transitions, now)
+        next_transition = (
+            self._transitions[index] if index < len(self._transitions) else None
         )
+        if next_transition == self._next_transition:
+            return
+        if self._unsub_transition:
+            self._unsub_transition()
+            self._unsub_transition = None
+        self._next_transition = next_transition
+        if next_transition is not None:
+            self._unsub_transition = async_track_point_in_utc_time(
+                self.hass, self._handle_transition, next_transition
+            )
 
-        # self._upcoming_timeline = timeline
-        # return timeline
+    @callback
+    def _handle_transition(self, now: datetime) -> None:
+        """Update the calendars as an event starts or ends."""
+        self._unsub_transition = None
+        self._schedule_transition(now)
+        self.async_update_listeners()
+
+    async def _async_warm_start(self) -> bool:
+        """Use the events from the store at startup if they cover now.
+
+        The sync from MS Graph is left to the next scheduled update.
+        """
+        window = await self.sync.async_get_stored_window()
+        if not window or not window[0] <= dt_util.now() < window[1]:
+            return False
+        self._last_sync_min, self._last_sync_max = window
+        return True
 
     async def async_get_events(
         self, start_date: datetime, end_date: datetime
-    ) -> Iterable[Event]:
+    ) -> Iterable[MS365Event]:
         """Get all events in a specific time frame."""
         if not self.data:
             raise HomeAssistantError(
                 "Unable to get events: Sync from server has not completed"
             )
 
-        # If the request is for outside of the synced data, manually request it now,
-        # will not cache it though
+        # If the request is for outside of the synced data, fetch it now. Ranges are
+        # cached for a short while, with the synced window overlaid on them.
         if start_date < self._last_sync_min or end_date > self._last_sync_max:
             _LOGGER.debug(
                 "Fetch events from api - %s - %s - %s", self.name, start_date, end_date
             )
             try:
-                return await self.sync.async_list_events(start_date, end_date)
+                events = await self._ranges.async_get(
+                    start_date, end_date, self.sync.async_list_events
+                )
+                self._prefetch_adjacent(start_date, end_date)
+                return await self.sync.api.async_get_bodies(
+                    self._merge_synced(events, start_date, end_date),
+                    start_date,
+                    end_date,
+                )
             except (HTTPError, RetryError, RequestConnectionError) as err:
                 self._log_error(
                     "Error getting calendar event range "
@@ -137,13 +284,57 @@ class MS365CalendarSyncCoordinator(DataUpdateCoordinator):
             end_date,
         )
 
-        return self.data.overlapping(
+        return await self.sync.api.async_get_bodies(
+            self.data.overlapping(
+                start_date,
+                end_date,
+            ),
             start_date,
             end_date,
         )
 
+    def _prefetch_adjacent(self, start_date: datetime, end_date: datetime) -> None:
+        """Prefetch the ranges before and after, ready for the view to be moved."""
+        span = end_date - start_date
+        if (
+            span > timedelta(days=RANGE_PREFETCH_SPAN)
+            or self.sync.api.governor.retry_in
+        ):
+            return
+        for start in (start_date - span, end_date):
+            if start < self._last_sync_min or start + span > self._last_sync_max:
+                self._ranges.prefetch(start, start + span, self.sync.async_list_events)
+
+    def _merge_synced(
+        self, events: list[MS365Event], start_date: datetime, end_date: datetime
+    ) -> list[MS365Event]:
+        """Replace the fetched events in the synced window with the synced ones."""
+        window_start = max(start_date, self._last_sync_min)
+        window_end = min(end_date, self._last_sync_max)
+        if window_start >= window_end:
+            return events
+        window = Timespan.of(window_start, window_end)
+        merged = {
+            event.object_id: event
+            for event in events
+            if not timespan_of(event).intersects(window)
+        }
+        for event in self.data.overlapping(window_start, window_end):
+            merged[event.object_id] = event
+        return list(merged.values())
+
     def get_current_event(self):
-        """Get the current event."""
+        """Get the current event.
+
+        The event is only looked for again after the events have changed, or an
+        event has started or ended.
+        """
+        if self._current_stale:
+            self._current_event = self._find_current_event()
+            self._current_stale = False
+        return self._current_event
+
+    def _find_current_event(self):
 
         # Not possible to get this situation I beleieve
         # if not self.data:
@@ -236,3 +427,55 @@ class MS365CalendarSyncCoordinator(DataUpdateCoordinator):
             self._error = True
         else:
             _LOGGER.debug("Repeat error - %s - %s", error, err)
+
+
+class MS365PollScheduler:
+    """Chooses the interval until a calendar is next polled.
+
+    A calendar that changed on its last poll, or has an event starting or
+    ending soon, is polled at the minimum interval. Otherwise the interval
+    doubles after each run of unchanged polls, up to the maximum. Intervals
+    are jittered so that calendars drift apart rather than polling together,
+    and the first poll is offset by up to an interval so that calendars set up
+    together are spread out from the start.
+    """
+
+    def __init__(self, interval: int, min_interval: int, max_interval: int) -> None:
+        """Initialise the scheduler, the intervals are in seconds."""
+        self._interval = interval
+        self._min_interval = min_interval
+        self._max_interval = max(min_interval, max_interval)
+        self._backoff = interval
+        self._idle_polls = 0
+        self._started = False
+
+    def next_interval(self, changed: bool, timeline: MS365Timeline) -> timedelta:
+        """Return the interval until the next poll."""
+        if changed:
+            self._idle_polls = 0
+            self._backoff = self._interval
+        else:
+            self._idle_polls += 1
+            if self._idle_polls % ADAPTIVE_IDLE_POLLS == 0:
+                self._backoff = min(self._backoff * 2, self._max_interval)
+
+        if changed or _has_imminent_event(timeline):
+            seconds = self._min_interval
+        else:
+            seconds = min(max(self._backoff, self._min_interval), self._max_interval)
+        seconds *= random.uniform(1 - ADAPTIVE_JITTER, 1 + ADAPTIVE_JITTER)
+        if not self._started:
+            self._started = True
+            seconds += random.uniform(0, self._interval)
+        return timedelta(seconds=seconds)
+
+
+def _has_imminent_event(timeline: MS365Timeline) -> bool:
+    """Return True if an event starts or ends soon."""
+    now = dt_util.utcnow()
+    soon = now + timedelta(minutes=ADAPTIVE_IMMINENT)
+    return any(
+        now <= event.start <= soon or now <= event.end <= soon
+        for event in timeline.overlapping(now, soon)
+        if not event.is_all_day
+    )
@@ -28,3 +28,17 @@ async def async_integration_diagnostics(hass: HomeAssistant, entry: MS365ConfigE
         group = CONST_GROUP if key.startswith(CONST_GROUP) else ""
         redacted_calendars[f"**{group}REDACTED{i}**"] = calendars[key]
     return async_redact_data(redacted_calendars, TO_REDACT)
+
+
+async def async_integration_runtime_diagnostics(
+    hass: HomeAssistant, entry: MS365ConfigEntry
+):
+    """Get the state of the requests made to MS Graph for the account."""
+    coordinators = entry.runtime_data.coordinator
+    governors = {coordinator.sync.api.governor for coordinator in coordinators}
+    return {
+        "request_governors": [governor.as_dict() for governor in governors],
+        "event_paging": [
+            coordinator.sync.api.paging_as_dict() for coordinator in coordinators
+        ],
+    }
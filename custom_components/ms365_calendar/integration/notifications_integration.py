@@ -0,0 +1,265 @@
+"""Graph change notifications for the calendars of an account."""
+
+import asyncio
+from datetime import datetime, timedelta
+import functools as ft
+from http import HTTPStatus
+import logging
+import secrets
+from typing import Any
+
+from aiohttp.hdrs import METH_POST
+from aiohttp.web import Request, Response
+from requests.exceptions import ConnectionError as RequestConnectionError
+from requests.exceptions import HTTPError, RetryError
+
+from homeassistant.components import webhook
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.network import NoURLAvailableError
+from homeassistant.util import dt as dt_util
+
+from .const_integration import (
+    CONF_ADVANCED_OPTIONS,
+    CONF_UPDATE_INTERVAL,
+    DEFAULT_UPDATE_INTERVAL,
+    DOMAIN,
+    NOTIFICATION_LIFETIME,
+    NOTIFICATION_RENEW_MARGIN,
+    NOTIFICATION_UPDATE_INTERVAL,
+)
+from .coordinator_integration import MS365CalendarSyncCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+CHANGE_TYPES = "created,updated,deleted"
+DELETED = "deleted"
+LIFECYCLE_EVENT = "lifecycleEvent"
+REAUTHORIZATION_REQUIRED = "reauthorizationRequired"
+SUBSCRIPTION_REMOVED = "subscriptionRemoved"
+SUBSCRIPTIONS_ENDPOINT = "subscriptions"
+VALIDATION_TOKEN = "validationToken"
+
+
+class MS365ChangeNotifications:
+    """Subscribes to Graph change notifications for the calendars of an account.
+
+    Graph posts to a Home Assistant webhook when an event on a subscribed
+    calendar changes, and only the coordinator of that calendar is refreshed.
+    While a calendar is subscribed it is polled at a long safety interval, if
+    a subscription cannot be made or renewed the calendar is polled as before.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        account,
+        coordinators: list[MS365CalendarSyncCoordinator],
+    ) -> None:
+        """Initialise the change notifications."""
+        self._hass = hass
+        self._entry = entry
+        self._con = account.con
+        self._subscriptions_url = (
+            f"{account.protocol.service_url}{SUBSCRIPTIONS_ENDPOINT}"
+        )
+        self._coordinators = coordinators
+        self._webhook_id = webhook.async_generate_id()
+        self._client_state = secrets.token_urlsafe(32)
+        self._url: str | None = None
+        self._subscriptions: dict[str, MS365CalendarSyncCoordinator] = {}
+        self._renewals: dict[str, CALLBACK_TYPE] = {}
+        update_interval = entry.options.get(CONF_ADVANCED_OPTIONS, {}).get(
+            CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL
+        )
+        self._safety_interval = timedelta(
+            seconds=max(update_interval, NOTIFICATION_UPDATE_INTERVAL)
+        )
+
+    async def async_start(self, *_) -> None:
+        """Register the webhook and subscribe to each calendar.
+
+        Graph validates the webhook before creating a subscription, so this is
+        run once Home Assistant has started and is reachable.
+        """
+        try:
+            self._url = webhook.async_generate_url(
+                self._hass, self._webhook_id, allow_internal=False
+            )
+        except NoURLAvailableError:
+            _LOGGER.warning(
+                "No external URL available for change notifications, "
+                "calendars will be polled - %s",
+                self._entry.title,
+            )
+            return
+
+        webhook.async_register(
+            self._hass,
+            DOMAIN,
+            f"{self._entry.title} change notifications",
+            self._webhook_id,
+            self._async_handle_webhook,
+            allowed_methods=[METH_POST],
+        )
+        await asyncio.gather(
+            *(self._async_subscribe(coordinator) for coordinator in self._coordinators)
+        )
+
+    async def async_stop(self, *_) -> None:
+        """Unregister the webhook and remove the subscriptions.
+
+        Run at both unload and Home Assistant stop, whichever is first.
+        """
+        if self._url is None:
+            return
+        self._url = None
+        webhook.async_unregister(self._hass, self._webhook_id)
+        for cancel in self._renewals.values():
+            cancel()
+        subscriptions, self._subscriptions, self._renewals = self._subscriptions, {}, {}
+        await asyncio.gather(
+            *(self._async_delete(subscription_id) for subscription_id in subscriptions)
+        )
+
+    async def _async_subscribe(self, coordinator: MS365CalendarSyncCoordinator) -> None:
+        expiry = _expiry()
+        body = {
+            "changeType": CHANGE_TYPES,
+            "notificationUrl": self._url,
+            "lifecycleNotificationUrl": self._url,
+            "resource": coordinator.sync.api.events_resource,
+            "expirationDateTime": expiry.isoformat(),
+            "clientState": self._client_state,
+        }
+        try:
+            response = await self._hass.async_add_executor_job(
+                self._con.post, self._subscriptions_url, body
+            )
+        except (HTTPError, RetryError, RequestConnectionError) as err:
+            _LOGGER.warning(
+                "Unable to subscribe to change notifications, "
+                "calendar will be polled - %s - %s",
+                coordinator.name,
+                err,
+            )
+            coordinator.set_safety_interval(None)
+            return
+
+        _LOGGER.debug("Subscribed to change notifications - %s", coordinator.name)
+        self._track(response.json()["id"], coordinator, expiry)
+        coordinator.set_safety_interval(self._safety_interval)
+
+    async def _async_renew(self, subscription_id: str, *_) -> None:
+        if (coordinator := self._untrack(subscription_id)) is None:
+            return  # pragma: no cover
+        expiry = _expiry()
+        try:
+            await self._hass.async_add_executor_job(
+                self._con.patch,
+                f"{self._subscriptions_url}/{subscription_id}",
+                {"expirationDateTime": expiry.isoformat()},
+            )
+        except (HTTPError, RetryError, RequestConnectionError) as err:
+            _LOGGER.debug(
+                "Unable to renew change notifications, subscribing again - %s - %s",
+                coordinator.name,
+                err,
+            )
+            await self._async_subscribe(coordinator)
+            return
+
+        _LOGGER.debug("Renewed change notifications - %s", coordinator.name)
+        self._track(subscription_id, coordinator, expiry)
+
+    async def _async_resubscribe(self, subscription_id: str) -> None:
+        if (coordinator := self._untrack(subscription_id)) is not None:
+            await self._async_subscribe(coordinator)
+
+    async def _async_delete(self, subscription_id: str) -> None:
+        try:
+            await self._hass.async_add_executor_job(
+                self._con.delete, f"{self._subscriptions_url}/{subscription_id}"
+            )
+        except (HTTPError, RetryError, RequestConnectionError) as err:
+            _LOGGER.debug(
+                "Unable to remove change notification subscription - %s - %s",
+                subscription_id,
+                err,
+            )
+
+    def _track(
+        self,
+        subscription_id: str,
+        coordinator: MS365CalendarSyncCoordinator,
+        expiry: datetime,
+    ) -> None:
+        self._subscriptions[subscription_id] = coordinator
+        self._renewals[subscription_id] = async_track_point_in_utc_time(
+            self._hass,
+            ft.partial(self._async_renew, subscription_id),
+            expiry - timedelta(minutes=NOTIFICATION_RENEW_MARGIN),
+        )
+
+    def _untrack(self, subscription_id: str) -> MS365CalendarSyncCoordinator | None:
+        if (cancel := self._renewals.pop(subscription_id, None)) is not None:
+            cancel()
+        return self._subscriptions.pop(subscription_id, None)
+
+    async def _async_handle_webhook(
+        self, hass: HomeAssistant, webhook_id: str, request: Request
+    ) -> Response:
+        """Handle a validation request or notifications posted by Graph."""
+        if (token := request.query.get(VALIDATION_TOKEN)) is not None:
+            return Response(text=token, content_type="text/plain")
+
+        try:
+            data = await request.json()
+        except ValueError:
+            return Response(status=HTTPStatus.BAD_REQUEST)
+
+        for notification in data.get("value", []):
+            self._handle_notification(notification)
+        return Response(status=HTTPStatus.ACCEPTED)
+
+    @callback
+    def _handle_notification(self, notification: dict[str, Any]) -> None:
+        if not secrets.compare_digest(
+            str(notification.get("clientState")), self._client_state
+        ):
+            _LOGGER.debug("Ignoring change notification with unknown client state")
+            return
+        subscription_id = notification.get("subscriptionId")
+        if (coordinator := self._subscriptions.get(subscription_id)) is None:
+            return
+
+        lifecycle_event = notification.get(LIFECYCLE_EVENT)
+        _LOGGER.debug(
+            "Change notification - %s - %s",
+            coordinator.name,
+            lifecycle_event or notification.get("changeType"),
+        )
+        if lifecycle_event == REAUTHORIZATION_REQUIRED:
+            job = self._async_renew(subscription_id)
+        elif lifecycle_event == SUBSCRIPTION_REMOVED:
+            job = self._async_resubscribe(subscription_id)
+        else:
+            # A changed event is retrieved by the next sync of the calendar, the
+            # coordinator's debouncer merges a burst into one. Missed
+            # notifications have the whole window retrieved
+            if event_id := (notification.get("resourceData") or {}).get("id"):
+                coordinator.sync.request_event_sync(
+                    event_id, notification.get("changeType") == DELETED
+                )
+            else:
+                coordinator.sync.request_full_sync()
+            job = coordinator.async_request_refresh()
+        self._entry.async_create_background_task(
+            self._hass, job, f"{DOMAIN}.notification"
+        )
+
+
+def _expiry() -> datetime:
+    return dt_util.utcnow() + timedelta(minutes=NOTIFICATION_LIFETIME)
@@ -37,6 +37,7 @@ from .const_integration import (
     ATTR_SUBJECT,
     ATTR_TYPE,
     CONF_BASIC_CALENDAR,
+    CONF_BODY_MODE,
     CONF_CAL_ID,
     CONF_DEVICE_ID,
     CONF_ENTITIES,
@@ -48,6 +49,7 @@ from .const_integration import (
     CONF_SEARCH,
     CONF_SENSITIVITY_EXCLUDE,
     CONF_TRACK,
+    BodyMode,
     EventResponse,
 )
 
@@ -172,6 +174,7 @@ YAML_CALENDAR_ENTITY_SCHEMA = vol.Schema(
         vol.Optional(CONF_SENSITIVITY_EXCLUDE): vol.All(
             cv.ensure_list, [vol.Coerce(EventSensitivity)]
         ),
+        vol.Optional(CONF_BODY_MODE): vol.In(list(BodyMode)),
     }
 )
 
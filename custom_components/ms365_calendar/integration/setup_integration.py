@@ -1,28 +1,48 @@
 """Do configuration setup."""
 
+import asyncio
 import logging
 import os
 
 from requests.exceptions import HTTPError
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_ENTITY_ID, CONF_NAME
+from homeassistant.const import (
+    CONF_ENTITY_ID,
+    CONF_NAME,
+    EVENT_HOMEASSISTANT_STOP,
+)
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.start import async_at_started
 
 from ..classes.config_entry import MS365ConfigEntry
 from ..const import CONF_ENTITY_NAME
 from .const_integration import (
+    CONF_ADVANCED_OPTIONS,
+    CONF_ASYNC_TRANSPORT,
+    CONF_BATCH_REQUESTS,
+    CONF_BODY_MODE,
     CONF_CAL_ID,
     CONF_CAN_EDIT,
+    CONF_CHANGE_NOTIFICATIONS,
     CONF_DEVICE_ID,
     CONF_ENTITIES,
     CONF_ENTITY,
     CONF_EXCLUDE,
+    CONF_PAGE_SIZE,
     CONF_SEARCH,
     CONF_SENSITIVITY_EXCLUDE,
+    CONF_SYNC_MODE,
     CONF_TRACK,
+    DEFAULT_ASYNC_TRANSPORT,
+    DEFAULT_BATCH_REQUESTS,
+    DEFAULT_BODY_MODE,
+    DEFAULT_CHANGE_NOTIFICATIONS,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_SYNC_MODE,
     PLATFORMS,
     YAML_CALENDARS_FILENAME,
+    BodyMode,
 )
 from .coordinator_integration import MS365CalendarSyncCoordinator
 from .filemgmt_integration import (
@@ -30,11 +50,14 @@ from .filemgmt_integration import (
     build_yaml_filename,
     load_yaml_file,
 )
+from .notifications_integration import MS365ChangeNotifications
 from .schema_integration import YAML_CALENDAR_DEVICE_SCHEMA
-from .store_integration import LocalCalendarStore
+from .store_integration import LocalCalendarStoreManifest
 from .sync.api import MS365CalendarService, async_scan_for_calendars
-from .sync.store import ScopedCalendarStore
-from .sync.sync import MS365CalendarEventSyncManager
+from .sync.batch import MS365BatchDispatcher
+from .sync.governor import MS365RequestGovernor
+from .sync.sync import MS365CalendarEventSyncManager, plan_exclude
+from .sync.transport import MS365AsyncTransport
 from .utils_integration import async_delete_calendar, build_calendar_entity_id
 
 _LOGGER = logging.getLogger(__name__)
@@ -57,14 +80,34 @@ async def async_do_setup(hass: HomeAssistant, entry: ConfigEntry, account):
     return coordinators, keys, PLATFORMS
 
 
+async def async_extra_platform_setup(hass: HomeAssistant, entry: MS365ConfigEntry):
+    """Start change notifications for the calendars, if enabled."""
+    if not entry.options.get(CONF_ADVANCED_OPTIONS, {}).get(
+        CONF_CHANGE_NOTIFICATIONS, DEFAULT_CHANGE_NOTIFICATIONS
+    ):
+        return
+
+    notifications = MS365ChangeNotifications(
+        hass,
+        entry,
+        entry.runtime_data.ha_account.account,
+        entry.runtime_data.coordinator,
+    )
+    entry.async_on_unload(notifications.async_stop)
+    entry.async_on_unload(
+        hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, notifications.async_stop)
+    )
+    entry.async_on_unload(async_at_started(hass, notifications.async_start))
+
+
 async def async_integration_remove_entry(hass: HomeAssistant, entry: MS365ConfigEntry):
     """Integration specific entry removal."""
     yaml_filename = build_yaml_filename(entry, YAML_CALENDARS_FILENAME)
     yaml_filepath = build_yaml_file_path(hass, yaml_filename)
     if os.path.exists(yaml_filepath):
         await hass.async_add_executor_job(os.remove, yaml_filepath)
-    store = LocalCalendarStore(hass, entry.entry_id)
-    await store.async_remove()
+    manifest = LocalCalendarStoreManifest(hass, entry.entry_id)
+    await manifest.async_remove()
 
 
 async def _async_delete_calendar_entities(
@@ -87,22 +130,76 @@ async def _async_setup_coordinators(
         load_yaml_file, yaml_filepath, CONF_CAL_ID, YAML_CALENDAR_DEVICE_SCHEMA
     )
 
-    local_store = LocalCalendarStore(hass, entry.entry_id)
+    manifest = LocalCalendarStoreManifest(hass, entry.entry_id)
+    sync_mode = entry.options.get(CONF_ADVANCED_OPTIONS, {}).get(
+        CONF_SYNC_MODE, DEFAULT_SYNC_MODE
+    )
+    page_size = entry.options.get(CONF_ADVANCED_OPTIONS, {}).get(
+        CONF_PAGE_SIZE, DEFAULT_PAGE_SIZE
+    )
+    governor = MS365RequestGovernor()
+    dispatcher = (
+        MS365BatchDispatcher(hass, account, governor)
+        if entry.options.get(CONF_ADVANCED_OPTIONS, {}).get(
+            CONF_BATCH_REQUESTS, DEFAULT_BATCH_REQUESTS
+        )
+        else None
+    )
+    transport = (
+        MS365AsyncTransport(hass, account)
+        if entry.options.get(CONF_ADVANCED_OPTIONS, {}).get(
+            CONF_ASYNC_TRANSPORT, DEFAULT_ASYNC_TRANSPORT
+        )
+        else None
+    )
+
+    async def _async_setup_coordinator(cal_id, entity, entity_id):
+        exclude_subjects, exclude = plan_exclude(entity.get(CONF_EXCLUDE))
+        try:
+            api = MS365CalendarService(
+                hass,
+                account,
+                cal_id,
+                entity.get(CONF_SENSITIVITY_EXCLUDE),
+                entity.get(CONF_SEARCH),
+                entity_id,
+                dispatcher,
+                transport,
+                BodyMode(entity.get(CONF_BODY_MODE, DEFAULT_BODY_MODE)),
+                governor,
+                exclude_subjects,
+                page_size,
+            )
+            if not await api.async_calendar_init(scanned.get(cal_id)):
+                return None
+            unique_id = f"{entity.get(CONF_NAME)}"
+            sync_manager = MS365CalendarEventSyncManager(
+                api,
+                cal_id,
+                store=await manifest.async_get_shard(unique_id),
+                exclude=exclude,
+                sync_mode=sync_mode,
+            )
+            return MS365CalendarSyncCoordinator(
+                hass, entry, sync_manager, unique_id, entity
+            )
+        except HTTPError:
+            _LOGGER.warning(
+                "No permission for calendar, please remove - Name: %s; Device: %s;",
+                entity[CONF_NAME],
+                entity[CONF_DEVICE_ID],
+            )
+            return None
 
-    coordinators = []
+    # The calendars are set up together, the governor bounds the requests made
+    scanned = {calendar.calendar_id: calendar for calendar in scanned_calendars}
+    setups = []
     keys = []
     for cal_id, calendar in calendars.items():
         for entity in calendar.get(CONF_ENTITIES):
             if not entity[CONF_TRACK]:
                 continue
-            can_edit = next(
-                (
-                    scanned_calendar.can_edit
-                    for scanned_calendar in scanned_calendars
-                    if scanned_calendar.calendar_id == cal_id
-                ),
-                True,
-            )
+            can_edit = scanned[cal_id].can_edit if cal_id in scanned else True
             entity_id = build_calendar_entity_id(
                 entity.get(CONF_DEVICE_ID), entry.data[CONF_ENTITY_NAME]
             )
@@ -114,34 +211,15 @@ async def _async_setup_coordinators(
                     CONF_CAN_EDIT: can_edit,
                 }
             )
-            try:
-                api = MS365CalendarService(
-                    hass,
-                    account,
-                    cal_id,
-                    entity.get(CONF_SENSITIVITY_EXCLUDE),
-                    entity.get(CONF_SEARCH),
-                    entity_id,
-                )
-                if await api.async_calendar_init():
-                    unique_id = f"{entity.get(CONF_NAME)}"
-                    sync_manager = MS365CalendarEventSyncManager(
-                        api,
-                        cal_id,
-                        store=ScopedCalendarStore(local_store, unique_id),
-                        exclude=entity.get(CONF_EXCLUDE),
-                    )
-                    coordinators.append(
-                        MS365CalendarSyncCoordinator(
-                            hass, entry, sync_manager, unique_id, entity
-                        )
-                    )
-            except HTTPError:
-                _LOGGER.warning(
-                    "No permission for calendar, please remove - Name: %s; Device: %s;",
-                    entity[CONF_NAME],
-                    entity[CONF_DEVICE_ID],
-                )
-                continue
+            setups.append(_async_setup_coordinator(cal_id, entity, entity_id))
+
+    coordinators = [
+        coordinator
+        for coordinator in await asyncio.gather(*setups)
+        if coordinator is not None
+    ]
 
+    # A calendar that failed to set up keeps its store, only those no longer
+    # tracked are removed
+    await manifest.async_prune([f"{key[CONF_ENTITY].get(CONF_NAME)}" for key in keys])
     return coordinators, keys
@@ -1,68 +1,122 @@
 """MS365 Calendar local storage."""
 
-from datetime import datetime
-import json
+import asyncio
+import hashlib
 import logging
 from typing import Any
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
 
-from .const_integration import DOMAIN
+from .const_integration import DOMAIN, EVENT_SYNC, ITEMS
+from .sync.event import MS365Event
 from .sync.store import CalendarStore
 
-STORAGE_KEY_FORMAT = "{domain}.Storage-{entry_id}"
-STORAGE_VERSION = 1
+MANIFEST_KEY_FORMAT = "{domain}.Storage-{entry_id}"
+MANIFEST_VERSION = 2
+SHARD_KEY_FORMAT = "{domain}.Storage-{entry_id}.{shard}"
+SHARD_VERSION = 3
+SHARDS = "shards"
 # Buffer writes every few minutes (plus guaranteed to be written at shutdown)
 STORAGE_SAVE_DELAY_SECONDS = 120
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class JSONEncoder(json.JSONEncoder):
-    """Encoder for serialising an event."""
+class LocalCalendarStoreManifest:
+    """Manifest of the per calendar stores for a config entry.
 
-    def default(self, o):
-        """Default method for the JSONEncoder."""
-        attributes = {}
+    Each calendar is persisted in its own shard so that a save only writes the
+    calendar that changed. The manifest records the shards that exist.
+    """
 
-        if not hasattr(o, "__dict__"):
-            return None
-        for k, v in vars(o).items():
-            key = _beautify_key(k)
-            if key not in [
-                "con",
-                "protocol",
-                "main_resource",
-                "untrack",
-            ] and not key.startswith("_"):
-                if isinstance(v, datetime):
-                    val = str(v)
-                elif hasattr(v, "value"):
-                    val = v.value
-                else:
-                    val = v
-                attributes[key] = val
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize LocalCalendarStoreManifest."""
+        self._hass = hass
+        self._entry_id = entry_id
+        self._store = CacheStore(
+            hass,
+            MANIFEST_VERSION,
+            MANIFEST_KEY_FORMAT.format(domain=DOMAIN, entry_id=entry_id),
+            private=True,
+        )
+        self._manifest: dict[str, Any] | None = None
+        # The calendars are set up together, they must share one manifest
+        self._lock = asyncio.Lock()
+
+    async def _async_load(self) -> dict[str, Any]:
+        async with self._lock:
+            if self._manifest is None:
+                self._manifest = await self._store.async_load() or {}
+                self._manifest.setdefault(SHARDS, {})
+        return self._manifest
+
+    async def async_get_shard(self, key: str) -> "LocalCalendarStore":
+        """Get the store for a calendar, adding it to the manifest if needed."""
+        manifest = await self._async_load()
+        storage_key = shard_storage_key(self._entry_id, key)
+        if (old_key := manifest[SHARDS].get(key)) != storage_key:
+            if old_key is not None:
+                # Shards were keyed by the name alone, the events are resynced
+                await LocalCalendarStore(self._hass, old_key).async_remove()
+            manifest[SHARDS][key] = storage_key
+            await self._store.async_save(manifest)
+        return LocalCalendarStore(self._hass, storage_key)
+
+    async def async_prune(self, keys: list[str]) -> None:
+        """Remove the shards for calendars that are no longer synced."""
+        manifest = await self._async_load()
+        unused = [key for key in manifest[SHARDS] if key not in keys]
+        if not unused:
+            return
+        for key in unused:
+            _LOGGER.debug("Remove unused store - %s", key)
+            await LocalCalendarStore(
+                self._hass, manifest[SHARDS].pop(key)
+            ).async_remove()
+        await self._store.async_save(manifest)
+
+    async def async_remove(self) -> None:
+        """Remove all shards and the manifest."""
+        manifest = await self._async_load()
+        for storage_key in manifest[SHARDS].values():
+            await LocalCalendarStore(self._hass, storage_key).async_remove()
+        await self._store.async_remove()
 
-        return attributes
 
+def shard_storage_key(entry_id: str, key: str) -> str:
+    """Return the storage key of the shard for a calendar.
 
-def _beautify_key(key):
-    index = key.find("__")
-    return key if index <= 0 else key[index + 2 :]
+    A digest of the name is included, so that names differing only in case or
+    punctuation are not stored in the same shard.
+    """
+    digest = hashlib.sha256(key.encode()).hexdigest()[:8]
+    return SHARD_KEY_FORMAT.format(
+        domain=DOMAIN, entry_id=entry_id, shard=f"{slugify(key)}_{digest}"
+    )
+
+
+class CacheStore(Store[dict[str, Any]]):
+    """Store for cached data, which is discarded when its format changes."""
+
+    async def _async_migrate_func(
+        self, old_major_version: int, old_minor_version: int, old_data: dict
+    ) -> dict[str, Any]:
+        """Discard data in an old format, it is rebuilt by the next sync."""
+        return {}
 
 
 class LocalCalendarStore(CalendarStore):
-    """Storage for local persistence of calendar and event data."""
+    """Storage for local persistence of a calendar's event data."""
 
-    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+    def __init__(self, hass: HomeAssistant, storage_key: str) -> None:
         """Initialize LocalCalendarStore."""
-        self._store = Store[dict[str, Any]](
+        self._store = CacheStore(
             hass,
-            STORAGE_VERSION,
-            STORAGE_KEY_FORMAT.format(domain=DOMAIN, entry_id=entry_id),
+            SHARD_VERSION,
+            storage_key,
             private=True,
-            encoder=JSONEncoder,
         )
         self._data: dict[str, Any] | None = None
 
@@ -70,7 +124,7 @@ class LocalCalendarStore(CalendarStore):
         """Load data."""
         if self._data is None:
             _LOGGER.debug("Load from store")
-            self._data = await self._store.async_load() or {}
+            self._data = _decode(await self._store.async_load() or {})
         return self._data
 
     async def async_save(self, data: dict[str, Any]) -> None:
@@ -80,10 +134,50 @@ class LocalCalendarStore(CalendarStore):
         def provide_data() -> dict:
             _LOGGER.debug("Delayed save data")
 
-            return data
+            return _encode(data)
 
         self._store.async_delay_save(provide_data, STORAGE_SAVE_DELAY_SECONDS)
 
     async def async_remove(self) -> None:
         """Remove data."""
         await self._store.async_remove()
+
+
+def _encode(data: dict[str, Any]) -> dict[str, Any]:
+    """Convert the events to plain JSON values.
+
+    Without a custom encoder, the store is written with HA's orjson encoder
+    rather than json.dumps calling back into Python for every event.
+    """
+    return {
+        **data,
+        EVENT_SYNC: {
+            calendar_id: {
+                **calendar_data,
+                ITEMS: {
+                    key: item.to_store()
+                    for key, item in calendar_data.get(ITEMS, {}).items()
+                },
+            }
+            for calendar_id, calendar_data in data.get(EVENT_SYNC, {}).items()
+        },
+    }
+
+
+def _decode(data: dict[str, Any]) -> dict[str, Any]:
+    """Rebuild the stored events, so they can be served before the first sync."""
+    calendars = data.get(EVENT_SYNC, {})
+    for calendar_id, calendar_data in calendars.items():
+        try:
+            calendar_data[ITEMS] = {
+                key: MS365Event.from_store(item)
+                for key, item in calendar_data.get(ITEMS, {}).items()
+            }
+        except (KeyError, TypeError, ValueError) as err:
+            _LOGGER.warning(
+                "Stored events for %s could not be read, discarding - %s",
+                calendar_id,
+                err,
+            )
+            calendars[calendar_id] = {}
+    return data
@@ -1,22 +1,32 @@
 """Items that relate to gcal_sync.api."""
 
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from dataclasses import replace
 import functools as ft
 import logging
 from typing import Any, cast
 
+from requests.exceptions import ConnectionError as RequestConnectionError
 from requests.exceptions import HTTPError, RetryError
 
 from homeassistant.core import HomeAssistant
 from O365.calendar import Event  # pylint: disable=no-name-in-module
+from O365.utils import NEXT_LINK_KEYWORD  # pylint: disable=no-name-in-module
 from O365.utils.query import (  # pylint: disable=no-name-in-module, import-error
     QueryBuilder,
 )
 
 from ...classes.config_entry import MS365ConfigEntry
 from ..const_integration import (
+    BODY_CACHE_SIZE,
     CONF_TRACK_NEW_CALENDAR,
     CONST_GROUP,
+    DEFAULT_BODY_MODE,
+    DEFAULT_PAGE_SIZE,
+    DELTA_PAGE_SIZE,
     ITEMS,
+    BodyMode,
     EventResponse,
 )
 from ..filemgmt_integration import (
@@ -24,11 +34,20 @@ from ..filemgmt_integration import (
     async_update_calendar_file,
 )
 from ..utils_integration import add_call_data_to_event
+from .batch import MS365BatchDispatcher
+from .event import MS365Event
+from .governor import MS365RequestGovernor
 from .store import CalendarStore
 from .timeline import MS365Timeline, calendar_timeline
+from .transport import MS365AsyncTransport
 
 _LOGGER = logging.getLogger(__name__)
 
+BODY_FIELDS = {BodyMode.FULL: ("body",), BodyMode.PREVIEW: ("body_preview",)}
+DELTA_LINK_KEYWORD = "@odata.deltaLink"
+REMOVED_KEYWORD = "@removed"
+SERIES_MASTER = "seriesMaster"
+
 
 class MS365CalendarService:
     """Calendar service interface to MS365.
@@ -45,6 +64,12 @@ class MS365CalendarService:
         sensitivity_exclude,
         search,
         entity_id,
+        dispatcher: MS365BatchDispatcher | None = None,
+        transport: MS365AsyncTransport | None = None,
+        body_mode: BodyMode = DEFAULT_BODY_MODE,
+        governor: MS365RequestGovernor | None = None,
+        exclude_subjects: list[str] | None = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
     ) -> None:
         """Init the MS365 Calendar service."""
         self.hass = hass
@@ -53,13 +78,41 @@ class MS365CalendarService:
         self._account = account
         self.group_calendar = calendar_id.startswith(CONST_GROUP)
         self._sensitivity_exclude = sensitivity_exclude
-        self._limit = 999
+        self._page_size = page_size
+        self._last_listing = (0, 0)
         self._search = search
         self._builder = QueryBuilder(protocol=account.protocol)
         self._entity_id = entity_id
+        self._dispatcher = dispatcher
+        self._transport = transport
+        self._body_mode = body_mode
+        self.governor = governor or MS365RequestGovernor()
+        self._exclude_subjects = exclude_subjects or []
+        self._bodies: OrderedDict[str, tuple[str | None, str, str]] = OrderedDict()
+        self._body_cache_size = BODY_CACHE_SIZE
+
+    @property
+    def delta_supported(self) -> bool:
+        """Return whether the calendar supports delta queries.
+
+        Graph does not offer calendarView/delta for group calendars.
+        """
+        return not self.group_calendar
 
-    async def async_calendar_init(self):
-        """Async init of calendar data."""
+    @property
+    def events_resource(self) -> str:
+        """Return the Graph resource for the calendar's events.
+
+        Used as the resource of a change notification subscription.
+        """
+        return self._events_url().removeprefix(self._account.protocol.service_url)
+
+    async def async_calendar_init(self, calendar=None):
+        """Async init of calendar data.
+
+        A calendar already returned by the calendar scan is used as it is, rather
+        than requesting it again.
+        """
 
         if self.group_calendar:
             self.calendar = await self.hass.async_add_executor_job(
@@ -67,14 +120,19 @@ class MS365CalendarService:
             )
             return True
 
+        if calendar is not None:
+            self.calendar = calendar
+            return True
+
         schedule = await self.hass.async_add_executor_job(self._account.schedule)
         query = self._builder.select("name", "id", "canEdit", "color", "hexColor")
         try:
-            self.calendar = await self.hass.async_add_executor_job(
-                ft.partial(
-                    schedule.get_calendar, calendar_id=self.calendar_id, query=query
+            async with self.governor.async_request():
+                self.calendar = await self.hass.async_add_executor_job(
+                    ft.partial(
+                        schedule.get_calendar, calendar_id=self.calendar_id, query=query
+                    )
                 )
-            )
 
         except (HTTPError, RetryError, ConnectionError) as err:
             _LOGGER.warning(
@@ -92,12 +150,219 @@ class MS365CalendarService:
         """Get specific event."""
         return await self.hass.async_add_executor_job(self.calendar.get_event, event_id)
 
-    async def async_list_events(self, start_date, end_date):
-        """Get the events for the calendar."""
+    async def async_list_event_pages(
+        self, start_date, end_date
+    ) -> AsyncIterator[list[MS365Event]]:
+        """Get the events for the calendar, a page at a time.
+
+        Each page is yielded as it arrives, following the next link until the
+        range is complete.
+        """
 
-        query = self._builder.select(
+        query = self._builder.select(*self._event_fields())
+
+        if self._search is not None:
+            query = query & self._builder.contains("subject", self._search)
+        # As at March 2023 not contains is not supported by Graph API
+        # if self._exclude is not None:
+        #     query.chain("and").on_attribute("subject").negate().contains(self._exclude)
+        if self._sensitivity_exclude is not None:
+            for item in self._sensitivity_exclude:
+                query = query & self._builder.unequal("sensitivity", item.value)
+        for subject in self._exclude_subjects:
+            query = query & self._builder.unequal("subject", subject.replace("'", "''"))
+
+        url = self._calendar_view_url()
+        params = {
+            "$top": self._page_size,
+            "startDateTime": start_date.isoformat(),
+            "endDateTime": end_date.isoformat(),
+        }
+        params.update(query.as_params())
+
+        pages = count = 0
+        while url:
+            data = await self._async_get(url, params)
+            page = [
+                MS365Event.from_graph(self.calendar, item, self._body_mode)
+                for item in data.get("value", [])
+            ]
+            pages += 1
+            count += len(page)
+            yield page
+            url = data.get(NEXT_LINK_KEYWORD)
+            params = None
+        self._last_listing = (pages, count)
+
+    def paging_as_dict(self) -> dict[str, Any]:
+        """Return the paging of the event listings for diagnostics."""
+        pages, events = self._last_listing
+        return {
+            "entity_id": self._entity_id,
+            "page_size": self._page_size,
+            "last_pages": pages,
+            "last_events": events,
+        }
+
+    async def async_list_events_delta(self, start_date, end_date, delta_link=None):
+        """Get the events changed since the delta link was issued.
+
+        Without a delta link a new delta sync is started for the window. Returns
+        the added/updated events, the ids of removed events and the delta link to
+        use for the next call.
+        """
+        if delta_link:
+            url = delta_link
+            params = None
+        else:
+            url = self.calendar.build_url(
+                f"/calendars/{self.calendar.calendar_id}/calendarView/delta"
+            )
+            params = {
+                "startDateTime": start_date.isoformat(),
+                "endDateTime": end_date.isoformat(),
+            }
+        headers = {"Prefer": f"odata.maxpagesize={DELTA_PAGE_SIZE}"}
+
+        events = []
+        removed = []
+        new_delta_link = None
+        while url:
+            data = await self._async_get(url, params, headers)
+            for item in data.get("value", []):
+                if REMOVED_KEYWORD in item:
+                    removed.append(item["id"])
+                    continue
+                event = MS365Event.from_graph(self.calendar, item, self._body_mode)
+                # Delta queries do not support $filter so apply it here
+                if self._query_matches(event):
+                    events.append(event)
+                else:
+                    removed.append(event.object_id)
+            url = data.get(NEXT_LINK_KEYWORD)
+            params = None
+            new_delta_link = data.get(DELTA_LINK_KEYWORD, new_delta_link)
+
+        return events, removed, new_delta_link
+
+    async def async_get_bodies(
+        self, events: list[MS365Event], start_date, end_date
+    ) -> list[MS365Event]:
+        """Return the events in the range with their full body.
+
+        When the calendar is synced without full bodies, they are fetched the
+        first time they are needed and cached until the event changes. The
+        bodies missing are fetched together, for the whole range at once, and
+        the cache grows to hold the largest range fetched.
+        """
+        if self._body_mode == BodyMode.FULL:
+            return events
+
+        bodies = {event.object_id: self._cached_body(event) for event in events}
+        missing = {
+            event.object_id for event in events if bodies[event.object_id] is None
+        }
+        if missing:
+            _LOGGER.debug("Fetch %s event bodies - %s", len(missing), self._entity_id)
+            fetched = await self._async_get_bodies(start_date, end_date)
+            bodies.update(
+                (event_id, fetched[event_id])
+                for event_id in missing
+                if event_id in fetched
+            )
+
+        return [
+            replace(event, body=body[0], body_type=body[1])
+            if (body := bodies[event.object_id])
+            else event
+            for event in events
+        ]
+
+    def _cached_body(self, event: MS365Event) -> tuple[str, str] | None:
+        cached = self._bodies.get(event.object_id)
+        if cached is None or cached[0] != event.change_key:
+            return None
+        self._bodies.move_to_end(event.object_id)
+        return cached[1:]
+
+    async def _async_get_bodies(
+        self, start_date, end_date
+    ) -> dict[str, tuple[str, str]]:
+        """Get the bodies of the events in the range, a page at a time."""
+        url = self._calendar_view_url()
+        params = {
+            "$top": self._page_size,
+            "startDateTime": start_date.isoformat(),
+            "endDateTime": end_date.isoformat(),
+            "$select": "body,changeKey",
+        }
+        bodies = {}
+        try:
+            while url:
+                data = await self._async_get(url, params)
+                for item in data.get("value", []):
+                    body = item.get("body") or {}
+                    content = (body.get("content", ""), body.get("contentType", "HTML"))
+                    bodies[item["id"]] = content
+                    self._bodies[item["id"]] = (item.get("changeKey"), *content)
+                    self._bodies.move_to_end(item["id"])
+                url = data.get(NEXT_LINK_KEYWORD)
+                params = None
+        except (HTTPError, RetryError, RequestConnectionError) as err:
+            _LOGGER.warning(
+                "Error getting event bodies - %s - %s", self._entity_id, err
+            )
+        # A range is not evicted by its own bodies, so it is not fetched again
+        self._body_cache_size = max(self._body_cache_size, len(bodies))
+        while len(self._bodies) > self._body_cache_size:
+            self._bodies.popitem(last=False)
+        return bodies
+
+    async def async_get_changed_events(
+        self, event_id: str, start_date, end_date
+    ) -> list[MS365Event]:
+        """Get an event notified as changed, or the occurrences of a changed series.
+
+        Only the occurrences in the range are retrieved, and the events not
+        matching the search or exclusions are left out. No events are returned
+        when the event no longer exists.
+        """
+        url = f"{self._events_url()}/{event_id}"
+        query = self._builder.select(*self._event_fields(), "type")
+        try:
+            data = await self._async_get(url, query.as_params())
+        except HTTPError as err:
+            # A 404 means the event has been deleted since the notification
+            if err.response is None or err.response.status_code != 404:
+                raise
+            return []
+
+        items = [data]
+        if data.get("type") == SERIES_MASTER:
+            items = []
+            url = f"{url}/instances"
+            params = {
+                "$top": self._page_size,
+                "startDateTime": start_date.isoformat(),
+                "endDateTime": end_date.isoformat(),
+                **query.as_params(),
+            }
+            while url:
+                data = await self._async_get(url, params)
+                items.extend(data.get("value", []))
+                url = data.get(NEXT_LINK_KEYWORD)
+                params = None
+
+        events = [
+            MS365Event.from_graph(self.calendar, item, self._body_mode)
+            for item in items
+        ]
+        return [event for event in events if self._query_matches(event)]
+
+    def _event_fields(self) -> tuple[str, ...]:
+        return (
             "subject",
-            "body",
+            *BODY_FIELDS.get(self._body_mode, ()),
             "start",
             "end",
             "is_all_day",
@@ -110,31 +375,50 @@ class MS365CalendarService:
             "series_master_id",
             "is_reminder_on",
             "reminderMinutesBeforeStart",
+            "change_key",
         )
 
-        if self._search is not None:
-            query = query & self._builder.contains("subject", self._search)
-        # As at March 2023 not contains is not supported by Graph API
-        # if self._exclude is not None:
-        #     query.chain("and").on_attribute("subject").negate().contains(self._exclude)
-        if self._sensitivity_exclude is not None:
-            for item in self._sensitivity_exclude:
-                query = query & self._builder.unequal("sensitivity", item.value)
+    def _events_url(self) -> str:
+        if self.group_calendar:
+            return self.calendar.build_url("/calendar/events")
+        return self.calendar.build_url(f"/calendars/{self.calendar.calendar_id}/events")
 
-        # try:
-        return await self.hass.async_add_executor_job(
-            ft.partial(
-                self.calendar.get_events,
-                limit=self._limit,
-                query=query,
-                include_recurring=True,
-                start_recurring=self._builder.greater_equal("start", start_date),
-                end_recurring=self._builder.less_equal("end", end_date),
-            )
+    def _calendar_view_url(self) -> str:
+        if self.group_calendar:
+            return self.calendar.build_url("/calendar/calendarView")
+        return self.calendar.build_url(
+            f"/calendars/{self.calendar.calendar_id}/calendarView"
         )
-        # except (HTTPError, RetryError, ConnectionError) as err:
-        #     self._log_error("Error getting calendar events for data", err)
-        #     return None
+
+    async def _async_get(self, url, params=None, headers=None) -> dict[str, Any]:
+        """Get a page of data from the transport configured for the account.
+
+        Requests with their own headers are not batched. Batches are paced by
+        the governor as they are sent.
+        """
+        if self._dispatcher is not None and headers is None:
+            return await self._dispatcher.async_get(url, params)
+        async with self.governor.async_request():
+            if self._transport is not None:
+                return await self._transport.async_get(url, params, headers)
+            response = await self.hass.async_add_executor_job(
+                ft.partial(self._account.con.get, url, params=params, headers=headers)
+            )
+        return response.json()
+
+    def _query_matches(self, event: MS365Event) -> bool:
+        if (
+            self._search is not None
+            and self._search.lower() not in (event.subject or "").lower()
+        ):
+            return False
+        if (event.subject or "").lower() in (
+            subject.lower() for subject in self._exclude_subjects
+        ):
+            return False
+        if self._sensitivity_exclude is not None:
+            return event.sensitivity not in self._sensitivity_exclude
+        return True
 
     async def async_create_event(self, subject, start, end, **kwargs) -> Event:
         """Add a new event to calendar."""
@@ -209,7 +493,7 @@ class MS365CalendarEventStoreService:
 
     async def _async_build_timeline(self, events_data, tzinfo) -> MS365Timeline:
         """Build the timeline of events, which can take some time to parse."""
-        event_objects = [cast(Event, data) for data in events_data.values()]
+        event_objects = [cast(MS365Event, data) for data in events_data.values()]
         return calendar_timeline(event_objects, tzinfo)
 
     async def async_add_event(self, subject, start, end, **kwargs):
@@ -0,0 +1,154 @@
+"""Graph JSON batching of requests for an account."""
+
+import asyncio
+from dataclasses import dataclass
+import logging
+from typing import Any
+from urllib.parse import urlencode
+
+from requests import Response
+from requests.exceptions import ConnectionError as RequestConnectionError
+from requests.exceptions import HTTPError, RetryError
+
+from homeassistant.core import HomeAssistant
+
+from ..const_integration import BATCH_MAX_REQUESTS, BATCH_MAX_RETRIES, BATCH_WINDOW
+from .governor import THROTTLED_STATUS, MS365RequestGovernor, retry_after
+
+_LOGGER = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "$batch"
+
+
+@dataclass
+class _BatchRequest:
+    """A request waiting to be sent in a batch."""
+
+    url: str
+    future: asyncio.Future
+    attempts: int = 0
+
+
+class MS365BatchDispatcher:
+    """Groups the GET requests for an account into Graph $batch calls.
+
+    Coordinators that are due in the same second refresh within half a second of
+    each other, so requests queued within the batch window are sent together, up
+    to 20 per batch. Each response is returned to the caller that queued it.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, account, governor: MS365RequestGovernor
+    ) -> None:
+        """Initialise the dispatcher."""
+        self._hass = hass
+        self._con = account.con
+        self._governor = governor
+        self._service_url = account.protocol.service_url.rstrip("/")
+        self._queue: list[_BatchRequest] = []
+        self._flush_task: asyncio.Task | None = None
+
+    async def async_get(self, url: str, params: dict | None = None) -> dict[str, Any]:
+        """Queue a GET request and return the JSON body of the response."""
+        if params:
+            url = f"{url}?{urlencode(params)}"
+        request = _BatchRequest(
+            url.removeprefix(self._service_url), self._hass.loop.create_future()
+        )
+        self._queue_request(request, BATCH_WINDOW)
+        return await request.future
+
+    def _queue_request(self, request: _BatchRequest, delay: float) -> None:
+        self._queue.append(request)
+        if self._flush_task is None:
+            self._flush_task = self._hass.async_create_task(
+                self._async_flush(delay), "ms365_calendar.batch"
+            )
+
+    async def _async_flush(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._flush_task = None
+        requests, self._queue = self._queue, []
+        await asyncio.gather(
+            *(
+                self._async_send(requests[offset : offset + BATCH_MAX_REQUESTS])
+                for offset in range(0, len(requests), BATCH_MAX_REQUESTS)
+            )
+        )
+
+    async def _async_send(self, requests: list[_BatchRequest]) -> None:
+        try:
+            retried = await self._async_send_batch(requests)
+        except Exception as err:  # noqa: BLE001
+            # Whatever went wrong, no caller is left waiting on the batch
+            if not isinstance(err, (HTTPError, RetryError, RequestConnectionError)):
+                err = HTTPError(f"Invalid batch response: {err!r}")
+            for request in requests:
+                _set_exception(request, err)
+            return
+        for request in requests:
+            if request not in retried:
+                _set_exception(
+                    request, HTTPError(f"No response in batch for url: {request.url}")
+                )
+
+    async def _async_send_batch(
+        self, requests: list[_BatchRequest]
+    ) -> list[_BatchRequest]:
+        """Send the requests in a batch, returning those queued to be retried."""
+        _LOGGER.debug("Sending batch of %s requests", len(requests))
+        body = {
+            "requests": [
+                {"id": str(index), "method": "GET", "url": request.url}
+                for index, request in enumerate(requests)
+            ]
+        }
+        try:
+            async with self._governor.async_request():
+                response = await self._hass.async_add_executor_job(
+                    self._con.post, f"{self._service_url}/{BATCH_ENDPOINT}", body
+                )
+        except (HTTPError, RetryError, RequestConnectionError) as err:
+            for request in requests:
+                _set_exception(request, err)
+            return []
+
+        throttled = []
+        for item in response.json().get("responses", []):
+            request = requests[int(item["id"])]
+            status = item["status"]
+            if status in THROTTLED_STATUS and request.attempts < BATCH_MAX_RETRIES:
+                throttled.append((request, retry_after(item.get("headers", {}))))
+            elif status >= 400:
+                _set_exception(request, _http_error(request, item))
+            elif not request.future.done():
+                request.future.set_result(item.get("body", {}))
+
+        if throttled:
+            # Only the throttled requests are retried, after the longest wait asked
+            wait = max(seconds for _, seconds in throttled)
+            self._governor.throttled(wait)
+            await asyncio.sleep(wait)
+            for request, _ in throttled:
+                request.attempts += 1
+                self._queue_request(request, 0)
+        return [request for request, _ in throttled]
+
+
+def _set_exception(request: _BatchRequest, err: Exception) -> None:
+    """Fail the request unless the caller has already gone away."""
+    if not request.future.done():
+        request.future.set_exception(err)
+
+
+def _http_error(request: _BatchRequest, item: dict[str, Any]) -> HTTPError:
+    """Build the error raised for a failed request within a batch."""
+    response = Response()
+    response.status_code = item["status"]
+    response.url = request.url
+    error = item.get("body", {}).get("error", {})
+    return HTTPError(
+        f"{item['status']} Error in batch: {error.get('message', '')} for url: "
+        f"{request.url}",
+        response=response,
+    )
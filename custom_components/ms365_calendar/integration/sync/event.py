@@ -0,0 +1,175 @@
+"""A compact event record for the cached timeline."""
+
+from dataclasses import dataclass
+from datetime import datetime
+import sys
+from typing import Any
+
+from O365.calendar import (  # pylint: disable=no-name-in-module
+    AttendeeType,
+    EventResponse,
+    EventSensitivity,
+    EventShowAs,
+)
+
+from ..const_integration import BodyMode
+
+
+@dataclass(frozen=True, slots=True)
+class MS365Attendee:
+    """An attendee of an event."""
+
+    email: str
+    type: str
+    status: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class MS365Event:
+    """An event as held in the store and timeline.
+
+    Only the fields the integration reads are kept, built straight from the Graph
+    payload, rather than an O365 `Event` with its connection, recurrence and
+    attendee objects. The `Event` is retrieved when an event is changed.
+    """
+
+    object_id: str
+    subject: str
+    body: str
+    body_type: str
+    start: datetime
+    end: datetime
+    is_all_day: bool
+    location: str
+    categories: tuple[str, ...]
+    sensitivity: EventSensitivity
+    show_as: EventShowAs
+    is_reminder_on: bool
+    remind_before_minutes: int
+    organizer: str
+    attendees: tuple[MS365Attendee, ...]
+    series_master_id: str | None
+    change_key: str | None
+
+    @classmethod
+    def from_graph(
+        cls, parent, data: dict[str, Any], body_mode: BodyMode = BodyMode.FULL
+    ) -> "MS365Event":
+        """Build the event from a Graph event resource.
+
+        The parent is the O365 calendar the event was retrieved from, its dates
+        are converted to the account timezone the same as for an `Event`. Unless
+        the body mode is full, only the body preview, or no body, is kept.
+        """
+        is_all_day = data.get("isAllDay", False)
+        if body_mode == BodyMode.FULL:
+            body = data.get("body") or {}
+        elif body_mode == BodyMode.PREVIEW:
+            body = {"content": data.get("bodyPreview", ""), "contentType": "text"}
+        else:
+            body = {"content": "", "contentType": "text"}
+        organizer = (data.get("organizer") or {}).get("emailAddress") or {}
+        return cls(
+            object_id=data.get("id"),
+            subject=data.get("subject") or "",
+            body=body.get("content", ""),
+            body_type=body.get("contentType", "HTML"),
+            start=parent._parse_date_time_time_zone(  # noqa: SLF001
+                data.get("start", {}), is_all_day
+            ),
+            end=parent._parse_date_time_time_zone(  # noqa: SLF001
+                data.get("end", {}), is_all_day
+            ),
+            is_all_day=is_all_day,
+            location=_intern((data.get("location") or {}).get("displayName", "")),
+            categories=tuple(_intern(item) for item in data.get("categories", [])),
+            sensitivity=EventSensitivity.from_value(data.get("sensitivity", "normal"))
+            or EventSensitivity.Normal,
+            show_as=EventShowAs.from_value(data.get("showAs", "busy"))
+            or EventShowAs.Busy,
+            is_reminder_on=data.get("isReminderOn", True),
+            remind_before_minutes=data.get("reminderMinutesBeforeStart", 15),
+            organizer=_intern(organizer.get("address", "")),
+            attendees=tuple(
+                _attendee(attendee)
+                for attendee in data.get("attendees", [])
+                if (attendee.get("emailAddress") or {}).get("address")
+            ),
+            series_master_id=data.get("seriesMasterId"),
+            change_key=data.get("changeKey"),
+        )
+
+    def to_store(self) -> dict[str, Any]:
+        """Return the fields written to the store, as plain JSON values.
+
+        The fields are listed explicitly, so a field added for the timeline is
+        not persisted until it is added here and to `from_store`.
+        """
+        return {
+            "object_id": self.object_id,
+            "subject": self.subject,
+            "body": self.body,
+            "body_type": self.body_type,
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "is_all_day": self.is_all_day,
+            "location": self.location,
+            "categories": list(self.categories),
+            "sensitivity": self.sensitivity.value,
+            "show_as": self.show_as.value,
+            "is_reminder_on": self.is_reminder_on,
+            "remind_before_minutes": self.remind_before_minutes,
+            "organizer": self.organizer,
+            "attendees": [
+                {"email": item.email, "type": item.type, "status": item.status}
+                for item in self.attendees
+            ],
+            "series_master_id": self.series_master_id,
+            "change_key": self.change_key,
+        }
+
+    @classmethod
+    def from_store(cls, data: dict[str, Any]) -> "MS365Event":
+        """Rebuild the event from the fields written by `to_store`."""
+        return cls(
+            object_id=data["object_id"],
+            subject=data["subject"],
+            body=data["body"],
+            body_type=data["body_type"],
+            start=datetime.fromisoformat(data["start"]),
+            end=datetime.fromisoformat(data["end"]),
+            is_all_day=data["is_all_day"],
+            location=_intern(data["location"]),
+            categories=tuple(_intern(item) for item in data["categories"]),
+            sensitivity=EventSensitivity(data["sensitivity"]),
+            show_as=EventShowAs(data["show_as"]),
+            is_reminder_on=data["is_reminder_on"],
+            remind_before_minutes=data["remind_before_minutes"],
+            organizer=_intern(data["organizer"]),
+            attendees=tuple(
+                MS365Attendee(_intern(item["email"]), item["type"], item["status"])
+                for item in data["attendees"]
+            ),
+            series_master_id=data["series_master_id"],
+            change_key=data["change_key"],
+        )
+
+
+def _attendee(data: dict[str, Any]) -> MS365Attendee:
+    """Build an attendee from a Graph attendee resource.
+
+    Values O365 does not know fall back to the defaults, as for an `Attendee`.
+    """
+    response = (data.get("status") or {}).get("response", "none")
+    status = None if response == "none" else EventResponse.from_value(response)
+    attendee_type = AttendeeType.from_value(data.get("type", "required"))
+    return MS365Attendee(
+        email=_intern(data["emailAddress"]["address"]),
+        type=(attendee_type or AttendeeType.Required).value,
+        status=status.value if status else None,
+    )
+
+
+def _intern(value: str | None) -> str | None:
+    """Share the strings repeated across events, such as people and places."""
+    return sys.intern(value) if value else value
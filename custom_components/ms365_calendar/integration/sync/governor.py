@@ -0,0 +1,127 @@
+"""Limits the requests made to MS Graph for an account."""
+
+import asyncio
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+from datetime import timedelta
+import logging
+import time
+from typing import Any
+
+from requests.exceptions import HTTPError, RetryError
+
+from homeassistant.util import dt as dt_util
+
+from ..const_integration import (
+    GOVERNOR_BURST,
+    GOVERNOR_CONCURRENCY,
+    GOVERNOR_RATE,
+    GOVERNOR_RETRY_AFTER,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+RETRY_AFTER = "retry-after"
+THROTTLED_STATUS = (429, 503)
+
+
+class MS365RequestGovernor:
+    """Paces the requests made to MS Graph by all the calendars of an account.
+
+    Graph allows an app four concurrent requests, and 10,000 requests every ten
+    minutes, for each mailbox. Requests wait for a slot and a token from a
+    bucket refilled at a steady rate. When Graph throttles a request, no more
+    requests are made for the account until its Retry-After has passed, they
+    fail straight away so the calendars are served from the cache.
+    """
+
+    def __init__(self) -> None:
+        """Initialise the governor."""
+        self._semaphore = asyncio.Semaphore(GOVERNOR_CONCURRENCY)
+        self._tokens = float(GOVERNOR_BURST)
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._in_flight = 0
+        self._requests = 0
+        self._throttled = 0
+        self._last_retry_after: float | None = None
+
+    @property
+    def retry_in(self) -> float:
+        """Return the seconds until Graph allows requests again."""
+        return max(0.0, self._blocked_until - time.monotonic())
+
+    @asynccontextmanager
+    async def async_request(self) -> AsyncIterator[None]:
+        """Wait until a request may be made, and note if it is throttled."""
+        async with self._semaphore:
+            if retry_in := self.retry_in:
+                raise RetryError(
+                    f"Throttled by MS Graph, retrying in {retry_in:.0f} seconds"
+                )
+            await self._async_take_token()
+            self._in_flight += 1
+            self._requests += 1
+            try:
+                yield
+            except HTTPError as err:
+                if (
+                    err.response is not None
+                    and err.response.status_code in THROTTLED_STATUS
+                ):
+                    self.throttled(retry_after(err.response.headers))
+                raise
+            except RetryError:
+                # The O365 library has already retried the throttled request
+                self.throttled(GOVERNOR_RETRY_AFTER)
+                raise
+            finally:
+                self._in_flight -= 1
+
+    def throttled(self, seconds: float) -> None:
+        """Hold back requests for the seconds Graph asked for."""
+        self._throttled += 1
+        self._last_retry_after = seconds
+        if time.monotonic() + seconds > self._blocked_until:
+            self._blocked_until = time.monotonic() + seconds
+            _LOGGER.warning(
+                "MS Graph is throttling requests, pausing for %s seconds", seconds
+            )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of the governor for diagnostics."""
+        retry_in = self.retry_in
+        return {
+            "requests": self._requests,
+            "in_flight": self._in_flight,
+            "tokens": round(self._refill(), 1),
+            "throttled": self._throttled,
+            "last_retry_after": self._last_retry_after,
+            "throttled_until": (
+                (dt_util.utcnow() + timedelta(seconds=retry_in)).isoformat()
+                if retry_in
+                else None
+            ),
+        }
+
+    async def _async_take_token(self) -> None:
+        while self._refill() < 1:
+            await asyncio.sleep((1 - self._tokens) / GOVERNOR_RATE)
+        self._tokens -= 1
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(
+            GOVERNOR_BURST, self._tokens + (now - self._refilled_at) * GOVERNOR_RATE
+        )
+        self._refilled_at = now
+        return self._tokens
+
+
+def retry_after(headers: Mapping[str, Any]) -> float:
+    """Return the seconds to wait given by a throttled response's headers."""
+    headers = {key.lower(): value for key, value in headers.items()}
+    try:
+        return float(headers[RETRY_AFTER])
+    except (KeyError, TypeError, ValueError):
+        return GOVERNOR_RETRY_AFTER
@@ -0,0 +1,114 @@
+"""Cache of the events fetched for ranges outside the synced window."""
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+import logging
+import time
+
+from requests.exceptions import (
+    ConnectionError as RequestConnectionError,
+    HTTPError,
+    RetryError,
+)
+
+from homeassistant.core import HomeAssistant
+
+from ..const_integration import DOMAIN, RANGE_CACHE_SIZE, RANGE_CACHE_TTL
+from .event import MS365Event
+
+_LOGGER = logging.getLogger(__name__)
+
+type RangeKey = tuple[datetime, datetime]
+
+
+class MS365RangeCache:
+    """Events fetched for ranges outside the synced window.
+
+    Concurrent requests for the same range share a single fetch, such as the
+    same month being opened in several browsers. Fetched ranges are kept for a
+    few minutes, and the least recently used are dropped first. Ranges can also
+    be prefetched in the background, ready for when they are requested.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialise the cache."""
+        self._hass = hass
+        self._ranges: OrderedDict[RangeKey, tuple[float, list[MS365Event]]] = (
+            OrderedDict()
+        )
+        self._fetches: dict[RangeKey, asyncio.Task[list[MS365Event]]] = {}
+        self._generation = 0
+
+    async def async_get(
+        self,
+        start: datetime,
+        end: datetime,
+        fetch: Callable[[datetime, datetime], Awaitable[list[MS365Event]]],
+    ) -> list[MS365Event]:
+        """Return the events for the range, fetching them if not cached."""
+        key = (start, end)
+        if (cached := self._ranges.get(key)) is not None:
+            if cached[0] > time.monotonic():
+                self._ranges.move_to_end(key)
+                return cached[1]
+            del self._ranges[key]
+
+        if (task := self._fetches.get(key)) is None:
+            task = self._hass.async_create_task(
+                self._async_fetch(key, fetch), f"{DOMAIN}.range_fetch"
+            )
+            self._fetches[key] = task
+        # Shielded so one caller going away does not cancel the fetch for others
+        return await asyncio.shield(task)
+
+    def prefetch(
+        self,
+        start: datetime,
+        end: datetime,
+        fetch: Callable[[datetime, datetime], Awaitable[list[MS365Event]]],
+    ) -> None:
+        """Fetch the range in the background, unless cached or being fetched."""
+        key = (start, end)
+        if key in self._fetches or (
+            key in self._ranges and self._ranges[key][0] > time.monotonic()
+        ):
+            return
+        self._hass.async_create_background_task(
+            self._async_prefetch(start, end, fetch), f"{DOMAIN}.range_prefetch"
+        )
+
+    def clear(self) -> None:
+        """Drop the fetched ranges, and any fetch in progress."""
+        self._ranges.clear()
+        self._fetches.clear()
+        self._generation += 1
+
+    async def _async_prefetch(
+        self,
+        start: datetime,
+        end: datetime,
+        fetch: Callable[[datetime, datetime], Awaitable[list[MS365Event]]],
+    ) -> None:
+        try:
+            await self.async_get(start, end, fetch)
+        except (HTTPError, RetryError, RequestConnectionError) as err:
+            _LOGGER.debug("Error prefetching calendar event range: %s", err)
+
+    async def _async_fetch(
+        self,
+        key: RangeKey,
+        fetch: Callable[[datetime, datetime], Awaitable[list[MS365Event]]],
+    ) -> list[MS365Event]:
+        generation = self._generation
+        try:
+            events = await fetch(*key)
+        finally:
+            if generation == self._generation:
+                self._fetches.pop(key, None)
+        if generation == self._generation:
+            self._ranges[key] = (time.monotonic() + RANGE_CACHE_TTL, events)
+            while len(self._ranges) > RANGE_CACHE_SIZE:
+                self._ranges.popitem(last=False)
+        return events
@@ -1,14 +1,49 @@
 """Library for handling local event sync."""
 
+from collections.abc import Callable
+from contextlib import suppress
+from datetime import datetime, timedelta
 import logging
 import re
 
-from ..const_integration import EVENT_SYNC, ITEMS
+from ical.timespan import Timespan
+from requests.exceptions import HTTPError
+
+from homeassistant.util import dt as dt_util
+
+from ..const_integration import (
+    DEFAULT_SYNC_MODE,
+    DELTA_LINK,
+    EVENT_SYNC,
+    ITEMS,
+    SLIDING_RECONCILE_INTERVAL,
+    SLIDING_RECONCILED,
+    SYNC_WINDOW,
+    TIER_FAR_INTERVAL,
+    TIER_NEAR_HOURS,
+    TIER_WEEK_HOURS,
+    TIER_WEEK_INTERVAL,
+    TIERS_SYNCED,
+    SyncMode,
+)
 from .api import MS365CalendarEventStoreService, MS365CalendarService
+from .event import MS365Event
 from .store import CalendarStore, ScopedCalendarStore
+from .timeline import MS365Timeline, timespan_of
 
 _LOGGER = logging.getLogger(__name__)
 
+# Exclude patterns without these characters are plain text
+_REGEX_CHARS = frozenset(".^$*+?{}[]\\|()")
+# The flags of a pattern without global inline flags
+_DEFAULT_FLAGS = re.compile("").flags
+# A whole subject ignoring case, which MS Graph can exclude with `subject ne`
+_EXACT_SUBJECT = re.compile(r"\(\?i\)\^([^.^$*+?{}\[\]\\|()]+)\$")
+# The tiers of the tiered sync mode, each retrieving more of the window
+_TIER_NEAR = "near"
+_TIER_WEEK = "week"
+_TIER_FAR = "far"
+
 
 class MS365CalendarEventSyncManager:
     """Manages synchronizing events from API to local store."""
@@ -19,6 +54,7 @@ class MS365CalendarEventSyncManager:
         calendar_id: str | None = None,
         store: CalendarStore | None = None,
         exclude: list | None = None,
+        sync_mode: SyncMode = DEFAULT_SYNC_MODE,
     ) -> None:
         """Initialize CalendarEventSyncManager."""
         self._api = api
@@ -26,13 +62,42 @@ class MS365CalendarEventSyncManager:
         self._store = ScopedCalendarStore(
             ScopedCalendarStore(store, EVENT_SYNC), self.calendar_id
         )
-        self._exclude = exclude
+        self._is_excluded_subject = compile_exclude(exclude)
+        self._sync_mode = sync_mode
+        self._timeline: MS365Timeline | None = None
+        self._reconcile = False
+        self._changed_events: dict[str, bool] = {}
 
     @property
     def store_service(self) -> MS365CalendarEventStoreService:
         """Return the local API for fetching events."""
         return MS365CalendarEventStoreService(self._store, self.calendar_id, self._api)
 
+    async def async_get_timeline(self, tzinfo) -> MS365Timeline:
+        """Return the timeline of the stored events.
+
+        The timeline is built from the store once, after that each sync applies
+        the events it changed rather than the timeline being rebuilt.
+        """
+        if self._timeline is None:
+            self._timeline = await self.store_service.async_get_timeline(tzinfo)
+        return self._timeline
+
+    def request_full_sync(self) -> None:
+        """Have the next sliding or tiered sync retrieve the whole window.
+
+        Used when events may have changed within the window already synced.
+        """
+        self._reconcile = True
+
+    def request_event_sync(self, event_id: str, deleted: bool = False) -> None:
+        """Have the next sliding or tiered sync retrieve an event that changed.
+
+        Used for a change notification, so only the event is retrieved rather
+        than the whole window.
+        """
+        self._changed_events[event_id] = deleted
+
     @property
     def api(self) -> MS365CalendarService:
         """Return the cloud API."""
@@ -40,38 +105,402 @@ class MS365CalendarEventSyncManager:
 
     async def async_list_events(self, start_date, end_date):
         """Return the set of events matching the criteria."""
-        events = await self._api.async_list_events(start_date, end_date)
+        return [event async for event in self._async_iter_events(start_date, end_date)]
 
-        return self._filter_events(list(events))
+    async def _async_iter_events(self, start_date, end_date):
+        """Yield the events matching the criteria, filtered a page at a time."""
+        async for page in self._api.async_list_event_pages(start_date, end_date):
+            for event in self._filter_events(page):
+                yield event
 
     def _filter_events(self, events):
-        if not events or not self._exclude:
+        if not events or self._is_excluded_subject is None:
             return events
 
-        rtn_events = []
-        for event in events:
-            include = True
-            for exclude in self._exclude:
-                if re.search(exclude, event.subject):
-                    include = False
-            if include:
-                rtn_events.append(event)
+        return [event for event in events if not self._is_excluded(event)]
+
+    def _is_excluded(self, event):
+        if self._is_excluded_subject is None:
+            return False
+        return self._is_excluded_subject(event.subject)
+
+    async def run(self, start_date, end_date) -> bool:
+        """Run the event sync manager.
 
-        return rtn_events
+        Returns True if any events were added, changed or removed.
+        """
+        # The other modes retrieve the changed events anyway
+        changed_events, self._changed_events = self._changed_events, {}
+        if self._sync_mode == SyncMode.DELTA and self._api.delta_supported:
+            return await self._async_run_delta(start_date, end_date)
+        try:
+            if self._sync_mode == SyncMode.TIERED:
+                return await self._async_run_tiered(
+                    start_date, end_date, changed_events
+                )
+            if self._sync_mode in (SyncMode.DELTA, SyncMode.SLIDING):
+                # Calendars without delta queries slide the window instead
+                return await self._async_run_sliding(
+                    start_date, end_date, changed_events
+                )
+        except BaseException:
+            # The changed events are retrieved by the next sync instead, along
+            # with any notified since
+            self._changed_events = changed_events | self._changed_events
+            raise
 
-    async def run(self, start_date, end_date) -> None:
-        """Run the event sync manager."""
         # store_data = await self._store.async_load() or {}
 
-        new_data = await self.async_list_events(
-            start_date=start_date,
-            end_date=end_date,
+        # store_data[ITEMS].update(_add_update_func(store_data, new_data))
+        items = {
+            item.object_id: item
+            async for item in self._async_iter_events(start_date, end_date)
+        }
+        store_data = {
+            ITEMS: items,
+            SYNC_WINDOW: [start_date.isoformat(), end_date.isoformat()],
+        }
+        return await self._async_save(store_data)
+
+    async def async_get_stored_window(self) -> tuple[datetime, datetime] | None:
+        """Return the window covered by the events in the store, if any."""
+        store_data = await self._store.async_load() or {}
+        if SYNC_WINDOW not in store_data:
+            return None
+        start, end = store_data[SYNC_WINDOW]
+        return datetime.fromisoformat(start), datetime.fromisoformat(end)
+
+    async def _async_run_delta(self, start_date, end_date) -> bool:
+        """Apply the changes since the last delta sync to the stored events.
+
+        The delta window is widened to whole days so that the delta link stays
+        valid across polls, it is only re-initialised when the day changes.
+        """
+        window_start = dt_util.start_of_local_day(start_date)
+        window_end = dt_util.start_of_local_day(end_date) + timedelta(days=1)
+        sync_window = [window_start.isoformat(), window_end.isoformat()]
+
+        store_data = await self._store.async_load() or {}
+        items = store_data.get(ITEMS, {})
+        delta_link = store_data.get(DELTA_LINK)
+        if store_data.get(SYNC_WINDOW) != sync_window or not all(
+            isinstance(item, MS365Event) for item in items.values()
+        ):
+            delta_link = None
+        items = dict(items) if delta_link else {}
+
+        try:
+            events, removed, delta_link = await self._api.async_list_events_delta(
+                window_start, window_end, delta_link
+            )
+        except HTTPError as err:
+            # A 410 means the delta token has expired, so start afresh
+            if (
+                not delta_link
+                or err.response is None
+                or err.response.status_code != 410
+            ):
+                raise
+            _LOGGER.debug("Delta token expired for %s, resyncing", self.calendar_id)
+            items = {}
+            events, removed, delta_link = await self._api.async_list_events_delta(
+                window_start, window_end
+            )
+
+        for event_id in removed:
+            items.pop(event_id, None)
+        for event in events:
+            if self._is_excluded(event):
+                items.pop(event.object_id, None)
+            else:
+                items[event.object_id] = event
+
+        return await self._async_save(
+            {ITEMS: items, DELTA_LINK: delta_link, SYNC_WINDOW: sync_window}
         )
 
-        # store_data[ITEMS].update(_add_update_func(store_data, new_data))
-        items = {item.object_id: item for item in new_data}
-        store_data = {ITEMS: items}
+    async def _async_run_sliding(self, start_date, end_date, changed_events) -> bool:
+        """Move the stored events forward to the window.
+
+        Events that have ended before the window starts are dropped, and only
+        the part of the window after the stored events is retrieved, along with
+        any events notified as changed. The whole window is retrieved when it
+        has not been for an hour, to pick up the other changes within it.
+        """
+        store_data = await self._store.async_load() or {}
+        reconciled = store_data.get(SLIDING_RECONCILED)
+        slide_from = self._sliding_from(store_data, start_date, end_date)
+        if full_sync := slide_from is None:
+            slide_from = start_date
+            items = {}
+            reconciled = dt_util.utcnow().isoformat()
+        else:
+            items = {
+                event_id: event
+                for event_id, event in store_data[ITEMS].items()
+                if timespan_of(event).end > start_date
+            }
+            _LOGGER.debug(
+                "Sliding %s, retrieving from %s", self.calendar_id, slide_from
+            )
+            await self._async_apply_changed(
+                items, changed_events, start_date, slide_from
+            )
+
+        if end_date > slide_from:
+            async for event in self._async_iter_events(slide_from, end_date):
+                items[event.object_id] = event
+
+        changed = await self._async_save(
+            {
+                ITEMS: items,
+                SYNC_WINDOW: [start_date.isoformat(), end_date.isoformat()],
+                SLIDING_RECONCILED: reconciled,
+            }
+        )
+        if full_sync:
+            self._reconcile = False
+        return changed
+
+    def _sliding_from(self, store_data, start_date, end_date) -> datetime | None:
+        """Return the end of the stored window, or None to retrieve the whole window."""
+        reconciled = store_data.get(SLIDING_RECONCILED)
+        if (
+            self._reconcile
+            or not reconciled
+            or SYNC_WINDOW not in store_data
+            or dt_util.utcnow() - datetime.fromisoformat(reconciled)
+            >= timedelta(seconds=SLIDING_RECONCILE_INTERVAL)
+            or not all(
+                isinstance(item, MS365Event) for item in store_data[ITEMS].values()
+            )
+        ):
+            return None
+        stored_start, stored_end = (
+            datetime.fromisoformat(value) for value in store_data[SYNC_WINDOW]
+        )
+        if not stored_start <= start_date <= stored_end <= end_date:
+            return None
+        return stored_end
+
+    async def _async_run_tiered(self, start_date, end_date, changed_events) -> bool:
+        """Retrieve the part of the window that is due, nearer events more often.
+
+        The next few hours are retrieved on every update, the week either side
+        of now every 15 minutes and the whole window every four hours. The
+        events retrieved replace the stored events in that part of the window.
+        The part of the window newly reached as it moves forward is retrieved
+        with them, as for a sliding sync, along with any events notified as
+        changed.
+        """
+        store_data = await self._store.async_load() or {}
+        now = dt_util.utcnow()
+        tier = self._tier_due(store_data, start_date, end_date, now)
+        if tier == _TIER_FAR:
+            tier_start, tier_end = start_date, end_date
+            items = {}
+            tiers_synced = {}
+            slide_from = end_date
+        else:
+            hours = TIER_NEAR_HOURS if tier == _TIER_NEAR else TIER_WEEK_HOURS
+            tier_start = (
+                now
+                if tier == _TIER_NEAR
+                else max(start_date, now - timedelta(hours=hours))
+            )
+            tier_end = min(end_date, now + timedelta(hours=hours))
+            tier_span = Timespan.of(tier_start, tier_end)
+            items = {
+                event_id: event
+                for event_id, event in store_data[ITEMS].items()
+                if timespan_of(event).end > start_date
+                and not timespan_of(event).intersects(tier_span)
+            }
+            tiers_synced = dict(store_data[TIERS_SYNCED])
+            stored_end = datetime.fromisoformat(store_data[SYNC_WINDOW][1])
+            slide_from = max(stored_end, tier_end)
+            _LOGGER.debug("Retrieving the %s tier of %s", tier, self.calendar_id)
+            await self._async_apply_changed(
+                items, changed_events, start_date, stored_end
+            )
+
+        async for event in self._async_iter_events(tier_start, tier_end):
+            items[event.object_id] = event
+        if end_date > slide_from:
+            async for event in self._async_iter_events(slide_from, end_date):
+                items[event.object_id] = event
+
+        # The whole window includes the week, and the near tier is retrieved on
+        # every update so when it was is not kept
+        if tier == _TIER_FAR:
+            tiers_synced[_TIER_FAR] = now.isoformat()
+        if tier != _TIER_NEAR:
+            tiers_synced[_TIER_WEEK] = now.isoformat()
+        changed = await self._async_save(
+            {
+                ITEMS: items,
+                SYNC_WINDOW: [start_date.isoformat(), end_date.isoformat()],
+                TIERS_SYNCED: tiers_synced,
+            }
+        )
+        if tier == _TIER_FAR:
+            self._reconcile = False
+        return changed
+
+    def _tier_due(self, store_data, start_date, end_date, now) -> str:
+        """Return the widest tier due to be retrieved."""
+        tiers_synced = store_data.get(TIERS_SYNCED, {})
+
+        def _is_due(tier, interval) -> bool:
+            return tier not in tiers_synced or now - datetime.fromisoformat(
+                tiers_synced[tier]
+            ) >= timedelta(seconds=interval)
+
+        if (
+            self._reconcile
+            or SYNC_WINDOW not in store_data
+            or _is_due(_TIER_FAR, TIER_FAR_INTERVAL)
+            or not all(
+                isinstance(item, MS365Event) for item in store_data[ITEMS].values()
+            )
+        ):
+            return _TIER_FAR
+        stored_start, stored_end = (
+            datetime.fromisoformat(value) for value in store_data[SYNC_WINDOW]
+        )
+        if not stored_start <= start_date <= now < stored_end <= end_date:
+            return _TIER_FAR
+        if _is_due(_TIER_WEEK, TIER_WEEK_INTERVAL):
+            return _TIER_WEEK
+        return _TIER_NEAR
+
+    async def _async_apply_changed(
+        self, items, changed_events, start_date, end_date
+    ) -> None:
+        """Replace the stored events notified as changed with their latest state.
+
+        A changed series replaces all of its stored occurrences.
+        """
+        window = Timespan.of(start_date, end_date)
+        for event_id, deleted in changed_events.items():
+            for stored_id in [
+                stored_id
+                for stored_id, event in items.items()
+                if event_id in (stored_id, event.series_master_id)
+            ]:
+                del items[stored_id]
+            if deleted:
+                continue
+            _LOGGER.debug("Retrieving changed event for %s", self.calendar_id)
+            events = await self._api.async_get_changed_events(
+                event_id, start_date, end_date
+            )
+            for event in self._filter_events(events):
+                if timespan_of(event).intersects(window):
+                    items[event.object_id] = event
+
+    async def _async_save(self, store_data) -> bool:
+        """Save the synced events and apply the changes to the timeline.
+
+        Returns True if any events were added, changed or removed.
+        """
+        old_items = (await self._store.async_load() or {}).get(ITEMS, {})
         await self._store.async_save(store_data)
+        changed, removed = _changes(old_items, store_data[ITEMS])
+        if self._timeline is not None:
+            self._timeline.update(changed, removed)
+        return bool(changed or removed)
+
+
+def plan_exclude(patterns: list[str] | None) -> tuple[list[str], list[str]]:
+    """Split the exclude patterns into those MS Graph can apply and the rest.
+
+    MS Graph compares text ignoring case and cannot negate `contains`, so only a
+    pattern matching the whole subject ignoring case, `(?i)^Subject$`, can be
+    sent as a filter. Returns the subjects to filter out, and the patterns to
+    apply to the events once retrieved.
+    """
+    subjects = []
+    client = []
+    for pattern in patterns or ():
+        if match := _EXACT_SUBJECT.fullmatch(pattern):
+            subjects.append(match.group(1))
+        else:
+            client.append(pattern)
+    return subjects, client
+
+
+def compile_exclude(patterns: list[str] | None) -> Callable[[str], bool] | None:
+    """Return a function telling if a subject matches any exclude pattern.
+
+    Plain text patterns are matched as substrings, and plain text anchored at the
+    start as prefixes. The other patterns without groups are combined into one
+    expression, so a subject is searched once however many patterns there are.
+    """
+    if not patterns:
+        return None
+
+    literals = []
+    prefixes = []
+    expressions = []
+    for pattern in patterns:
+        if not _REGEX_CHARS.intersection(pattern):
+            literals.append(pattern)
+        elif pattern.startswith("^") and not _REGEX_CHARS.intersection(pattern[1:]):
+            prefixes.append(pattern[1:])
+        else:
+            try:
+                expressions.append(re.compile(pattern))
+            except re.error as err:
+                _LOGGER.warning("Invalid exclude pattern %r ignored - %s", pattern, err)
+    prefix_tuple = tuple(prefixes)
+    # Combining renumbers the groups a backreference refers to, and patterns
+    # with global inline flags cannot be combined, these are kept apart
+    combinable = [
+        regex
+        for regex in expressions
+        if not regex.groups and regex.flags == _DEFAULT_FLAGS
+    ]
+    with suppress(re.error):
+        if len(combinable) > 1:
+            expressions = [
+                re.compile("|".join(f"(?:{regex.pattern})" for regex in combinable)),
+                *(regex for regex in expressions if regex not in combinable),
+            ]
+
+    def is_excluded(subject: str) -> bool:
+        return (
+            any(literal in subject for literal in literals)
+            or subject.startswith(prefix_tuple)
+            or any(regex.search(subject) for regex in expressions)
+        )
+
+    return is_excluded
+
+
+def _changes(old_items, new_items) -> tuple[list[MS365Event], list[str]]:
+    """Return the events added or updated, and the ids of the events removed."""
+    changed = [
+        event
+        for event_id, event in new_items.items()
+        if not _is_unchanged(old_items.get(event_id), event)
+    ]
+    removed = [event_id for event_id in old_items if event_id not in new_items]
+    return changed, removed
+
+
+def _is_unchanged(old: MS365Event | None, event: MS365Event) -> bool:
+    """Return True if the event is the same as the stored one.
+
+    Graph changes the changeKey whenever an event changes, so a different
+    changeKey is a change without comparing the records. Otherwise the records
+    are compared, as they also depend on options such as the body mode.
+    """
+    if old is None:
+        return False
+    if event.change_key is not None and old.change_key != event.change_key:
+        return False
+    return old == event
 
 
 # def _add_update_func(store_data, new_data) -> dict[str, Any]:
@@ -1,39 +1,157 @@
 """A Timeline is a set of events on a calendar."""
 
-from collections.abc import Generator, Iterable
-from datetime import datetime
-
-from ical.iter import (
-    MergedIterable,
-    SortableItem,
-    SortableItemTimeline,
-    SortableItemValue,
-    SortedItemIterable,
-)
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta, tzinfo
+import heapq
+from operator import itemgetter
+
 from ical.timespan import Timespan
+from ical.util import normalize_datetime
 
 from homeassistant.util import dt as dt_util
-from O365.calendar import Event  # pylint: disable=no-name-in-module)
 
+from .event import MS365Event
+
+# Events longer than this are held outside the start index, so that the
+# index only has to look back this far for events that started earlier.
+MAX_INDEXED_SPAN = timedelta(days=1)
+
+_SPAN_KEY = itemgetter(0, 1)
+_END_KEY = itemgetter(1, 0)
 
-class MS365Timeline(SortableItemTimeline[Event]):
+
+class MS365Timeline:
     """A set of events on a calendar.
 
+    Events are indexed by start time so that overlap queries are answered with a
+    binary search rather than a scan of every event. Events longer than a day
+    are indexed by end time instead, so only those ending after the query
+    starts are looked at. The timeline is kept for the
+    life of the calendar and updated with the events that change on each sync.
+
     A timeline is created by the local sync API and not instantiated directly.
     """
 
-    # def __init__(self, iterable: Iterable[SortableItem[Timespan, Event]]) -> None:
-    #     super().__init__(iterable)
+    def __init__(
+        self, events: Iterable[MS365Event], tzinfo: tzinfo | None = None
+    ) -> None:
+        """Initialise the timeline.
+
+        Queries with floating times are taken to be in the time zone given.
+        """
+        self._tzinfo = tzinfo
+        self._items: list[tuple[datetime, datetime, MS365Event]] = []
+        self._long_items: list[tuple[datetime, datetime, MS365Event]] = []
+        self._by_id: dict[str, tuple[datetime, datetime, MS365Event]] = {}
+        for event in events:
+            item = _item(event)
+            self._by_id[event.object_id] = item
+            if _is_long(item):
+                self._long_items.append(item)
+            else:
+                self._items.append(item)
+        self._items.sort(key=_SPAN_KEY)
+        self._long_items.sort(key=_END_KEY)
+        self._starts = [item[0] for item in self._items]
+        self._long_ends = [item[1] for item in self._long_items]
+
+    def update(self, changed: Iterable[MS365Event], removed: Iterable[str]) -> None:
+        """Apply the events added, updated and removed by a sync.
+
+        Only the index entries of those events are touched.
+        """
+        for event_id in removed:
+            self._remove(event_id)
+        for event in changed:
+            self._remove(event.object_id)
+            self._add(event)
+
+    def _add(self, event: MS365Event) -> None:
+        item = _item(event)
+        self._by_id[event.object_id] = item
+        if _is_long(item):
+            index = bisect_right(self._long_items, _END_KEY(item), key=_END_KEY)
+            self._long_items.insert(index, item)
+            self._long_ends.insert(index, item[1])
+            return
+        index = bisect_right(self._items, _SPAN_KEY(item), key=_SPAN_KEY)
+        self._items.insert(index, item)
+        self._starts.insert(index, item[0])
+
+    def _remove(self, event_id: str) -> None:
+        if (item := self._by_id.pop(event_id, None)) is None:
+            return
+        if _is_long(item):
+            index = self._long_items.index(
+                item, bisect_left(self._long_items, _END_KEY(item), key=_END_KEY)
+            )
+            del self._long_items[index]
+            del self._long_ends[index]
+            return
+        index = self._items.index(
+            item, bisect_left(self._items, _SPAN_KEY(item), key=_SPAN_KEY)
+        )
+        del self._items[index]
+        del self._starts[index]
+
+    def overlapping(
+        self,
+        start: date | datetime,
+        end: date | datetime,
+    ) -> list[MS365Event]:
+        """Return the events active during the timespan in chronological order.
+
+        The end date is exclusive.
+        """
+        query_start = normalize_datetime(start, self._tzinfo)
+        query_end = normalize_datetime(end, self._tzinfo)
+
+        low = bisect_left(self._starts, query_start - MAX_INDEXED_SPAN)
+        high = bisect_right(self._starts, query_end)
+        indexed = [
+            item
+            for item in self._items[low:high]
+            if _intersects(item, query_start, query_end)
+        ]
+        if not self._long_items:
+            return [item[2] for item in indexed]
+
+        long = sorted(
+            (
+                item
+                for item in self._long_items[
+                    bisect_right(self._long_ends, query_start) :
+                ]
+                if _intersects(item, query_start, query_end)
+            ),
+            key=_SPAN_KEY,
+        )
+        return [item[2] for item in heapq.merge(indexed, long, key=_SPAN_KEY)]
+
+
+def _item(event: MS365Event) -> tuple[datetime, datetime, MS365Event]:
+    timespan = timespan_of(event)
+    return (timespan.start, timespan.end, event)
 
 
-def timespan_of(event: Event) -> Timespan:
+def _is_long(item) -> bool:
+    return item[1] - item[0] > MAX_INDEXED_SPAN
+
+
+def _intersects(item, query_start: datetime, query_end: datetime) -> bool:
+    """Return True if the item overlaps the query, matching Timespan.intersects."""
+    start, end, _ = item
+    return (
+        query_start <= start < query_end
+        or query_start < end <= query_end
+        or start <= query_start < end
+        or start < query_end <= end
+    )
+
+
+def timespan_of(event: MS365Event) -> Timespan:
     """Return a timespan representing the event start and end."""
-    # if tzinfo is None:
-    #     tzinfo = dt_util.UTC
-    # return Timespan.of(
-    #     normalize(event.start, tzinfo),
-    #     normalize(event.end, tzinfo),
-    # )
     if event.is_all_day:
         return Timespan.of(
             dt_util.start_of_local_day(event.start),
@@ -42,26 +160,6 @@ def timespan_of(event: Event) -> Timespan:
     return Timespan.of(event.start, event.end)
 
 
-def calendar_timeline(events: list[Event], tzinfo: datetime.tzinfo) -> MS365Timeline:
+def calendar_timeline(events: list[MS365Event], tzinfo: tzinfo) -> MS365Timeline:
     """Create a timeline for events on a calendar, including recurrence."""
-    normal_events = events.copy()
-
-    def sortable_items() -> Generator[SortableItem[Timespan, Event]]:
-        nonlocal normal_events
-        for event in normal_events:
-            yield SortableItemValue(timespan_of(event), event)
-
-    iters: list[Iterable[SortableItem[Timespan, Event]]] = []
-    iters.append(SortedItemIterable(sortable_items, tzinfo))
-
-    return MS365Timeline(MergedIterable(iters))
-
-
-# def normalize(date, tzinfo: datetime.tzinfo) -> datetime:
-#     """Convert date or datetime to a value that can be used for comparison."""
-#     value = date
-#     if not isinstance(value, datetime):
-#         value = datetime.combine(value, time.min)
-#     if value.tzinfo is None:
-#         value = value.replace(tzinfo=(tzinfo if tzinfo else dt_util.UTC))
-#     return value
+    return MS365Timeline(events, tzinfo)
@@ -0,0 +1,83 @@
+"""Asyncio transport for reading from MS Graph."""
+
+from http import HTTPStatus
+import logging
+from typing import Any
+
+from aiohttp import ClientError, ClientTimeout
+from requests import Response
+from requests.exceptions import ConnectionError as RequestConnectionError
+from requests.exceptions import HTTPError
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from ..const_integration import TRANSPORT_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+UNAUTHORISED_STATUS = (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN)
+
+
+class MS365AsyncTransport:
+    """Reads from MS Graph on HA's shared client session.
+
+    The O365 connection still owns the token, the transport borrows the access
+    token from its token backend and asks it to refresh the token when MS Graph
+    reports it has expired. Errors are raised as the equivalent requests
+    exceptions so callers handle them the same as for the O365 library.
+    """
+
+    def __init__(self, hass: HomeAssistant, account) -> None:
+        """Initialise the transport."""
+        self._hass = hass
+        self._con = account.con
+        self._session = async_get_clientsession(hass)
+        self._timeout = ClientTimeout(total=TRANSPORT_TIMEOUT)
+
+    async def async_get(
+        self, url: str, params: dict | None = None, headers: dict | None = None
+    ) -> dict[str, Any]:
+        """Get the url and return the JSON body of the response."""
+        refreshed = False
+        while True:
+            request_headers = {
+                **(headers or {}),
+                "Authorization": self._authorization(url),
+            }
+            try:
+                async with self._session.get(
+                    url, params=params, headers=request_headers, timeout=self._timeout
+                ) as response:
+                    if response.status < HTTPStatus.BAD_REQUEST:
+                        return await response.json()
+                    status = response.status
+                    response_headers = dict(response.headers)
+            except (ClientError, TimeoutError) as err:
+                raise RequestConnectionError(f"Error requesting {url}: {err}") from err
+
+            # MS Graph reports an expired token as 401 or 403, refresh and try again
+            if status in UNAUTHORISED_STATUS and not refreshed:
+                refreshed = await self._hass.async_add_executor_job(
+                    self._con._try_refresh_token  # noqa: SLF001
+                )
+                if refreshed:
+                    _LOGGER.debug("Token refreshed for async transport")
+                    continue
+            raise _http_error(url, status, response_headers)
+
+    def _authorization(self, url: str) -> str:
+        """Return the authorisation header for the connection's access token."""
+        token = self._con.token_backend.get_access_token(username=self._con.username)
+        if token is None:
+            raise RequestConnectionError(f"Error requesting {url}: no access token")
+        return f"Bearer {token['secret']}"
+
+
+def _http_error(url: str, status: int, headers: dict[str, str]) -> HTTPError:
+    """Build the error raised for a failed request."""
+    response = Response()
+    response.status_code = status
+    response.url = url
+    response.headers.update(headers)
+    return HTTPError(f"{status} Error for url: {url}", response=response)
@@ -1,6 +1,7 @@
 """Calendar utilities processes."""
 
 from datetime import datetime
+from functools import lru_cache
 import logging
 import warnings
 
@@ -26,6 +27,7 @@ from .const_integration import (
     ATTR_SENSITIVITY,
     ATTR_SHOW_AS,
     CALENDAR_ENTITY_ID_FORMAT,
+    CLEAN_HTML_CACHE_SIZE,
     DAYS,
     INDEXES,
 )
@@ -34,8 +36,23 @@ _LOGGER = logging.getLogger(__name__)
 warnings.filterwarnings("ignore", category=MarkupResemblesLocatorWarning)
 
 
-def clean_html(html):
-    """Clean the HTML."""
+def clean_html(html, content_type="html"):
+    """Clean the HTML.
+
+    Plain text bodies are returned as they are, without being parsed.
+    """
+    if not html or content_type.lower() == "text":
+        return html
+    return _html_to_text(html)
+
+
+@lru_cache(maxsize=CLEAN_HTML_CACHE_SIZE)
+def _html_to_text(html):
+    """Convert the HTML to text.
+
+    The conversions are cached by the HTML content, so an unchanged body is only
+    parsed once across updates and entities.
+    """
     soup = BeautifulSoup(html, features="html.parser")
     if body := soup.find("body"):
         # get text
@@ -54,31 +71,24 @@ def clean_html(html):
 
 def format_event_data(event):
     """Format the event data."""
-    attendees = event.attendees._Attendees__attendees  # noqa: SLF001
     return {
         "summary": event.subject,
         "start": get_hass_date(event.start, event.is_all_day),
         "end": get_hass_date(get_end_date(event), event.is_all_day),
         "all_day": event.is_all_day,
-        "description": clean_html(event.body),
-        "location": event.location["displayName"],
-        "categories": event.categories,
+        "description": clean_html(event.body, event.body_type),
+        "location": event.location,
+        "categories": list(event.categories),
         "sensitivity": event.sensitivity.name,
         "show_as": event.show_as.name,
         "reminder": {
             "minutes": event.remind_before_minutes,
             "is_on": event.is_reminder_on,
         },
-        "organizer": event.organizer.address,
+        "organizer": event.organizer,
         "attendees": [
-            {
-                "email": x.address,
-                "type": x.attendee_type.value,
-                "status": x.response_status.status.value
-                if x.response_status.status
-                else None,
-            }
-            for x in attendees
+            {"email": x.email, "type": x.type, "status": x.status}
+            for x in event.attendees
         ],
         "uid": event.object_id,
     }
@@ -87,11 +87,13 @@ class URL(Enum):
         "https://login.microsoftonline.com/common/v2.0/.well-known/openid-configuration"
     )
     ME = "https://graph.microsoft.com/v1.0/me"
+    BATCH = "https://graph.microsoft.com/v1.0/$batch"
     CALENDARS = "https://graph.microsoft.com/v1.0/me/calendars"
     GROUP_CALENDARS = "https://graph.microsoft.com/v1.0/groups"
     SHARED_CALENDARS = (
         "https://graph.microsoft.com/v1.0/users/jane.doe@nomail.com/calendars"
     )
+    SUBSCRIPTIONS = "https://graph.microsoft.com/v1.0/subscriptions"
 
 
 class CN21VURL(Enum):
@@ -1,5 +1,9 @@
 """Mock setup."""
+
+import json
+import re
 from datetime import timedelta
+from http import HTTPStatus
 
 from ...helpers.utils import mock_call, utcnow, load_json
 from ..const_integration import CN21VURL, URL
@@ -41,6 +45,118 @@ class MS365Mocks:
             end=(utcnow() + timedelta(days=1)).strftime("%Y-%m-%d"),
         )
 
+    def paged_mocks(self, requests_mock):
+        """Create the mocks for calendar events returned a page at a time."""
+        view = _load_view("calendar1_calendar_view", -1, 1)
+        next_link = f"{URL.CALENDARS.value}/calendar1/calendarView?$skip=1"
+
+        def _page(request, context):
+            if "$skip" in request.qs:
+                return {"value": view["value"][1:]}
+            return {"value": view["value"][:1], "@odata.nextLink": next_link}
+
+        requests_mock.get(f"{URL.CALENDARS.value}/calendar1/calendarView", json=_page)
+
+    def delta_mocks(self, requests_mock):
+        """Create the delta sync mocks."""
+        self.standard_mocks(requests_mock)
+        mock_call(
+            requests_mock,
+            URL.CALENDARS,
+            "calendar1_calendar_view_delta",
+            "calendar1/calendarView/delta",
+            start=(utcnow() - timedelta(days=1)).strftime("%Y-%m-%d"),
+            end=(utcnow() + timedelta(days=1)).strftime("%Y-%m-%d"),
+        )
+        mock_call(
+            requests_mock,
+            URL.CALENDARS,
+            "calendar3_calendar_view",
+            "calendar3/calendarView/delta",
+            start=utcnow().strftime("%Y-%m-%d"),
+            end=(utcnow() + timedelta(days=1)).strftime("%Y-%m-%d"),
+        )
+
+    def delta_changes_mocks(self, requests_mock):
+        """Create the delta sync changes mocks."""
+        mock_call(
+            requests_mock,
+            URL.CALENDARS,
+            "calendar1_calendar_view_delta_changes",
+            "calendar1/calendarView/delta?$deltatoken=deltatoken1",
+            start=(utcnow() - timedelta(days=1)).strftime("%Y-%m-%d"),
+            end=(utcnow() + timedelta(days=1)).strftime("%Y-%m-%d"),
+        )
+
+    def batch_mocks(self, requests_mock, statuses=None):
+        """Create the batch request mocks.
+
+        Statuses are returned in turn for a calendar before its events are.
+        """
+        self.standard_mocks(requests_mock)
+        views = {
+            "/me/calendars/calendar1/calendarView": _load_view(
+                "calendar1_calendar_view", -1, 1
+            ),
+            "/groups/calendar2/calendar/calendarView": _load_view(
+                "calendar2_calendar_view", 1, 2
+            ),
+            "/me/calendars/calendar3/calendarView": _load_view(
+                "calendar3_calendar_view", 0, 1
+            ),
+        }
+        statuses = {path: list(status) for path, status in (statuses or {}).items()}
+
+        def _batch_response(request, context):
+            responses = []
+            for item in request.json()["requests"]:
+                path = item["url"].split("?")[0]
+                status = statuses.get(path, [])
+                if status:
+                    responses.append(
+                        {
+                            "id": item["id"],
+                            "status": status.pop(0),
+                            "headers": {"Retry-After": "0"},
+                            "body": {"error": {"message": "Failed"}},
+                        }
+                    )
+                else:
+                    responses.append(
+                        {"id": item["id"], "status": 200, "body": views[path]}
+                    )
+            return {"responses": responses}
+
+        requests_mock.post(URL.BATCH.value, json=_batch_response)
+
+    def async_transport_mocks(self, aioclient_mock):
+        """Create the calendar view mocks for the async transport."""
+        aioclient_mock.get(
+            f"{URL.CALENDARS.value}/calendar1/calendarView",
+            json=_load_view("calendar1_calendar_view", -1, 1),
+        )
+        aioclient_mock.get(
+            f"{URL.GROUP_CALENDARS.value}/calendar2/calendar/calendarView",
+            json=_load_view("calendar2_calendar_view", 1, 2),
+        )
+        aioclient_mock.get(
+            f"{URL.CALENDARS.value}/calendar3/calendarView",
+            json=_load_view("calendar3_calendar_view", 0, 1),
+        )
+
+    def notification_mocks(self, requests_mock, status=HTTPStatus.CREATED):
+        """Create the change notification subscription mocks."""
+        self.standard_mocks(requests_mock)
+
+        def _subscription(request, context):
+            context.status_code = status
+            return {"id": request.json()["resource"].replace("/", "-")}
+
+        requests_mock.post(URL.SUBSCRIPTIONS.value, json=_subscription)
+        subscription = re.compile(f"{re.escape(URL.SUBSCRIPTIONS.value)}/")
+        requests_mock.patch(subscription, json={})
+        requests_mock.delete(subscription, status_code=HTTPStatus.NO_CONTENT)
+
     def cn21v_mocks(self, requests_mock, tenant_id="common"):
         """Create the standard mocks."""
         mock_call(requests_mock, CN21VURL.DISCOVERY, "discovery")
@@ -141,6 +257,14 @@ class MS365Mocks:
 MS365MOCKS = MS365Mocks()
 
 
+def _load_view(datafile, start_days, end_days):
+    data = load_json(f"O365/{datafile}.json")
+    data = data.replace(
+        "2020-01-01", (utcnow() + timedelta(days=start_days)).strftime("%Y-%m-%d")
+    ).replace("2020-01-02", (utcnow() + timedelta(days=end_days)).strftime("%Y-%m-%d"))
+    return json.loads(data)
+
+
 def _generic_mocks(requests_mock):
     mock_call(requests_mock, URL.OPENID, "openid")
     mock_call(requests_mock, URL.ME, "me")
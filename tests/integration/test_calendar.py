@@ -1,26 +1,56 @@
 # pylint: disable=unused-argument,line-too-long,wrong-import-order
 """Test main calendar testing."""
 
+import asyncio
 import logging
+import time
 from copy import deepcopy
+from dataclasses import replace
 from datetime import date, datetime, timedelta
+from http import HTTPStatus
 from unittest.mock import patch
 import pytest
 
+from aiohttp import ClientError
+from freezegun.api import FrozenDateTimeFactory
 from homeassistant.util import dt as dt_util
 from homeassistant.components.calendar import DOMAIN as CALENDAR_DOMAIN
 from homeassistant.components.calendar import SERVICE_GET_EVENTS
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
 from homeassistant.core import HomeAssistant
+from homeassistant.core_config import async_process_ha_core_config
 from homeassistant.helpers import entity_registry as er
-from requests.exceptions import HTTPError
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+)
+from requests import Response
+from requests.exceptions import HTTPError, RetryError
 from requests_mock import Mocker
 from zoneinfo import ZoneInfo
 
 from ..helpers.mock_config_entry import MS365MockConfigEntry
-from ..helpers.utils import check_entity_state, utcnow
-from .const_integration import DOMAIN, FULL_INIT_ENTITY_NO
+from ..helpers.utils import check_entity_state, load_json, mock_call, utcnow
+from . import async_get_config_entry_diagnostics
+from .const_integration import DOMAIN, FULL_INIT_ENTITY_NO, URL
 from .data_integration.state import BASE_STATE_CAL1, BASE_STATE_CAL2
 from .helpers_integration.mocks import MS365MOCKS
+from custom_components.ms365_calendar.integration.coordinator_integration import (
+    MS365PollScheduler,
+)
+from custom_components.ms365_calendar.integration.const_integration import (
+    GOVERNOR_BURST,
+    GOVERNOR_RATE,
+    GOVERNOR_RETRY_AFTER,
+)
+from custom_components.ms365_calendar.integration.sync.governor import (
+    MS365RequestGovernor,
+)
+from custom_components.ms365_calendar.integration.sync.sync import (
+    compile_exclude,
+    plan_exclude,
+)
+from custom_components.ms365_calendar.integration.sync.timeline import MS365Timeline
 from .helpers_integration.utils_integration import update_options, yaml_setup
 
 START_BASE = datetime(2020, 1, 1, 0, 0, 0, tzinfo=ZoneInfo(key="UTC"))
@@ -93,7 +123,7 @@ async def test_sync_fetch_error(
     """Test error fetching data."""
     coordinator = base_config_entry.runtime_data.coordinator[0]
     with patch(
-        "O365.calendar.Calendar.get_events",
+        f"custom_components.{DOMAIN}.integration.sync.api.MS365CalendarService._async_get",
         side_effect=HTTPError(),
     ):
         await coordinator.async_refresh()
@@ -101,6 +131,114 @@ async def test_sync_fetch_error(
     assert "Error syncing calendar events from MS Graph" in caplog.text
 
 
+async def test_timeline_updated(
+    hass: HomeAssistant,
+    setup_base_integration,
+    base_config_entry: MS365MockConfigEntry,
+    requests_mock: Mocker,
+) -> None:
+    """Test each sync applies its changes to the existing timeline."""
+    coordinator = base_config_entry.runtime_data.coordinator[0]
+    timeline = coordinator.data
+    start = utcnow() - timedelta(days=30)
+    end = utcnow() + timedelta(days=30)
+
+    for mocks in (MS365MOCKS.started_event_mocks, MS365MOCKS.no_events_mocks):
+        mocks(requests_mock)
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+        assert coordinator.data is timeline
+        items = (await coordinator.sync._store.async_load())["items"]  # noqa: SLF001
+        assert timeline.overlapping(start, end) == MS365Timeline(
+            items.values()
+        ).overlapping(start, end)
+    assert not timeline.overlapping(start, end)
+
+
+async def test_timeline_long_events(
+    hass: HomeAssistant,
+    setup_base_integration,
+    base_config_entry: MS365MockConfigEntry,
+) -> None:
+    """Test events longer than a day are found through their end times."""
+    event = base_config_entry.runtime_data.coordinator[0].data.overlapping(
+        utcnow(), utcnow()
+    )[0]
+    base = datetime(2024, 1, 1, tzinfo=ZoneInfo(key="UTC"))
+    events = [
+        replace(
+            event,
+            object_id=f"long{day}",
+            is_all_day=False,
+            start=base + timedelta(days=day),
+            end=base + timedelta(days=day + length),
+        )
+        for day, length in ((0, 3), (2, 10), (5, 2), (20, 4), (1, 30))
+    ]
+    timeline = MS365Timeline(events[:-1], ZoneInfo(key="Europe/Berlin"))
+    timeline.update([events[-1]], ["long5"])
+
+    def _ids(start, end):
+        return [item.object_id for item in timeline.overlapping(start, end)]
+
+    assert _ids(base + timedelta(days=4), base + timedelta(days=6)) == [
+        "long1",
+        "long2",
+    ]
+    assert _ids(base + timedelta(days=21), base + timedelta(days=40)) == [
+        "long1",
+        "long20",
+    ]
+    assert _ids(base + timedelta(days=31), base + timedelta(days=40)) == []
+    # Floating times are taken to be in the timeline's time zone
+    assert _ids(datetime(2024, 1, 25, 0, 30), datetime(2024, 1, 25, 0, 45)) == [
+        "long1",
+        "long20",
+    ]
+
+
+async def test_unchanged_not_written(
+    hass: HomeAssistant,
+    setup_base_integration,
+    base_config_entry: MS365MockConfigEntry,
+    requests_mock: Mocker,
+) -> None:
+    """Test the state is only written when a sync changes something."""
+    coordinator = base_config_entry.runtime_data.coordinator[0]
+    timeline = coordinator.data
+    with patch(
+        f"custom_components.{DOMAIN}.integration.calendar_integration.MS365CalendarEntity.async_write_ha_state"
+    ) as mock_write:
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        assert not mock_write.called
+        assert timeline.overlapping(utcnow(), utcnow())
+
+        MS365MOCKS.started_event_mocks(requests_mock)
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        assert mock_write.called
+
+    # A record stored with other options is replaced, though its changeKey is
+    # the same
+    MS365MOCKS.standard_mocks(requests_mock)
+    await coordinator.async_refresh()
+    sync = coordinator.sync
+    items = (await sync._store.async_load())["items"]  # noqa: SLF001
+    items["event1"] = replace(items["event1"], body="Preview")
+    sync._timeline = None  # noqa: SLF001
+    await sync.async_get_timeline(dt_util.get_default_time_zone())
+    await coordinator.async_refresh()
+    [event] = [
+        event
+        for event in coordinator.data.overlapping(utcnow(), utcnow())
+        if event.object_id == "event1"
+    ]
+    assert event.change_key is not None
+    assert event.body != "Preview"
+
+
 async def test_get_events_fetch_error(
     hass: HomeAssistant,
     setup_base_integration,
@@ -111,7 +249,7 @@ async def test_get_events_fetch_error(
     start_date = dt_util.utcnow() + timedelta(hours=-1440)
     end_date = dt_util.utcnow() + timedelta(hours=1440)
     with patch(
-        "O365.calendar.Calendar.get_events",
+        f"custom_components.{DOMAIN}.integration.sync.api.MS365CalendarService._async_get",
         side_effect=HTTPError(),
     ):
         await hass.services.async_call(
@@ -128,7 +266,7 @@ async def test_get_events_fetch_error(
     assert "Error getting calendar event range" in caplog.text
 
     with patch(
-        "O365.calendar.Calendar.get_events",
+        f"custom_components.{DOMAIN}.integration.sync.api.MS365CalendarService._async_get",
         side_effect=HTTPError(),
     ):
         await hass.services.async_call(
@@ -152,19 +290,38 @@ async def test_get_calendar_error(
     caplog: pytest.LogCaptureFixture,
     base_config_entry: MS365MockConfigEntry,
 ) -> None:
-    """Test error when getting calendar."""
+    """Test calendars are set up from the scan, and errors getting others."""
     MS365MOCKS.standard_mocks(requests_mock)
 
     base_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(base_config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert len(base_config_entry.runtime_data.coordinator) == 3
+    assert not [
+        request
+        for request in requests_mock.request_history
+        if request.path == "/v1.0/me/calendars/calendar1"
+    ]
+
+    api = base_config_entry.runtime_data.coordinator[0].sync.api
+    assert await api.async_calendar_init()
+    assert api.calendar.calendar_id == "calendar1"
     with patch(
         "O365.calendar.Schedule.get_calendar",
         side_effect=HTTPError(),
     ):
-        await hass.config_entries.async_setup(base_config_entry.entry_id)
-        await hass.async_block_till_done()
+        assert not await api.async_calendar_init()
 
     assert "Error getting calendar" in caplog.text
 
+    with patch(
+        f"custom_components.{DOMAIN}.integration.sync.api.MS365CalendarService.async_calendar_init",
+        return_value=False,
+    ):
+        await hass.config_entries.async_reload(base_config_entry.entry_id)
+        await hass.async_block_till_done()
+    assert not base_config_entry.runtime_data.coordinator
+
 
 async def test_no_events(
     hass: HomeAssistant,
@@ -202,6 +359,86 @@ async def test_filter_events(
     check_entity_state(hass, "calendar.test_calendar1", "on", data_length=1)
 
 
+def test_compile_exclude(caplog: pytest.LogCaptureFixture) -> None:
+    """Test exclude patterns match as searching for each in turn would."""
+    assert compile_exclude([]) is None
+    subjects = [
+        "Test event 1",
+        "Private lunch",
+        "A private lunch",
+        "Daily Standup",
+        "Standup notes",
+        "HOLIDAY",
+        "Other",
+    ]
+
+    is_excluded = compile_exclude(["event 1", "^Private", "Stand.?up$", "[invalid"])
+    assert [is_excluded(subject) for subject in subjects] == [
+        True,
+        True,
+        False,
+        True,
+        False,
+        False,
+        False,
+    ]
+    assert "Invalid exclude pattern '[invalid' ignored" in caplog.text
+
+    # Global inline flags cannot be combined with the other patterns
+    is_excluded = compile_exclude(["Stand.?up$", "(?i)holiday"])
+    assert [is_excluded(subject) for subject in subjects] == [
+        False,
+        False,
+        False,
+        True,
+        False,
+        True,
+        False,
+    ]
+
+    # Backreferences refer to the groups of their own pattern
+    is_excluded = compile_exclude([r"(Stand).?up$", r"(n).*\1"])
+    assert [is_excluded(subject) for subject in subjects] == [
+        False,
+        False,
+        False,
+        True,
+        True,
+        False,
+        False,
+    ]
+
+
+async def test_exclude_pushdown(
+    tmp_path,
+    hass: HomeAssistant,
+    requests_mock: Mocker,
+    base_token,
+    base_config_entry: MS365MockConfigEntry,
+) -> None:
+    """Test exclusions of a whole subject are filtered by MS Graph."""
+    MS365MOCKS.standard_mocks(requests_mock)
+    yaml_setup(tmp_path, "ms365_calendars_exclude_subject")
+
+    base_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(base_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    [view] = [
+        request
+        for request in requests_mock.request_history
+        if "calendar1/calendarView" in request.url
+    ]
+    assert "subject ne 'test event 1 calendar1'" in view.qs["$filter"][0]
+    # Graph does the filtering, the mocked response is not filtered again
+    check_entity_state(hass, "calendar.test_calendar1", "on", data_length=2)
+
+    assert plan_exclude(["(?i)^Bob's lunch$", "^Lunch$", "(?i)^Lun.ch$"]) == (
+        ["Bob's lunch"],
+        ["^Lunch$", "(?i)^Lun.ch$"],
+    )
+
+
 async def test_search_events(
     tmp_path,
     hass: HomeAssistant,
@@ -214,7 +451,10 @@ async def test_search_events(
     yaml_setup(tmp_path, "ms365_calendars_search")
 
     base_config_entry.add_to_hass(hass)
-    with patch("O365.calendar.Calendar.get_events"):
+    with patch(
+        f"custom_components.{DOMAIN}.integration.sync.api.MS365CalendarService._async_get",
+        return_value={},
+    ):
         await hass.config_entries.async_setup(base_config_entry.entry_id)
     await hass.async_block_till_done()
 
@@ -236,7 +476,10 @@ async def test_sensitivity_exclude(
 
     base_config_entry.add_to_hass(hass)
 
-    with patch("O365.calendar.Calendar.get_events"):
+    with patch(
+        f"custom_components.{DOMAIN}.integration.sync.api.MS365CalendarService._async_get",
+        return_value={},
+    ):
         await hass.config_entries.async_setup(base_config_entry.entry_id)
     await hass.async_block_till_done()
 
@@ -244,6 +487,125 @@ async def test_sensitivity_exclude(
     # assert "sensitivity ne 'private'" in str(get_events.call_args_list)
 
 
+async def test_body_mode(
+    tmp_path,
+    hass: HomeAssistant,
+    requests_mock: Mocker,
+    base_token,
+    base_config_entry: MS365MockConfigEntry,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test calendars synced without full bodies fetch them when needed."""
+    MS365MOCKS.standard_mocks(requests_mock)
+    requests_mock.get(
+        f"{URL.CALENDARS.value}/calendar1/calendarView",
+        json={
+            "value": [
+                {
+                    "id": "event1",
+                    "changeKey": "changekey1",
+                    "body": {"contentType": "text", "content": "Test"},
+                },
+                {"id": "event2", "body": {"contentType": "text", "content": ""}},
+            ]
+        },
+        additional_matcher=_is_body_request,
+    )
+    requests_mock.get(
+        f"{URL.GROUP_CALENDARS.value}/calendar2/calendar/calendarView",
+        status_code=HTTPStatus.NOT_FOUND,
+        additional_matcher=_is_body_request,
+    )
+    yaml_setup(tmp_path, "ms365_calendars_body_mode")
+
+    base_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(base_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    views = [
+        request.url
+        for request in requests_mock.request_history
+        if "calendarView" in request.url
+    ]
+    calendar1_view = next(url for url in views if "calendar1" in url)
+    calendar2_view = next(url for url in views if "calendar2" in url)
+    assert "bodyPreview" in calendar1_view
+    assert "body%2C" not in calendar1_view
+    assert "body" not in calendar2_view
+    assert not [url for url in views if "select=body%2C" in url]
+    state = hass.states.get("calendar.test_calendar1")
+    assert state.attributes["data"][0]["description"] == "Test preview"
+    assert state.attributes["data"][1]["description"] == ""
+
+    async def _async_get_calendar1_descriptions():
+        response = await hass.services.async_call(
+            CALENDAR_DOMAIN,
+            SERVICE_GET_EVENTS,
+            {
+                "entity_id": "calendar.test_calendar1",
+                "start_date_time": utcnow() - timedelta(days=1),
+                "end_date_time": utcnow() + timedelta(days=1),
+            },
+            blocking=True,
+            return_response=True,
+        )
+        events = response["calendar.test_calendar1"]["events"]
+        return [event["description"] for event in events]
+
+    def _body_fetches():
+        return [
+            request
+            for request in requests_mock.request_history
+            if _is_body_request(request)
+        ]
+
+    # The bodies for the range are fetched in one request, then cached, the
+    # cache growing to hold the whole range when it is larger
+    api = base_config_entry.runtime_data.coordinator[0].sync.api
+    api._body_cache_size = 1  # noqa: SLF001
+    for _ in range(2):
+        assert await _async_get_calendar1_descriptions() == ["Test", ""]
+    [fetch] = _body_fetches()
+    assert fetch.path == "/v1.0/me/calendars/calendar1/calendarview"
+
+    # Bodies fetched for another range evict the oldest
+    requests_mock.get(
+        f"{URL.CALENDARS.value}/calendar1/calendarView",
+        json={"value": [{"id": f"other{index}"} for index in range(2)]},
+        additional_matcher=_is_body_request,
+    )
+    await api._async_get_bodies(utcnow(), utcnow())  # noqa: SLF001
+    assert list(api._bodies) == ["other0", "other1"]  # noqa: SLF001
+
+    # Without the bodies the events are returned as synced
+    for _ in range(2):
+        response = await hass.services.async_call(
+            CALENDAR_DOMAIN,
+            SERVICE_GET_EVENTS,
+            {
+                "entity_id": "calendar.test_calendar2",
+                "start_date_time": utcnow(),
+                "end_date_time": utcnow() + timedelta(days=3),
+            },
+            blocking=True,
+            return_response=True,
+        )
+        events = response["calendar.test_calendar2"]["events"]
+        assert [event["description"] for event in events] == [""]
+    assert "Error getting event bodies" in caplog.text
+
+    fetches = [
+        request
+        for request in requests_mock.request_history
+        if _is_body_request(request) and "calendar2" in request.path
+    ]
+    assert len(fetches) == 2
+
+
+def _is_body_request(request) -> bool:
+    return request.qs.get("$select") == ["body,changekey"]
+
+
 @pytest.mark.parametrize(
     "setup_base_integration", [{"method_name": "all_day_event_mocks"}], indirect=True
 )
@@ -293,6 +655,1043 @@ async def test_not_started_event(
     )
 
 
+@pytest.mark.parametrize(
+    "base_config_entry",
+    [{"options": {"advanced_options": {"update_interval": 600}}}],
+    indirect=True,
+)
+async def test_event_transitions(
+    hass: HomeAssistant,
+    setup_base_integration,
+    base_config_entry: MS365MockConfigEntry,
+    requests_mock: Mocker,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test the state changes as an event starts and ends, without polling."""
+    coordinator = base_config_entry.runtime_data.coordinator[0]
+    # Let the refresh requested as the entities were added complete
+    freezer.tick(timedelta(seconds=11))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    now = dt_util.utcnow()
+    data = (
+        load_json("O365/calendar1_calendar_view_not_started.json")
+        .replace(
+            "2020-01-01T23:59:58", f"{now + timedelta(minutes=2):%Y-%m-%dT%H:%M:%S}"
+        )
+        .replace(
+            "2020-01-01T23:59:59", f"{now + timedelta(minutes=4):%Y-%m-%dT%H:%M:%S}"
+        )
+    )
+    requests_mock.get(f"{URL.CALENDARS.value}/calendar1/calendarView", text=data)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    check_entity_state(
+        hass,
+        "calendar.test_calendar1",
+        "off",
+        attributes={"message": "Test not started"},
+    )
+    requests_mock.reset_mock()
+
+    freezer.tick(timedelta(minutes=2))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    check_entity_state(
+        hass,
+        "calendar.test_calendar1",
+        "on",
+        attributes={"message": "Test not started"},
+    )
+
+    freezer.tick(timedelta(minutes=2))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert hass.states.get("calendar.test_calendar1").state == "off"
+    assert not [
+        request
+        for request in requests_mock.request_history
+        if "calendar1/calendarView" in request.url
+    ]
+
+    await hass.config_entries.async_unload(base_config_entry.entry_id)
+    assert coordinator._unsub_transition is None  # noqa: SLF001
+
+
+@pytest.mark.parametrize(
+    "base_config_entry",
+    [{"options": {"advanced_options": {"adaptive_polling": True}}}],
+    indirect=True,
+)
+async def test_adaptive_polling(
+    hass: HomeAssistant,
+    setup_base_integration,
+    base_config_entry: MS365MockConfigEntry,
+    requests_mock: Mocker,
+) -> None:
+    """Test the polling interval follows how often the calendar changes."""
+    # The first poll is offset by up to an interval, to spread the calendars out
+    coordinator = base_config_entry.runtime_data.coordinator[0]
+    assert timedelta(seconds=27) <= coordinator.update_interval <= timedelta(seconds=93)
+
+    intervals = []
+    with patch(
+        f"custom_components.{DOMAIN}.integration.coordinator_integration.random.uniform",
+        return_value=1,
+    ):
+        for _ in range(10):
+            await coordinator.async_refresh()
+            intervals.append(coordinator.update_interval.total_seconds())
+        MS365MOCKS.started_event_mocks(requests_mock)
+        await coordinator.async_refresh()
+        intervals.append(coordinator.update_interval.total_seconds())
+
+        scheduler = MS365PollScheduler(60, 30, 900)
+        scheduler.next_interval(True, MS365Timeline([]))
+        event = coordinator.data.overlapping(utcnow(), utcnow())[0]
+        soon = replace(
+            event,
+            is_all_day=False,
+            start=utcnow() + timedelta(minutes=10),
+            end=utcnow() + timedelta(minutes=40),
+        )
+        assert scheduler.next_interval(False, MS365Timeline([event])) == timedelta(
+            seconds=60
+        )
+        assert scheduler.next_interval(False, MS365Timeline([soon])) == timedelta(
+            seconds=30
+        )
+
+    assert intervals == [60, 60, 60, 60, 120, 120, 120, 120, 120, 240, 30]
+
+    with patch(
+        f"custom_components.{DOMAIN}.integration.coordinator_integration.random.uniform",
+        side_effect=lambda low, high: high,
+    ):
+        scheduler = MS365PollScheduler(60, 30, 900)
+        assert scheduler.next_interval(True, MS365Timeline([])) == timedelta(seconds=93)
+
+
+@pytest.mark.parametrize(
+    "base_config_entry",
+    [{"options": {"advanced_options": {"sync_mode": "delta"}}}],
+    indirect=True,
+)
+@pytest.mark.parametrize(
+    "setup_base_integration", [{"method_name": "delta_mocks"}], indirect=True
+)
+async def test_delta_sync(
+    hass: HomeAssistant,
+    setup_base_integration,
+    base_config_entry: MS365MockConfigEntry,
+    requests_mock: Mocker,
+) -> None:
+    """Test delta sync applies changes to the stored events."""
+    check_entity_state(hass, "calendar.test_calendar1", "on", data_length=2)
+    check_entity_state(
+        hass, "calendar.test_calendar2", "off", _adjust_date(BASE_STATE_CAL2, 1, 1)
+    )
+
+    MS365MOCKS.delta_changes_mocks(requests_mock)
+    coordinator = base_config_entry.runtime_data.coordinator[0]
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert "$deltatoken=deltatoken1" in requests_mock.last_request.url
+    state = hass.states.get("calendar.test_calendar1")
+    assert len(state.attributes["data"]) == 1
+    assert state.attributes["data"][0]["summary"] == "Test event 2 calendar1 changed"
+
+
+@pytest.mark.parametrize(
+    "base_config_entry",
+    [{"options": {"advanced_options": {"sync_mode": "delta"}}}],
+    indirect=True,
+)
+@pytest.mark.parametrize(
+    "setup_base_integration", [{"method_name": "delta_mocks"}], indirect=True
+)
+async def test_delta_sync_expired(
+    hass: HomeAssistant,
+    setup_base_integration,
+    base_config_entry: MS365MockConfigEntry,
+    requests_mock: Mocker,
+) -> None:
+    """Test delta sync restarts when the delta token has expired."""
+    requests_mock.get(
+        f"{URL.CALENDARS.value}/calendar1/calendarView/delta?$deltatoken=deltatoken1",
+        status_code=410,
+    )
+    coordinator = base_config_entry.runtime_data.coordinator[0]
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert "$deltatoken" not in requests_mock.last_request.url
+    assert coordinator.sync_state == "ok"
+    check_entity_state(hass, "calendar.test_calendar1", "on", data_length=2)
+
+
+@pytest.mark.parametrize(
+    "base_config_entry",
+    [{"options": {"advanced_options": {"sync_mode": "delta"}}}],
+    indirect=True,
+)
+@pytest.mark.parametrize(
+    "setup_base_integration", [{"method_name": "delta_mocks"}], indirect=True
+)
+async def test_delta_sync_error(
+    hass: HomeAssistant,
+    setup_base_integration,
+    base_config_entry: MS365MockConfigEntry,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test delta sync error falls back to the cache."""
+    coordinator = base_config_entry.runtime_data.coordinator[0]
+    with patch(
+        f"custom_components.{DOMAIN}.integration.sync.api.MS365CalendarService.async_list_events_delta",
+        side_effect=HTTPError(),
+    ):
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+    assert "Error syncing calendar events from MS Graph" in caplog.text
+    check_entity_state(hass, "calendar.test_calendar1", "on", data_length=2)
+
+
+@pytest.mark.parametrize(
+    "base_config_entry",
+    [{"options": {"advanced_options": {"sync_mode": "delta"}}}],
+    indirect=True,
+)
+@pytest.mark.parametrize(
+    ("yaml_file", "data_length"),
+    [
+        ("ms365_calendars_search", 1),
+        ("ms365_calendars_sensitivity", 1),
+        ("ms365_calendars_exclude", 1),
+        ("ms365_calendars_exclude_subject", 1),
+    ],
+)
+async def test_delta_sync_filter(
+    tmp_path,
+    hass: HomeAssistant,
+    requests_mock: Mocker,
+    base_token,
+    base_config_entry: MS365MockConfigEntry,
+    yaml_file,
+    data_length,
+) -> None:
+    """Test search and sensitivity are applied to delta results."""
+    MS365MOCKS.delta_mocks(requests_mock)
+    yaml_setup(tmp_path, yaml_file)
+
+    base_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(base_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    check_entity_state(hass, "calendar.test_calendar1", "on", data_length=data_length)
+
+
+@pytest.mark.parametrize(
+    "base_config_entry",
+    [{"options": {"advanced_options": {"sync_mode": "sliding"}}}],
+    indirect=True,
+)
+async def test_sliding_sync(
+    hass: HomeAssistant,
+    setup_base_integration,
+    base_config_entry: MS365MockConfigEntry,
+    requests_mock: Mocker,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test sliding sync only retrieves the part of the window newly reached."""
+    coordinator = base_config_entry.runtime_data.coordinator[0]
+    await coordinator.async_refresh()
+    window_end = utcnow() + timedelta(days=8)
+    check_entity_state(hass, "calendar.test_calendar1", "on", data_length=2)
+
+    MS365MOCKS.no_events_mocks(requests_mock)
+    requests_mock.reset_mock()
+    freezer.tick(timedelta(seconds=60))
+    await coordinator.async_refresh()
+    [request] = _calendar1_view_requests(requests_mock)
+    assert abs(_request_start(request) - window_end) < timedelta(seconds=1)
+    check_entity_state(hass, "calendar.test_calendar1", "on", data_length=2)
+
+    # Events that have ended before the window starts are dropped
+    with patch.object(coordinator, "_sync_event_min_time", timedelta(days=3)):
+        await coordinator.async_refresh()
+    assert not coordinator.data.overlapping(
+        utcnow() - timedelta(days=10), utcnow() + timedelta(days=10)
+    )
+
+    # The whole window is retrieved hourly, and when asked for, otherwise
+    # nothing is retrieved until the window moves on
+    requests_mock.reset_mock()
+    freezer.tick(timedelta(hours=1))
+    await coordinator.async_refresh()
+    coordinator.sync.request_full_sync()
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+    requests = _calendar1_view_requests(requests_mock)
+    assert len(requests) == 2
+    for request in requests:
+        start = utcnow() - timedelta(days=8)
+        assert abs(_request_start(request) - start) < timedelta(seconds=1)
+
+
+@pytest.mark.parametrize(
+    "base_config_entry",
+    [{"options": {"advanced_options": {"sync_mode": "tiered"}}}],
+    indirect=True,
+)
+async def test_tiered_sync(
+    hass: HomeAssistant,
+    setup_base_integration,
+    base_config_entry: MS365MockConfigEntry,
+    requests_mock: Mocker,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test tiered sync retrieves nearer events more often."""
+    coordinator = base_config_entry.runtime_data.coordinator[0]
+    await coordinator.async_refresh()
+    check_entity_state(hass, "calendar.test_calendar1", "on", data_length=2)
+
+    # Only the next few hours, the events retrieved replace those stored
+    MS365MOCKS.no_events_mocks(requests_mock)
+    requests_mock.reset_mock()
+    await coordinator.async_refresh()
+    [request] = _calendar1_view_requests(requests_mock)
+    assert abs(_request_start(request) - utcnow()) < timedelta(seconds=1)
+    assert not coordinator.data.overlapping(utcnow(), utcnow() + timedelta(hours=6))
+
+    # The week either side every 15 minutes, with the part of the window newly
+    # reached, and the whole window every 4 hours
+    window_end = utcnow() + timedelta(days=8)
+    requests_mock.reset_mock()
+    freezer.tick(timedelta(minutes=15))
+    await coordinator.async_refresh()
+    starts = [
+        _request_start(request) for request in _calendar1_view_requests(requests_mock)
+    ]
+    assert len(starts) == 2
+    assert abs(starts[0] - (utcnow() - timedelta(days=7))) < timedelta(seconds=1)
+    assert abs(starts[1] - window_end) < timedelta(seconds=1)
+    _, stored_end = await coordinator.sync.async_get_stored_window()
+    assert abs(stored_end - utcnow() - timedelta(days=8)) < timedelta(seconds=1)
+
+    requests_mock.reset_mock()
+    freezer.tick(timedelta(hours=4))
+    await coordinator.async_refresh()
+    [request] = _calendar1_view_requests(requests_mock)
+    start = utcnow() - timedelta(days=8)
+    assert abs(_request_start(request) - start) < timedelta(seconds=1)
+
+
+@pytest.mark.parametrize(
+    "base_config_entry",
+    [{"options": {"advanced_options": {"batch_requests": True}}}],
+    indirect=True,
+)
+@pytest.mark.parametrize(
+    "setup_base_integration", [{"method_name": "batch_mocks"}], indirect=True
+)
+async def test_batch_requests(
+    hass: HomeAssistant,
+    setup_base_integration,
+    requests_mock: Mocker,
+) -> None:
+    """Test calendar updates are combined into batch requests."""
+    check_entity_state(hass, "calendar.test_calendar1", "on", data_length=2)
+    check_entity_state(
+        hass, "calendar.test_calendar2", "off", _adjust_date(BASE_STATE_CAL2, 1, 1)
+    )
+
+    history = requests_mock.request_history
+    assert not [request for request in history if "calendarView" in request.path]
+    batches = [request for request in history if request.url == URL.BATCH.value]
+    assert len(batches) == 1
+    assert len(batches[0].json()["requests"]) == 3
+
+
+@pytest.mark.parametrize(
+    "base_config_entry",
+    [{"options": {"advanced_options": {"batch_requests": True}}}],
+    indirect=True,
+)
+async def test_batch_requests_throttled(
+    hass: HomeAssistant,
+    requests_mock: Mocker,
+    base_token,
+    base_config_entry: MS365MockConfigEntry,
+) -> None:
+    """Test throttled requests within a batch are retried."""
+    MS365MOCKS.batch_mocks(
+        requests_mock, {"/me/calendars/calendar1/calendarView": [429]}
+    )
+    base_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(base_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    check_entity_state(hass, "calendar.test_calendar1", "on", data_length=2)
+    batches = [
+        request
+        for request in requests_mock.request_history
+        if request.url == URL.BATCH.value
+    ]
+    assert len(batches) == 2
+    assert len(batches[1].json()["requests"]) == 1
+
+
+@pytest.mark.parametrize(
+    "base_config_entry",
+    [{"options": {"advanced_options": {"batch_requests": True}}}],
+    indirect=True,
+)
+async def test_batch_requests_error(
+    hass: HomeAssistant,
+    requests_mock: Mocker,
+    base_token,
+    base_config_entry: MS365MockConfigEntry,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test failed requests within a batch fall back to the cache."""
+    MS365MOCKS.batch_mocks(
+        requests_mock, {"/me/calendars/calendar1/calendarView": [429, 429, 429, 429]}
+    )
+    base_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(base_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert "429 Error in batch: Failed" in caplog.text
+    assert base_config_entry.runtime_data.coordinator[0].sync_state == "problem"
+
+    requests_mock.post(URL.BATCH.value, status_code=500)
+    coordinator = base_config_entry.runtime_data.coordinator[2]
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert coordinator.sync_state == "problem"
+    assert "500 Server Error" in caplog.text
+
+    # Responses that cannot be used fail the requests rather than leave them waiting
+    for response, message in (
+        ({"json": {"responses": []}}, "No response in batch"),
+        ({"text": "not json"}, "Invalid batch response"),
+        ({"json": _throttled_with_date}, "429 Error in batch"),
+    ):
+        requests_mock.post(URL.BATCH.value, **response)
+        with patch(
+            f"custom_components.{DOMAIN}.integration.sync.governor.GOVERNOR_RETRY_AFTER",
+            0,
+        ):
+            await coordinator.async_refresh()
+        assert coordinator.sync_state == "problem"
+        assert message in caplog.text
+
+
+def _throttled_with_date(request, context):
+    return {
+        "responses": [
+            {
+                "id": item["id"],
+                "status": 429,
+                "headers": {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"},
+            }
+            for item in request.json()["requests"]
+        ]
+    }
+
+
+@pytest.mark.parametrize(
+    "base_config_entry",
+    [{"options": {"advanced_options": {"async_transport": True}}}],
+    indirect=True,
+)
+async def test_async_transport(
+    hass: HomeAssistant,
+    requests_mock: Mocker,
+    aioclient_mock: AiohttpClientMocker,
+    base_token,
+    base_config_entry: MS365MockConfigEntry,
+) -> None:
+    """Test events are retrieved with the async transport."""
+    MS365MOCKS.standard_mocks(requests_mock)
+    MS365MOCKS.async_transport_mocks(aioclient_mock)
+    base_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(base_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    check_entity_state(hass, "calendar.test_calendar1", "on", data_length=2)
+    check_entity_state(
+        hass, "calendar.test_calendar2", "off", _adjust_date(BASE_STATE_CAL2, 1, 1)
+    )
+    assert aioclient_mock.call_count == 3
+    assert not [
+        request
+        for request in requests_mock.request_history
+        if "calendarView" in request.path
+    ]
+
+
+@pytest.mark.parametrize(
+    "base_config_entry",
+    [{"options": {"advanced_options": {"async_transport": True}}}],
+    indirect=True,
+)
+async def test_async_transport_errors(
+    hass: HomeAssistant,
+    requests_mock: Mocker,
+    aioclient_mock: AiohttpClientMocker,
+    base_token,
+    base_config_entry: MS365MockConfigEntry,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test async transport errors fall back to the cache."""
+    MS365MOCKS.standard_mocks(requests_mock)
+    aioclient_mock.get(
+        f"{URL.CALENDARS.value}/calendar1/calendarView", status=HTTPStatus.UNAUTHORIZED
+    )
+    aioclient_mock.get(
+        f"{URL.GROUP_CALENDARS.value}/calendar2/calendar/calendarView",
+        exc=ClientError(),
+    )
+    aioclient_mock.get(
+        f"{URL.CALENDARS.value}/calendar3/calendarView", status=HTTPStatus.FORBIDDEN
+    )
+    base_config_entry.add_to_hass(hass)
+    with patch(
+        "O365.connection.Connection._try_refresh_token", side_effect=[True, False]
+    ) as mock_refresh:
+        await hass.config_entries.async_setup(base_config_entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert mock_refresh.call_count == 2
+    assert "401 Error for url" in caplog.text
+    assert "403 Error for url" in caplog.text
+    assert "Error requesting" in caplog.text
+    for coordinator in base_config_entry.runtime_data.coordinator:
+        assert coordinator.sync_state == "problem"
+
+    # The token is taken from the token backend, even before the O365 library
+    # has opened a session of its own
+    con = base_config_entry.runtime_data.ha_account.account.con
+    con.session = None
+    with patch.object(con.token_backend, "get_access_token", return_value=None):
+        await base_config_entry.runtime_data.coordinator[0].async_refresh()
+    assert "no access token" in caplog.text
+
+
+@pytest.mark.parametrize(
+    "base_config_entry",
+    [{"options": {"advanced_options": {"change_notifications": True}}}],
+    indirect=True,
+)
+async def test_change_notifications(
+    hass: HomeAssistant,
+    requests_mock: Mocker,
+    base_token,
+    base_config_entry: MS365MockConfigEntry,
+    hass_client_no_auth,
+) -> None:
+    """Test change notifications refresh only the calendar that changed."""
+    await async_process_ha_core_config(hass, {"external_url": "https://example.com"})
+    MS365MOCKS.notification_mocks(requests_mock)
+    base_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(base_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    subscriptions = _subscription_requests(requests_mock, "POST")
+    assert sorted(request.json()["resource"] for request in subscriptions) == [
+        "groups/calendar2/calendar/events",
+        "me/calendars/calendar1/events",
+        "me/calendars/calendar3/events",
+    ]
+    webhook_url = subscriptions[0].json()["notificationUrl"]
+    client_state = subscriptions[0].json()["clientState"]
+    assert webhook_url.startswith("https://example.com/api/webhook/")
+    for coordinator in base_config_entry.runtime_data.coordinator:
+        assert coordinator.update_interval == timedelta(hours=1)
+
+    client = await hass_client_no_auth()
+    webhook_path = webhook_url.removeprefix("https://example.com")
+    response = await client.post(f"{webhook_path}?validationToken=token%201")
+    assert response.status == HTTPStatus.OK
+    assert await response.text() == "token 1"
+
+    response = await client.post(webhook_path, data="not json")
+    assert response.status == HTTPStatus.BAD_REQUEST
+
+    def _notify(subscription_id, state=client_state, **kwargs):
+        return client.post(
+            webhook_path,
+            json={
+                "value": [
+                    {
+                        "subscriptionId": subscription_id,
+                        "clientState": state,
+                        **kwargs,
+                    }
+                ]
+            },
+        )
+
+    requests_mock.reset_mock()
+    for subscription_id, state in (
+        ("me-calendars-calendar1-events", "wrong"),
+        ("unknown", client_state),
+    ):
+        response = await _notify(subscription_id, state, changeType="updated")
+        assert response.status == HTTPStatus.ACCEPTED
+    response = await _notify("me-calendars-calendar1-events", changeType="updated")
+    assert response.status == HTTPStatus.ACCEPTED
+    # The refresh is held until the cooldown from the refresh at startup ends
+    async_fire_time_changed(hass, utcnow() + timedelta(seconds=11))
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert [request.url.split("?")[0] for request in requests_mock.request_history] == [
+        f"{URL.CALENDARS.value}/calendar1/calendarView"
+    ]
+
+    requests_mock.reset_mock()
+    reauthorize = {
+        "subscriptionId": "me-calendars-calendar3-events",
+        "clientState": client_state,
+        "lifecycleEvent": "reauthorizationRequired",
+    }
+    await client.post(webhook_path, json={"value": [reauthorize, reauthorize]})
+    await _notify(
+        "groups-calendar2-calendar-events", lifecycleEvent="subscriptionRemoved"
+    )
+    await hass.async_block_till_done(wait_background_tasks=True)
+    renewals = _subscription_requests(requests_mock, "PATCH")
+    assert len(renewals) == 1
+    assert renewals[0].url.endswith("/subscriptions/me-calendars-calendar3-events")
+    assert _subscription_requests(requests_mock, "POST")[0].json()["resource"] == (
+        "groups/calendar2/calendar/events"
+    )
+
+    requests_mock.reset_mock()
+    requests_mock.patch(
+        f"{URL.SUBSCRIPTIONS.value}/me-calendars-calendar1-events",
+        status_code=HTTPStatus.NOT_FOUND,
+    )
+    async_fire_time_changed(hass, utcnow() + timedelta(days=3))
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert len(_subscription_requests(requests_mock, "PATCH")) == 3
+    assert [
+        request.json()["resource"]
+        for request in _subscription_requests(requests_mock, "POST")
+    ] == ["me/calendars/calendar1/events"]
+
+    # The subscriptions are removed once, at whichever of stop or unload is first
+    requests_mock.reset_mock()
+    requests_mock.delete(
+        f"{URL.SUBSCRIPTIONS.value}/me-calendars-calendar1-events",
+        status_code=HTTPStatus.NOT_FOUND,
+    )
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+    await hass.async_block_till_done()
+    assert await hass.config_entries.async_unload(base_config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert len(_subscription_requests(requests_mock, "DELETE")) == 3
+    response = await _notify("me-calendars-calendar1-events", changeType="updated")
+    assert response.status == HTTPStatus.OK
+
+
+@pytest.mark.parametrize(
+    "base_config_entry",
+    [
+        {
+            "options": {
+                "advanced_options": {
+                    "change_notifications": True,
+                    "sync_mode": "sliding",
+                }
+            }
+        }
+    ],
+    indirect=True,
+)
+async def test_change_notifications_sliding(
+    hass: HomeAssistant,
+    requests_mock: Mocker,
+    base_token,
+    base_config_entry: MS365MockConfigEntry,
+    hass_client_no_auth,
+) -> None:
+    """Test a change notification retrieves the event changed, not the window."""
+    await async_process_ha_core_config(hass, {"external_url": "https://example.com"})
+    MS365MOCKS.notification_mocks(requests_mock)
+    base_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(base_config_entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = base_config_entry.runtime_data.coordinator[0]
+    await coordinator.async_refresh()
+    window_end = utcnow() + timedelta(days=8)
+
+    [subscription] = [
+        request.json()
+        for request in _subscription_requests(requests_mock, "POST")
+        if request.json()["resource"] == "me/calendars/calendar1/events"
+    ]
+    webhook_path = subscription["notificationUrl"].removeprefix("https://example.com")
+    client = await hass_client_no_auth()
+
+    MS365MOCKS.no_events_mocks(requests_mock)
+    events_url = f"{URL.CALENDARS.value}/calendar1/events"
+    mock_call(
+        requests_mock,
+        URL.CALENDARS,
+        "calendar1_event1",
+        "calendar1/events/event1",
+        start=utcnow().strftime("%Y-%m-%d"),
+        end=(utcnow() + timedelta(days=1)).strftime("%Y-%m-%d"),
+    )
+    requests_mock.get(f"{events_url}/gone", status_code=HTTPStatus.NOT_FOUND)
+    requests_mock.reset_mock()
+    await client.post(
+        webhook_path,
+        json={
+            "value": [
+                {
+                    "subscriptionId": "me-calendars-calendar1-events",
+                    "clientState": subscription["clientState"],
+                    "changeType": change_type,
+                    "resourceData": {"id": event_id},
+                }
+                for event_id, change_type in (
+                    ("event1", "updated"),
+                    ("master2", "deleted"),
+                    ("gone", "updated"),
+                )
+            ]
+        },
+    )
+    # The first is retrieved at once, the rest at the next refresh
+    await hass.async_block_till_done(wait_background_tasks=True)
+    await coordinator.async_refresh()
+
+    urls = [request.url.split("?")[0] for request in requests_mock.request_history]
+    assert urls.count(f"{events_url}/event1") == 1
+    assert urls.count(f"{events_url}/gone") == 1
+    assert f"{events_url}/master2" not in urls
+    for request in _calendar1_view_requests(requests_mock):
+        assert abs(_request_start(request) - window_end) < timedelta(seconds=15)
+    events = coordinator.data.overlapping(
+        utcnow() - timedelta(days=10), utcnow() + timedelta(days=10)
+    )
+    assert [event.subject for event in events] == ["Test event calendar1"]
+
+    # A changed series replaces its occurrences
+    occurrence = {
+        "id": "occurrence1",
+        "subject": "Test series",
+        "seriesMasterId": "master2",
+        "start": {"dateTime": f"{utcnow().date()}T00:00:00", "timeZone": "UTC"},
+        "end": {"dateTime": f"{utcnow().date()}T23:59:00", "timeZone": "UTC"},
+    }
+    requests_mock.get(
+        f"{events_url}/master2", json={"id": "master2", "type": "seriesMaster"}
+    )
+    requests_mock.get(f"{events_url}/master2/instances", json={"value": [occurrence]})
+    coordinator.sync.request_event_sync("master2")
+    await coordinator.async_refresh()
+    events = coordinator.data.overlapping(
+        utcnow() - timedelta(days=10), utcnow() + timedelta(days=10)
+    )
+    assert sorted(event.object_id for event in events) == ["event1", "occurrence1"]
+
+    # An event that cannot be retrieved is retried at the next sync, and one
+    # deleted since the notification is removed
+    requests_mock.get(
+        f"{events_url}/event1", status_code=HTTPStatus.INTERNAL_SERVER_ERROR
+    )
+    coordinator.sync.request_event_sync("event1")
+    await coordinator.async_refresh()
+    assert coordinator.sync_state == "problem"
+    requests_mock.get(f"{events_url}/event1", status_code=HTTPStatus.NOT_FOUND)
+    requests_mock.reset_mock()
+    await coordinator.async_refresh()
+    assert coordinator.sync_state == "ok"
+    urls = [request.url.split("?")[0] for request in requests_mock.request_history]
+    assert f"{events_url}/event1" in urls
+    events = coordinator.data.overlapping(
+        utcnow() - timedelta(days=10), utcnow() + timedelta(days=10)
+    )
+    assert [event.object_id for event in events] == ["occurrence1"]
+    assert await hass.config_entries.async_unload(base_config_entry.entry_id)
+
+
+@pytest.mark.parametrize(
+    "base_config_entry",
+    [{"options": {"advanced_options": {"change_notifications": True}}}],
+    indirect=True,
+)
+async def test_change_notifications_unavailable(
+    hass: HomeAssistant,
+    requests_mock: Mocker,
+    base_token,
+    base_config_entry: MS365MockConfigEntry,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test calendars are polled when change notifications are unavailable."""
+    MS365MOCKS.notification_mocks(requests_mock, HTTPStatus.BAD_REQUEST)
+    base_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(base_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert "No external URL available for change notifications" in caplog.text
+    assert not _subscription_requests(requests_mock, "POST")
+
+    await async_process_ha_core_config(hass, {"external_url": "https://example.com"})
+    await hass.config_entries.async_reload(base_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert len(_subscription_requests(requests_mock, "POST")) == 3
+    assert "Unable to subscribe to change notifications" in caplog.text
+    for coordinator in base_config_entry.runtime_data.coordinator:
+        assert coordinator.update_interval == timedelta(seconds=60)
+
+
+async def test_request_governor(
+    hass: HomeAssistant,
+    setup_base_integration,
+    base_config_entry: MS365MockConfigEntry,
+    requests_mock: Mocker,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test throttling by MS Graph holds back requests for the account."""
+    requests_mock.get(
+        f"{URL.CALENDARS.value}/calendar1/calendarView",
+        status_code=HTTPStatus.TOO_MANY_REQUESTS,
+        headers={"Retry-After": "120"},
+    )
+    coordinators = base_config_entry.runtime_data.coordinator
+    await coordinators[0].async_refresh()
+    assert coordinators[0].sync_state == "problem"
+    assert "pausing for 120.0 seconds" in caplog.text
+
+    requests_mock.reset_mock()
+    await coordinators[2].async_refresh()
+    assert coordinators[2].sync_state == "ok"
+    assert not requests_mock.request_history
+
+    await hass.services.async_call(
+        CALENDAR_DOMAIN,
+        SERVICE_GET_EVENTS,
+        {
+            "entity_id": "calendar.test_calendar2",
+            "start_date_time": (utcnow() - timedelta(days=60)).isoformat(),
+            "end_date_time": (utcnow() + timedelta(days=60)).isoformat(),
+        },
+        blocking=True,
+        return_response=True,
+    )
+    assert "Throttled by MS Graph, retrying in 120 seconds" in caplog.text
+    assert not requests_mock.request_history
+
+    result = await async_get_config_entry_diagnostics(hass, base_config_entry)
+    [governor] = result["runtime"]["request_governors"]
+    assert governor["throttled"] == 1
+    assert governor["last_retry_after"] == 120
+    assert governor["throttled_until"] is not None
+
+
+async def test_request_governor_limits() -> None:
+    """Test the governor paces requests and backs off when throttled."""
+    governor = MS365RequestGovernor()
+    start = time.monotonic()
+    for _ in range(GOVERNOR_BURST + 5):
+        async with governor.async_request():
+            pass
+    assert time.monotonic() - start >= 4 / GOVERNOR_RATE
+    assert governor.as_dict()["requests"] == GOVERNOR_BURST + 5
+    assert governor.as_dict()["throttled_until"] is None
+
+    response = Response()
+    response.status_code = HTTPStatus.SERVICE_UNAVAILABLE
+    with pytest.raises(HTTPError):
+        async with governor.async_request():
+            raise HTTPError(response=response)
+    assert governor.retry_in > GOVERNOR_RETRY_AFTER - 1
+
+    governor = MS365RequestGovernor()
+    with pytest.raises(RetryError):
+        async with governor.async_request():
+            raise RetryError("Max retries exceeded")
+    assert governor.retry_in > GOVERNOR_RETRY_AFTER - 1
+
+
+async def test_range_cache(
+    hass: HomeAssistant,
+    setup_base_integration,
+    base_config_entry: MS365MockConfigEntry,
+    requests_mock: Mocker,
+) -> None:
+    """Test ranges outside the synced window are fetched once and cached."""
+    with patch(
+        f"custom_components.{DOMAIN}.integration.coordinator_integration.RANGE_PREFETCH_SPAN",
+        0,
+    ):
+        await _async_check_range_cache(hass, base_config_entry, requests_mock)
+
+
+async def _async_check_range_cache(
+    hass: HomeAssistant,
+    base_config_entry: MS365MockConfigEntry,
+    requests_mock: Mocker,
+) -> None:
+    coordinator = base_config_entry.runtime_data.coordinator[0]
+    start = datetime(2022, 3, 22, 20, tzinfo=ZoneInfo(key="UTC"))
+    end = datetime(2022, 3, 22, 22, tzinfo=ZoneInfo(key="UTC"))
+    requests_mock.reset_mock()
+
+    results = await asyncio.gather(
+        *(coordinator.async_get_events(start, end) for _ in range(3))
+    )
+    assert [len(result) for result in results] == [2, 2, 2]
+    assert len(await coordinator.async_get_events(start, end)) == 2
+    assert len(_calendar_view_requests(requests_mock, start)) == 1
+
+    with patch(
+        f"custom_components.{DOMAIN}.integration.sync.range_cache.RANGE_CACHE_TTL", 0
+    ):
+        await coordinator.async_get_events(start, end + timedelta(hours=2))
+        await coordinator.async_get_events(start, end + timedelta(hours=2))
+    assert len(_calendar_view_requests(requests_mock, start)) == 3
+
+    await coordinator.async_refresh_changed()
+    requests_mock.reset_mock()
+    fetch = hass.async_create_task(coordinator.async_get_events(start, end))
+    await coordinator.async_refresh_changed()
+    assert len(await fetch) == 2
+    await coordinator.async_get_events(start, end)
+    assert len(_calendar_view_requests(requests_mock, start)) == 2
+
+    with patch(
+        f"custom_components.{DOMAIN}.integration.sync.range_cache.RANGE_CACHE_SIZE", 1
+    ):
+        await coordinator.async_get_events(start, end + timedelta(hours=1))
+        await coordinator.async_get_events(start, end)
+    assert len(_calendar_view_requests(requests_mock, start)) == 4
+
+    # The synced window is served from the timeline, over the cached range
+    start = utcnow() - timedelta(days=60)
+    end = utcnow() + timedelta(days=1)
+    assert len(await coordinator.async_get_events(start, end)) == 2
+    MS365MOCKS.no_events_mocks(requests_mock)
+    await coordinator.async_refresh()
+    requests_mock.reset_mock()
+    assert not await coordinator.async_get_events(start, end)
+    assert not _calendar_view_requests(requests_mock, start)
+
+
+async def test_range_prefetch(
+    hass: HomeAssistant,
+    setup_base_integration,
+    base_config_entry: MS365MockConfigEntry,
+    requests_mock: Mocker,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test the ranges either side of a fetched range are prefetched."""
+    caplog.set_level(logging.DEBUG)
+    coordinator = base_config_entry.runtime_data.coordinator[0]
+    week = timedelta(days=7)
+    start = datetime(2022, 3, 21, tzinfo=ZoneInfo(key="UTC"))
+    requests_mock.reset_mock()
+
+    await coordinator.async_get_events(start, start + week)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    for offset in (-1, 0, 1):
+        assert len(_calendar_view_requests(requests_mock, start + offset * week)) == 1
+
+    # Moving to the next week is served from the prefetch, and prefetches onwards
+    requests_mock.reset_mock()
+    await coordinator.async_get_events(start + week, start + 2 * week)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert len(_calendar_view_requests(requests_mock, start + 2 * week)) == 1
+    assert len(requests_mock.request_history) == 1
+
+    # Long ranges, and ranges while throttled, are not prefetched
+    requests_mock.reset_mock()
+    await coordinator.async_get_events(start, start + 10 * week)
+    coordinator.sync.api.governor.throttled(60)
+    await coordinator.async_get_events(start, start + 4 * week)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert len(_calendar_view_requests(requests_mock, start)) == 1
+
+    # Prefetch errors are logged quietly
+    coordinator.sync.api.governor = MS365RequestGovernor()
+    requests_mock.get(
+        f"{URL.CALENDARS.value}/calendar1/calendarView",
+        status_code=HTTPStatus.NOT_FOUND,
+        additional_matcher=lambda request: request.qs["startdatetime"][0].startswith(
+            "2022-05-02"
+        ),
+    )
+    await coordinator.async_get_events(start + 5 * week, start + 6 * week)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert "Error prefetching calendar event range" in caplog.text
+
+
+async def test_event_paging(
+    hass: HomeAssistant,
+    setup_base_integration,
+    base_config_entry: MS365MockConfigEntry,
+    requests_mock: Mocker,
+) -> None:
+    """Test events are retrieved a page at a time until the range is complete."""
+    coordinator = base_config_entry.runtime_data.coordinator[0]
+    MS365MOCKS.paged_mocks(requests_mock)
+    requests_mock.reset_mock()
+    await coordinator.async_refresh()
+    check_entity_state(hass, "calendar.test_calendar1", "on", data_length=2)
+
+    requests = [
+        request
+        for request in requests_mock.request_history
+        if request.path.endswith("/calendar1/calendarview")
+    ]
+    assert len(requests) == 2
+    assert requests[0].qs["$top"] == ["250"]
+    assert requests[1].qs == {"$skip": ["1"]}
+
+    result = await async_get_config_entry_diagnostics(hass, base_config_entry)
+    paging = result["runtime"]["event_paging"][0]
+    assert paging["entity_id"] == "calendar.test_calendar1"
+    assert paging["last_pages"] == 2
+    assert paging["last_events"] == 2
+
+
+def _calendar1_view_requests(requests_mock: Mocker):
+    return [
+        request
+        for request in requests_mock.request_history
+        if request.path.endswith("/calendar1/calendarview")
+    ]
+
+
+def _request_start(request) -> datetime:
+    return datetime.fromisoformat(request.qs["startdatetime"][0].upper())
+
+
+def _calendar_view_requests(requests_mock: Mocker, start: datetime):
+    return [
+        request
+        for request in requests_mock.request_history
+        if request.path.endswith("/calendarview")
+        and request.qs["startdatetime"][0].startswith(start.strftime("%Y-%m-%d"))
+    ]
+
+
+def _subscription_requests(requests_mock: Mocker, method: str):
+    return [
+        request
+        for request in requests_mock.request_history
+        if request.method == method and request.url.startswith(URL.SUBSCRIPTIONS.value)
+    ]
+
+
 def _adjust_date(data, adddays_start=0, adddays_end=0):
     new_data = deepcopy(data)
     start = (utcnow() + timedelta(days=adddays_start)).replace(
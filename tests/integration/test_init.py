@@ -1,10 +1,18 @@
 # pylint: disable=unused-argument
 """Test setup process."""
 
+import asyncio
+from dataclasses import fields
+from datetime import timedelta
+from typing import Any
 from unittest.mock import patch
 
-from homeassistant.const import CONF_NAME
+import pytest
+from homeassistant.const import CONF_NAME, EVENT_HOMEASSISTANT_FINAL_WRITE
 from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from O365.calendar import EventSensitivity, EventShowAs
+from requests_mock import Mocker
 
 from custom_components.ms365_calendar.integration.const_integration import (
     CONF_ADVANCED_OPTIONS,
@@ -20,8 +28,21 @@ from custom_components.ms365_calendar.integration.const_integration import (
     DEFAULT_UPDATE_INTERVAL,
 )
 
+from custom_components.ms365_calendar.integration.store_integration import (
+    MANIFEST_KEY_FORMAT,
+    SHARD_KEY_FORMAT,
+    CacheStore,
+    LocalCalendarStore,
+    LocalCalendarStoreManifest,
+    shard_storage_key,
+)
+from custom_components.ms365_calendar.integration.sync.api import MS365CalendarService
+from custom_components.ms365_calendar.integration.sync.event import MS365Event
+
 from ..helpers.mock_config_entry import MS365MockConfigEntry
-from .const_integration import UPDATE_CALENDAR_LIST
+from ..helpers.utils import check_entity_state
+from .const_integration import DOMAIN, UPDATE_CALENDAR_LIST
+from .helpers_integration.mocks import MS365MOCKS
 
 
 async def test_reload(
@@ -56,3 +77,281 @@ async def test_reload(
             },
         )
     assert mock_async_reload.called
+
+
+async def test_storage_shards(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    requests_mock: Mocker,
+    base_token,
+    base_config_entry: MS365MockConfigEntry,
+) -> None:
+    """Test each calendar is stored in its own shard."""
+    manifest_key = MANIFEST_KEY_FORMAT.format(
+        domain=DOMAIN, entry_id=base_config_entry.entry_id
+    )
+    old_key, legacy_key, calendar3_key = (
+        SHARD_KEY_FORMAT.format(
+            domain=DOMAIN, entry_id=base_config_entry.entry_id, shard=shard
+        )
+        for shard in ("old", "calendar1", "calendar3")
+    )
+    shards = {"Old": old_key, "Calendar1": legacy_key, "Calendar3": calendar3_key}
+    hass_storage[manifest_key] = {
+        "version": 2,
+        "minor_version": 1,
+        "key": manifest_key,
+        "data": {"shards": shards},
+    }
+    for key in shards.values():
+        hass_storage[key] = {"version": 1, "minor_version": 1, "key": key, "data": {}}
+    MS365MOCKS.standard_mocks(requests_mock)
+    base_config_entry.add_to_hass(hass)
+
+    # A calendar that fails to set up keeps its shard
+    calendar_init = MS365CalendarService.async_calendar_init
+
+    async def _async_calendar_init(self, calendar=None):
+        return self.calendar_id != "calendar3" and await calendar_init(self, calendar)
+
+    with patch.object(
+        MS365CalendarService, "async_calendar_init", _async_calendar_init
+    ):
+        await hass.config_entries.async_setup(base_config_entry.entry_id)
+        await hass.async_block_till_done()
+
+    shards = hass_storage[manifest_key]["data"]["shards"]
+    assert sorted(shards) == ["Calendar1", "Calendar2", "Calendar3"]
+    assert shards["Calendar1"] == shard_storage_key(
+        base_config_entry.entry_id, "Calendar1"
+    )
+    # Names differing only in case have shards of their own
+    assert shard_storage_key(base_config_entry.entry_id, "Work") != (
+        shard_storage_key(base_config_entry.entry_id, "work")
+    )
+    assert old_key not in hass_storage
+    assert legacy_key not in hass_storage
+    assert calendar3_key in hass_storage
+
+    assert await hass.config_entries.async_remove(base_config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert manifest_key not in hass_storage
+
+
+async def test_storage_shards_concurrent(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    base_config_entry: MS365MockConfigEntry,
+) -> None:
+    """Test shards set up together are all added to the manifest."""
+    manifest = LocalCalendarStoreManifest(hass, base_config_entry.entry_id)
+    keys = ["Calendar1", "Calendar2", "Calendar3"]
+
+    # Reading the store from disk yields to the other setups
+    async def _async_load(self):
+        await asyncio.sleep(0)
+
+    with patch.object(CacheStore, "async_load", _async_load):
+        await asyncio.gather(*(manifest.async_get_shard(key) for key in keys))
+
+    manifest_key = MANIFEST_KEY_FORMAT.format(
+        domain=DOMAIN, entry_id=base_config_entry.entry_id
+    )
+    assert sorted(hass_storage[manifest_key]["data"]["shards"]) == keys
+
+
+async def test_storage_migrate(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    requests_mock: Mocker,
+    base_token,
+    base_config_entry: MS365MockConfigEntry,
+) -> None:
+    """Test the single store is replaced by the manifest."""
+    manifest_key = MANIFEST_KEY_FORMAT.format(
+        domain=DOMAIN, entry_id=base_config_entry.entry_id
+    )
+    hass_storage[manifest_key] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": manifest_key,
+        "data": {"Calendar1": {"event_sync": {}}},
+    }
+    MS365MOCKS.standard_mocks(requests_mock)
+    base_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(base_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert hass_storage[manifest_key]["version"] == 2
+    assert sorted(hass_storage[manifest_key]["data"]) == ["shards"]
+
+
+async def test_storage_round_trip(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    requests_mock: Mocker,
+    base_token,
+    base_config_entry: MS365MockConfigEntry,
+) -> None:
+    """Test the events written to the store are read back unchanged."""
+    MS365MOCKS.standard_mocks(requests_mock)
+    base_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(base_config_entry.entry_id)
+    await hass.async_block_till_done()
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_FINAL_WRITE)
+    await hass.async_block_till_done()
+
+    key = shard_storage_key(base_config_entry.entry_id, "Calendar1")
+    stored = hass_storage[key]["data"]["event_sync"]["calendar1"]["items"]
+    assert set(stored["event1"]) == {field.name for field in fields(MS365Event)}
+
+    coordinator = base_config_entry.runtime_data.coordinator[0]
+    synced = (await coordinator.sync._store.async_load())["items"]  # noqa: SLF001
+    loaded = await LocalCalendarStore(hass, key).async_load()
+    assert loaded["event_sync"]["calendar1"]["items"] == synced
+
+
+async def test_unknown_event_values(
+    hass: HomeAssistant,
+    setup_base_integration,
+    base_config_entry: MS365MockConfigEntry,
+) -> None:
+    """Test values O365 does not know fall back to the defaults."""
+    calendar = base_config_entry.runtime_data.coordinator[0].sync.api.calendar
+    event = MS365Event.from_graph(
+        calendar,
+        {
+            "id": "event1",
+            "start": {"dateTime": "2020-01-01T10:00:00.0000000", "timeZone": "UTC"},
+            "end": {"dateTime": "2020-01-01T11:00:00.0000000", "timeZone": "UTC"},
+            "sensitivity": "secret",
+            "showAs": "somewhereElse",
+            "attendees": [
+                {
+                    "emailAddress": {"address": "test@example.com"},
+                    "type": "observer",
+                    "status": {"response": "maybe"},
+                }
+            ],
+        },
+    )
+
+    assert event.sensitivity == EventSensitivity.Normal
+    assert event.show_as == EventShowAs.Busy
+    assert event.attendees[0].type == "required"
+    assert event.attendees[0].status is None
+    assert MS365Event.from_store(event.to_store()) == event
+
+
+def _stored_calendar1(entry_id, version, item):
+    key = shard_storage_key(entry_id, "Calendar1")
+    now = dt_util.now()
+    return key, {
+        "version": version,
+        "minor_version": 1,
+        "key": key,
+        "data": {
+            "event_sync": {
+                "calendar1": {
+                    "items": {"cached1": item},
+                    "sync_window": [
+                        (now - timedelta(days=1)).isoformat(),
+                        (now + timedelta(days=1)).isoformat(),
+                    ],
+                }
+            }
+        },
+    }
+
+
+def _cached_event():
+    now = dt_util.now()
+    return {
+        "object_id": "cached1",
+        "subject": "Cached event",
+        "body": "Cached",
+        "body_type": "text",
+        "start": str(now - timedelta(hours=1)),
+        "end": str(now + timedelta(hours=1)),
+        "is_all_day": False,
+        "location": "Cached Location",
+        "categories": [],
+        "sensitivity": "normal",
+        "show_as": "busy",
+        "is_reminder_on": False,
+        "remind_before_minutes": 0,
+        "organizer": "john@nomail.com",
+        "attendees": [{"email": "jane@nomail.com", "type": "required", "status": None}],
+        "series_master_id": None,
+        "change_key": "changekey1",
+    }
+
+
+async def test_storage_warm_start(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    requests_mock: Mocker,
+    base_token,
+    base_config_entry: MS365MockConfigEntry,
+) -> None:
+    """Test stored events are served at startup and the sync is deferred."""
+    key, stored = _stored_calendar1(base_config_entry.entry_id, 3, _cached_event())
+    hass_storage[key] = stored
+    MS365MOCKS.standard_mocks(requests_mock)
+    base_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(base_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    check_entity_state(
+        hass,
+        "calendar.test_calendar1",
+        "on",
+        data_length=1,
+        attributes={"message": "Cached event", "sync_state": "unknown"},
+    )
+    assert not [
+        request
+        for request in requests_mock.request_history
+        if "calendar1/calendarView" in request.path
+    ]
+
+    await base_config_entry.runtime_data.coordinator[0].async_refresh()
+    await hass.async_block_till_done()
+
+    check_entity_state(
+        hass,
+        "calendar.test_calendar1",
+        "on",
+        data_length=2,
+        attributes={"sync_state": "ok"},
+    )
+
+
+@pytest.mark.parametrize(
+    ("version", "item"),
+    [(2, _cached_event()), (3, {"object_id": "cached1"})],
+)
+async def test_storage_warm_start_discarded(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    requests_mock: Mocker,
+    base_token,
+    base_config_entry: MS365MockConfigEntry,
+    version: int,
+    item: dict[str, Any],
+) -> None:
+    """Test stored events in an old or unreadable format are not served."""
+    key, stored = _stored_calendar1(base_config_entry.entry_id, version, item)
+    hass_storage[key] = stored
+    MS365MOCKS.standard_mocks(requests_mock)
+    base_config_entry.add_to_hass(hass)
+    await hass.config_entries.async_setup(base_config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    check_entity_state(
+        hass,
+        "calendar.test_calendar1",
+        "on",
+        data_length=2,
+        attributes={"sync_state": "ok"},
+    )
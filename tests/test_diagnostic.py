@@ -1,8 +1,15 @@
 # pylint: disable=unused-argument, line-too-long
 """Test the diagnostics."""
 
+import pytest
+
 from homeassistant.core import HomeAssistant
 
+from custom_components.ms365_calendar.classes.api import (
+    connection_pool_stats,
+    shared_adapter,
+)
+
 from .helpers.mock_config_entry import MS365MockConfigEntry
 from .integration import async_get_config_entry_diagnostics
 from .integration.const_integration import (
@@ -24,3 +31,35 @@ async def test_diagnostics(
     assert result["config_entry_data"]["client_secret"] == "**REDACTED**"
     assert result["config_granted_permissions"] == DIAGNOSTIC_GRANTED_PERMISSIONS
     assert result["config_requested_permissions"] == DIAGNOSTIC_REQUESTED_PERMISSIONS
+
+
+@pytest.mark.parametrize(
+    "base_config_entry",
+    [{"options": {"advanced_options": {"connection_pool_size": 8}}}],
+    indirect=True,
+)
+async def test_diagnostics_connection_pool(
+    hass: HomeAssistant,
+    setup_base_integration: None,
+    base_config_entry: MS365MockConfigEntry,
+):
+    """Test the shared connection pool is reported."""
+    con = base_config_entry.runtime_data.ha_account.account.con
+    adapter = shared_adapter(con.request_retries, 8)
+    session = con.get_session()
+    assert session.adapters["https://"] is adapter
+    assert shared_adapter(con.request_retries) is not adapter
+    assert shared_adapter(0, 8) is not adapter
+    adapter.poolmanager.connection_from_url("https://graph.microsoft.com")
+    session.close()
+
+    result = await async_get_config_entry_diagnostics(hass, base_config_entry)
+    assert {
+        "host": "graph.microsoft.com",
+        "connections": 0,
+        "requests": 0,
+        "pool_size": 8,
+    } in result["connection_pool"]
+
+    assert await hass.config_entries.async_unload(base_config_entry.entry_id)
+    assert connection_pool_stats() == []